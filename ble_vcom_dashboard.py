@@ -1,120 +1,223 @@
 """
 Bluetooth version of vcom_with_dashboard.py
 Replaces USB Serial with Bluetooth BLE
+Streams several sensors at once from one asyncio loop, one dashboard panel per sensor
 """
 
 import asyncio
 from bleak import BleakClient, BleakScanner
 import threading
 import time
-from ecg_dashboard import ECGDashboard, ECGDashboardIntegration
+from ecg_dashboard import ECGMultiDashboard, ECGDashboardIntegration
+from ecg_logging import setup_logging, shutdown_logging
 
 # Bluetooth configuration
-DEVICE_NAME = "ecg_sensor_bt"
+DEVICE_NAME = "ecg_sensor_bt"   # Every board advertising this name is streamed
+MAX_DEVICES = 8                 # Upper limit of boards connected at once
 SPP_TX_CHAR_UUID = "fec26ec4-6d71-4442-9f81-55bc21d658d6"
-
-# Global variable for dashboard integration
-dashboard_integration = None
-running = True
-
-
-def notification_handler(sender, data):
+SAMPLING_RATE = 125
+
+
+class BLEDeviceSession:
+    def __init__(self, device, dashboard, sampling_rate=SAMPLING_RATE):
+        """
+        Per-device state: integration, counters and notification handler
+
+        Args:
+            device (BLEDevice): Device found by the scanner
+            dashboard (ECGDashboard): Dashboard panel of this device
+            sampling_rate (int): Nominal sampling rate of the sensor in Hz
+        """
+        self.device = device
+        self.name = device.name
+        self.address = device.address
+        self.sampling_rate = sampling_rate
+
+        # No MCU responses over BLE, so HR/HRV uses the host-side R-peak detector
+        self.integration = ECGDashboardIntegration(dashboard, hrv_beat_source='host')
+
+        # Throughput and drop counters
+        self.notifications = 0
+        self.samples_received = 0
+        self.decode_errors = 0
+        self.connected = False
+        self.connect_time = None
+        self.disconnect_time = None
+        self.rate_window_start = None
+        self.rate_window_count = 0
+        self.throughput = 0.0
+
+    @property
+    def label(self):
+        """Panel identifier of this device"""
+        return f"{self.name} ({self.address})"
+
+    def notification_handler(self, sender, data):
+        """
+        Bluetooth callback function
+        Replaces USB serial.read() in vcom_with_dashboard.py
+        """
+        self.notifications += 1
+        try:
+            text = data.decode('utf-8').strip()
+            if text:
+                # Convert to ECG value
+                ecg_value = int(text) / 255.0
+
+                # Send to this device's dashboard panel (same as USB version)
+                self.integration.process_new_sample(ecg_value)
+                self.samples_received += 1
+
+        except Exception as e:
+            self.decode_errors += 1
+            if self.decode_errors <= 10:
+                print(f"Error processing data from {self.label}: {e}")
+
+    def update_throughput(self):
+        """Recompute samples/s over the last measurement window (about one second)"""
+        now = time.monotonic()
+        if self.rate_window_start is None:
+            self.rate_window_start = now
+            self.rate_window_count = self.samples_received
+            return
+        elapsed = now - self.rate_window_start
+        if elapsed >= 1.0:
+            self.throughput = (self.samples_received - self.rate_window_count) / elapsed
+            self.rate_window_start = now
+            self.rate_window_count = self.samples_received
+
+    def get_stats(self):
+        """
+        Get throughput and drop statistics
+
+        Returns:
+            dict: Samples, throughput, decode errors and samples missing versus the nominal rate
+        """
+        missing = 0
+        if self.connect_time is not None:
+            end_time = self.disconnect_time if self.disconnect_time is not None else time.monotonic()
+            expected = (end_time - self.connect_time) * self.sampling_rate
+            missing = max(0, int(expected) - self.samples_received)
+        return {
+            'connected': self.connected,
+            'samples': self.samples_received,
+            'notifications': self.notifications,
+            'throughput': self.throughput,
+            'decode_errors': self.decode_errors,
+            'missing_vs_nominal': missing,
+        }
+
+    def status_text(self):
+        """Short status line for the dashboard panel title"""
+        stats = self.get_stats()
+        state = "connected" if stats['connected'] else "disconnected"
+        return (f"{state} | {stats['throughput']:.1f} samples/s | samples {stats['samples']} | "
+                f"decode errors {stats['decode_errors']} | missing {stats['missing_vs_nominal']}")
+
+
+async def scan_devices():
     """
-    Bluetooth callback function
-    Replaces USB serial.read() in vcom_with_dashboard.py
-    """
-    global dashboard_integration
-    try:
-        text = data.decode('utf-8').strip()
-        if text:
-            # Convert to ECG value
-            ecg_value = int(text) / 255.0
-
-            # Send to dashboard (same as USB version)
-            dashboard_integration.process_new_sample(ecg_value)
+    Scan for all boards advertising DEVICE_NAME
 
-    except Exception as e:
-        print(f"Error processing data: {e}")
-
-
-async def ble_connect():
+    Returns:
+        list: Found BLEDevice objects (at most MAX_DEVICES)
     """
-    Connect to Bluetooth device and receive data
-    Replaces USB serial connection in vcom_with_dashboard.py
-    """
-    global running
-
-    print("🔍 Scanning for ecg_sensor_bt...")
+    print(f"🔍 Scanning for {DEVICE_NAME}...")
 
     # Scan for devices
     devices = await BleakScanner.discover(timeout=10.0)
 
-    # Find target device
-    target = None
-    for d in devices:
-        if d.name == DEVICE_NAME:
-            target = d
-            print(f"✅ Found: {d.name} at {d.address}")
-            break
+    # Find target devices
+    targets = [d for d in devices if d.name == DEVICE_NAME][:MAX_DEVICES]
+    for d in targets:
+        print(f"✅ Found: {d.name} at {d.address}")
 
-    if not target:
+    if not targets:
         print("❌ Device not found!")
         print("Make sure:")
         print("  - Board is powered on")
         print("  - Bluetooth is enabled")
         print("  - No other app is connected to the board")
-        return
+    return targets
+
 
-    print(f"🔗 Connecting to {target.name}...")
+async def ble_connect(session, stop_event):
+    """
+    Connect to one Bluetooth device and receive data until stop_event is set
+    Replaces USB serial connection in vcom_with_dashboard.py
+    """
+    print(f"🔗 Connecting to {session.label}...")
 
     try:
         # Connect to device
-        async with BleakClient(target) as client:
-            print("✅ Connected!")
+        async with BleakClient(session.device) as client:
+            print(f"✅ Connected to {session.label}!")
 
             # Start receiving notifications
-            await client.start_notify(SPP_TX_CHAR_UUID, notification_handler)
-            print("✅ Receiving ECG data via Bluetooth...\n")
+            await client.start_notify(SPP_TX_CHAR_UUID, session.notification_handler)
+            session.connected = True
+            session.connect_time = time.monotonic()
+            session.disconnect_time = None
+            print(f"✅ Receiving ECG data from {session.label} via Bluetooth...\n")
 
             # Keep connection alive
-            while running:
+            while not stop_event.is_set() and client.is_connected:
+                session.update_throughput()
                 await asyncio.sleep(0.1)
 
     except Exception as e:
-        print(f"❌ Bluetooth error: {e}")
+        print(f"❌ Bluetooth error ({session.label}): {e}")
 
     finally:
-        print("\n📡 Bluetooth disconnected")
+        session.connected = False
+        if session.connect_time is not None:
+            session.disconnect_time = time.monotonic()
+        print(f"\n📡 Bluetooth disconnected: {session.label}")
+
+
+async def ble_connect_all(sessions, stop_event):
+    """Stream all devices concurrently from one asyncio loop"""
+    await asyncio.gather(*(ble_connect(session, stop_event) for session in sessions))
 
 
 def main():
     """
     Main function - Bluetooth version
     """
-    global dashboard_integration, running
-
     print("=" * 70)
     print("  BLE ECG Dashboard")
     print("  Bluetooth version of vcom_with_dashboard.py")
     print("=" * 70)
     print()
 
-    # Create dashboard (same as USB version)
+    # Find the boards first: the dashboard gets one panel per board
+    devices = asyncio.run(scan_devices())
+    if not devices:
+        return
+
+    # Create dashboard (same as USB version, one panel per device)
     print("Initializing ECG Dashboard...")
-    dashboard = ECGDashboard(window_size=1250, sampling_rate=125)
-    dashboard_integration = ECGDashboardIntegration(dashboard)
-    print("✅ Dashboard initialized\n")
+    labels = [f"{d.name} ({d.address})" for d in devices]
+    dashboard = ECGMultiDashboard(labels, window_size=1250, sampling_rate=SAMPLING_RATE)
+    sessions = []
+    for device, label in zip(devices, labels):
+        session = BLEDeviceSession(device, dashboard.panels[label])
+        dashboard.set_status_source(label, session.status_text)
+        sessions.append(session)
+    print(f"✅ Dashboard initialized with {len(sessions)} panel(s)\n")
+
+    # Start Bluetooth in background thread (one asyncio loop for all devices)
+    stop_event = threading.Event()
 
-    # Start Bluetooth in background thread
     def run_ble():
-        asyncio.run(ble_connect())
+        asyncio.run(ble_connect_all(sessions, stop_event))
 
-    print("Starting Bluetooth connection in background...")
+    print("Starting Bluetooth connections in background...")
     ble_thread = threading.Thread(target=run_ble, daemon=True, name="BLE-Thread")
     ble_thread.start()
 
     # Wait for connection to establish
-    print("Waiting for Bluetooth connection...")
+    print("Waiting for Bluetooth connections...")
     time.sleep(3)
 
     # Start dashboard in main thread (same as USB version)
@@ -124,19 +227,29 @@ def main():
     except KeyboardInterrupt:
         print("\n👋 Received Ctrl+C, stopping...")
     finally:
-        running = False
+        stop_event.set()
         if ble_thread.is_alive():
             print("Waiting for Bluetooth thread to finish...")
             ble_thread.join(timeout=2.0)
 
+    # Per-device summary
+    print("\n--- Per-device Summary ---")
+    for session in sessions:
+        stats = session.get_stats()
+        print(f"{session.label}: {stats['samples']} samples, {stats['decode_errors']} decode errors, "
+              f"{stats['missing_vs_nominal']} missing vs {session.sampling_rate} Hz")
+
     print("\n✅ Program finished")
 
 
 if __name__ == "__main__":
+    setup_logging('INFO')
     try:
         main()
     except Exception as e:
         print(f"\n❌ Fatal error: {e}")
         import traceback
 
-        traceback.print_exc()
\ No newline at end of file
+        traceback.print_exc()
+    finally:
+        shutdown_logging()
@@ -0,0 +1,310 @@
+"""
+Batch regression runner
+Streams one or more datasets through boards or simulators unattended, one
+worker process per dataset, records every detection window with its R-peak
+set and 7-class probability vector, and writes a columnar per-window report
+(NumPy .npz, one array per column) plus summary statistics per dataset.
+"""
+
+import argparse
+import contextlib
+import csv
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from ecg_board_simulator import ECGBoardSimulator
+from ecg_flow_control import CreditWindow
+from ecg_integration import ECGSerialDashboardIntegration
+from ecg_logging import setup_logging, shutdown_logging
+from ecg_prediction_store import CLASS_NAMES
+from ecg_recorder import SegmentRecorder
+from vcom_headless import run_paced
+from vcom_with_dashboard import connect_to_serial, load_csv_to_list
+
+
+class WindowReportRecorder(SegmentRecorder):
+    def __init__(self, sampling_rate=125):
+        """
+        Segment recorder keeping one report row per detection window
+
+        The firmware reports a detection window followed by its R-peaks, model
+        input window and probabilities, so R-peaks and predictions belong to the
+        most recent window. Windows without a prediction keep NaN probabilities.
+
+        Args:
+            sampling_rate (int): Sampling rate in Hz
+        """
+        super().__init__(sampling_rate, store_samples=False)
+        self.rows = {'window_start': [], 'window_end': [], 'model_start': [], 'model_end': []}
+        self.r_peak_sets = []
+        self.probabilities = []
+
+    def add_detection_window(self, start_index, end_index):
+        super().add_detection_window(start_index, end_index)
+        self.rows['window_start'].append(start_index)
+        self.rows['window_end'].append(end_index)
+        self.rows['model_start'].append(-1)
+        self.rows['model_end'].append(-1)
+        self.r_peak_sets.append([])
+        self.probabilities.append(None)
+
+    def add_r_peak_set(self, absolute_indices):
+        """All R-peaks the firmware reported for the latest detection window"""
+        if self.r_peak_sets:
+            self.r_peak_sets[-1] = list(absolute_indices)
+
+    def add_class_probabilities(self, start_index, end_index, probabilities):
+        """7-class probability vector of the latest model input window"""
+        super().add_class_probabilities(start_index, end_index, probabilities)
+        if self.probabilities:
+            self.rows['model_start'][-1] = start_index
+            self.rows['model_end'][-1] = end_index
+            self.probabilities[-1] = probabilities
+
+    def columns(self):
+        """
+        Report columns, one entry per detection window
+
+        R-peaks are stored flat: the peaks of window i are
+        r_peaks[r_peak_offsets[i]:r_peak_offsets[i + 1]].
+
+        Returns:
+            dict: Column name -> numpy.ndarray
+        """
+        count = len(self.r_peak_sets)
+        columns = {name: np.array(values, dtype=np.int64) for name, values in self.rows.items()}
+        columns['r_peak_count'] = np.array([len(peaks) for peaks in self.r_peak_sets], dtype=np.int64)
+        columns['r_peak_offsets'] = np.concatenate([[0], np.cumsum(columns['r_peak_count'])]).astype(np.int64)
+        columns['r_peaks'] = np.array([p for peaks in self.r_peak_sets for p in peaks], dtype=np.int64)
+        probabilities = np.full((count, len(CLASS_NAMES)), np.nan)
+        for i, vector in enumerate(self.probabilities):
+            if vector is not None:
+                probabilities[i] = vector[:len(CLASS_NAMES)]
+        columns['probabilities'] = probabilities
+        predicted = np.full(count, -1, dtype=np.int64)
+        has_prediction = ~np.isnan(probabilities).any(axis=1)
+        predicted[has_prediction] = probabilities[has_prediction].argmax(axis=1)
+        columns['predicted_class'] = predicted
+        return columns
+
+
+def run_dataset(job):
+    """
+    Stream one dataset through its board or simulator and record the report columns
+
+    Runs in a worker process. Samples go through the TX/RX threads paced by a
+    credit window (accelerated) or at interval_seconds when credit_window is None.
+
+    Args:
+        job (dict): 'name', 'dataset' (CSV path or sample list), 'port' ("SIM..." or "COMx"),
+                    optional 'baud_rate', 'credit_window', 'interval_seconds', 'repeat',
+                    'log_level' and 'log_path' (JSONL file receiving the worker's log records;
+                    only warnings reach the console)
+
+    Returns:
+        dict: name, dataset, port, samples, elapsed, columns (or error)
+    """
+    dataset = job['dataset']
+    data = (load_csv_to_list(dataset) if isinstance(dataset, str) else list(dataset)) * job.get('repeat', 1)
+    port = job.get('port', 'SIM')
+    result = {'name': job['name'], 'dataset': dataset if isinstance(dataset, str) else f"<{len(data)} samples>",
+              'port': port, 'samples': len(data)}
+    if port.upper().startswith('SIM'):
+        ser = ECGBoardSimulator(port=port)
+    else:
+        ser = connect_to_serial(port, job.get('baud_rate', 115200))
+        if ser is None:
+            result['error'] = f"could not open {port}"
+            return result
+
+    recorder = WindowReportRecorder()
+    credit_window = CreditWindow(job['credit_window']) if job.get('credit_window') else None
+    integration = ECGSerialDashboardIntegration(recorder, host_rpeak_detection=False, enable_filtering=False,
+                                                measure_latency=False, credit_window=credit_window)
+    # Set up before stdout is redirected, so warnings still reach the console
+    setup_logging(job.get('log_level', 'INFO'), jsonl_path=job.get('log_path'), console_level='WARNING')
+    start_time = time.perf_counter()
+    try:
+        # The TX/RX threads print progress; the parent prints the summary instead
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            run_paced(ser, data, integration, job.get('interval_seconds', 0.008))
+    finally:
+        shutdown_logging()
+        if ser.is_open:
+            ser.close()
+    result['elapsed'] = time.perf_counter() - start_time
+    result['columns'] = recorder.columns()
+    return result
+
+
+def summarize(result):
+    """
+    Summary statistics of one dataset's report columns
+
+    Returns:
+        dict: Window/prediction/R-peak counts, class counts, mean probability per class,
+              mean top probability, abnormal (non-Normal) fraction and replay rate
+    """
+    columns = result['columns']
+    predicted = columns['predicted_class']
+    has_prediction = predicted >= 0
+    probabilities = columns['probabilities'][has_prediction]
+    predictions = int(has_prediction.sum())
+    summary = {
+        'name': result['name'],
+        'dataset': result['dataset'],
+        'port': result['port'],
+        'samples': result['samples'],
+        'elapsed': result['elapsed'],
+        'samples_per_second': result['samples'] / result['elapsed'] if result['elapsed'] > 0 else None,
+        'detection_windows': len(predicted),
+        'predictions': predictions,
+        'r_peaks': len(columns['r_peaks']),
+        'mean_r_peaks_per_window': float(columns['r_peak_count'].mean()) if len(predicted) else None,
+        'class_counts': {name: int((predicted == i).sum()) for i, name in enumerate(CLASS_NAMES)},
+        'mean_probabilities': dict(zip(CLASS_NAMES, probabilities.mean(axis=0).tolist())) if predictions else {},
+        'mean_top_probability': float(probabilities.max(axis=1).mean()) if predictions else None,
+        'abnormal_fraction': float((predicted[has_prediction] != 0).mean()) if predictions else None,
+    }
+    return summary
+
+
+def run_batch(jobs, max_workers=None):
+    """
+    Run every dataset job in parallel, one worker process per job
+
+    Args:
+        jobs (list): Job dicts (see run_dataset); every job needs its own board or simulator
+        max_workers (int, optional): Worker processes (default: one per job)
+
+    Returns:
+        list: Per-job results in job order (with 'columns' unless 'error' is set)
+    """
+    print(f"🚀 Batch: {len(jobs)} dataset(s) in parallel")
+    with ProcessPoolExecutor(max_workers=max_workers or len(jobs)) as executor:
+        results = list(executor.map(run_dataset, jobs))
+    for result in results:
+        if 'error' in result:
+            print(f"❌ {result['name']}: {result['error']}")
+    return results
+
+
+def write_batch_report(results, report_dir):
+    """
+    Write the columnar per-window report and the per-dataset summary
+
+    <report_dir>/windows.npz holds the columns of all datasets concatenated, with a
+    'dataset' column indexing 'dataset_names' and R-peak offsets rebased across
+    datasets; <report_dir>/summary.csv has one row per dataset.
+
+    Returns:
+        list: Per-dataset summaries
+    """
+    os.makedirs(report_dir, exist_ok=True)
+    completed = [result for result in results if 'columns' in result]
+    summaries = [summarize(result) for result in completed]
+
+    merged = {}
+    peak_base = 0
+    for dataset_index, result in enumerate(completed):
+        columns = dict(result['columns'])
+        columns['dataset'] = np.full(len(columns['predicted_class']), dataset_index, dtype=np.int64)
+        # Offsets keep their closing entry only for the last dataset
+        columns['r_peak_offsets'] = columns['r_peak_offsets'][:-1] + peak_base
+        peak_base += len(columns['r_peaks'])
+        for name, values in columns.items():
+            merged.setdefault(name, []).append(values)
+    merged = {name: np.concatenate(values) for name, values in merged.items()}
+    if merged:
+        merged['r_peak_offsets'] = np.append(merged['r_peak_offsets'], peak_base)
+    np.savez_compressed(os.path.join(report_dir, 'windows.npz'),
+                        dataset_names=np.array([result['name'] for result in completed]),
+                        class_names=np.array(CLASS_NAMES), **merged)
+
+    with open(os.path.join(report_dir, 'summary.csv'), 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['name', 'dataset', 'port', 'samples', 'elapsed', 'samples_per_second', 'detection_windows',
+                         'predictions', 'r_peaks', 'mean_r_peaks_per_window', 'mean_top_probability',
+                         'abnormal_fraction'] + [f"count_{name}" for name in CLASS_NAMES]
+                        + [f"mean_p_{name}" for name in CLASS_NAMES])
+        for s in summaries:
+            writer.writerow([s['name'], s['dataset'], s['port'], s['samples'], f"{s['elapsed']:.2f}",
+                             f"{s['samples_per_second']:.0f}" if s['samples_per_second'] else '',
+                             s['detection_windows'], s['predictions'], s['r_peaks'],
+                             f"{s['mean_r_peaks_per_window']:.2f}" if s['mean_r_peaks_per_window'] is not None else '',
+                             f"{s['mean_top_probability']:.4f}" if s['mean_top_probability'] is not None else '',
+                             f"{s['abnormal_fraction']:.4f}" if s['abnormal_fraction'] is not None else '']
+                            + [s['class_counts'][name] for name in CLASS_NAMES]
+                            + [f"{s['mean_probabilities'][name]:.4f}" if s['mean_probabilities'] else ''
+                               for name in CLASS_NAMES])
+    print(f"📝 Batch report written to {report_dir} (windows.npz, summary.csv)")
+    return summaries
+
+
+def load_window_report(report_dir, dataset_name=None):
+    """
+    Read the per-window columns back, optionally of one dataset only
+
+    Returns:
+        dict: Column name -> numpy.ndarray (plus 'dataset_names' and 'class_names';
+              a single dataset's R-peak offsets are rebased to its own r_peaks)
+    """
+    with np.load(os.path.join(report_dir, 'windows.npz')) as report:
+        columns = {name: report[name] for name in report.files}
+    if dataset_name is None:
+        return columns
+    selected = columns['dataset'] == list(columns['dataset_names']).index(dataset_name)
+    offsets = columns['r_peak_offsets']
+    rows = np.flatnonzero(selected)
+    first, last = (rows[0], rows[-1]) if rows.size else (0, -1)
+    subset = {name: values[selected] for name, values in columns.items()
+              if name not in ('r_peaks', 'r_peak_offsets', 'dataset_names', 'class_names')}
+    subset['r_peaks'] = columns['r_peaks'][offsets[first]:offsets[last + 1]]
+    subset['r_peak_offsets'] = offsets[first:last + 2] - offsets[first]
+    subset['class_names'] = columns['class_names']
+    return subset
+
+
+def print_batch_summary(summaries):
+    """Print one block per dataset"""
+    print("\n--- Batch Regression Summary ---")
+    for s in summaries:
+        counts = ', '.join(f"{name}: {count}" for name, count in s['class_counts'].items() if count) or 'none'
+        rate = f"{s['samples_per_second']:.0f} samples/s" if s['samples_per_second'] else '--'
+        top = f"{s['mean_top_probability']:.3f}" if s['mean_top_probability'] is not None else '--'
+        abnormal = f"{s['abnormal_fraction'] * 100:.1f}%" if s['abnormal_fraction'] is not None else '--'
+        print(f"{s['name']} [{s['port']}, {s['dataset']}]: {s['samples']} samples in {s['elapsed']:.1f}s ({rate})")
+        print(f"  windows {s['detection_windows']} | predictions {s['predictions']} ({counts}) | "
+              f"R-peaks {s['r_peaks']} | mean top prob {top} | abnormal {abnormal}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Batch regression run over one or more datasets")
+    parser.add_argument('datasets', nargs='*', default=['Normal.csv', 'PVC.csv'], help="CSV datasets")
+    parser.add_argument('--ports', nargs='*', help="One port per dataset (default: a simulator each)")
+    parser.add_argument('--credit-window', type=int, default=500,
+                        help="Unacknowledged samples in flight (0 = paced at --interval)")
+    parser.add_argument('--interval', type=float, default=0.008, help="Sample interval when not accelerated")
+    parser.add_argument('--report-dir', default='batch_report', help="Output directory")
+    parser.add_argument('--log-level', default='INFO', help="Level of the per-dataset <name>.log.jsonl logs")
+    args = parser.parse_args()
+
+    ports = args.ports or [f"SIM{i + 1}" for i in range(len(args.datasets))]
+    if len(ports) != len(args.datasets):
+        parser.error("--ports needs one port per dataset")
+    batch_jobs = [{'name': os.path.splitext(os.path.basename(dataset))[0], 'dataset': dataset, 'port': port,
+                   'credit_window': args.credit_window or None, 'interval_seconds': args.interval,
+                   'log_level': args.log_level}
+                  for dataset, port in zip(args.datasets, ports)]
+    os.makedirs(args.report_dir, exist_ok=True)
+    for job in batch_jobs:
+        job['log_path'] = os.path.join(args.report_dir, f"{job['name']}.log.jsonl")
+    setup_logging('INFO')
+    try:
+        batch_results = run_batch(batch_jobs)
+        print_batch_summary(write_batch_report(batch_results, args.report_dir))
+    finally:
+        shutdown_logging()
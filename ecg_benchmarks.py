@@ -0,0 +1,342 @@
+"""
+Benchmark suite for the dashboard, parser, loader and transport hot paths
+Synthetic and CSV-derived inputs with fixed seeds; results are written as JSON
+so runs can be compared over time.
+
+    python ecg_benchmarks.py                       # full suite → benchmark_results/<timestamp>.json
+    python ecg_benchmarks.py --quick               # smaller sizes
+    python ecg_benchmarks.py --only parser loader  # selected groups
+    python ecg_benchmarks.py --compare old.json new.json
+"""
+
+import argparse
+import contextlib
+import csv
+import datetime
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+# Rendering benchmarks run off-screen
+os.environ.setdefault('MPLBACKEND', 'Agg')
+
+import numpy as np
+
+SEED = 1234
+BENCHMARK_GROUPS = ('dashboard', 'parser', 'loader', 'transport')
+
+
+def time_call(function, repeat=5, slow_seconds=1.0, setup=None):
+    """
+    Time a callable (one warm-up run; a warm-up slower than slow_seconds is the only measurement)
+
+    setup, when given, runs untimed before every call (e.g. to reset state the call accumulates).
+
+    Returns:
+        dict: min/median/max seconds over the measured runs
+    """
+    if setup:
+        setup()
+    start = time.perf_counter()
+    function()
+    warmup = time.perf_counter() - start
+    if warmup > slow_seconds:
+        return {'min_s': warmup, 'median_s': warmup, 'max_s': warmup, 'repeat': 1}
+    timings = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return {'min_s': min(timings), 'median_s': statistics.median(timings), 'max_s': max(timings), 'repeat': repeat}
+
+
+def synthetic_ecg(num_samples, rng):
+    """ECG-like signal: the built-in PVC record tiled to length with a little noise"""
+    from vcom_with_dashboard import ecg_data_PVC
+    base = np.asarray(ecg_data_PVC)
+    signal = np.resize(base, num_samples)
+    return signal + rng.normal(0, 0.005, num_samples)
+
+
+def synthetic_segments(num_samples, num_segments, rng):
+    """Detection windows, model segments and R-peaks spread evenly over the record"""
+    starts = np.sort(rng.integers(0, max(1, num_samples - 250), num_segments))
+    classes = ["Normal", "PVC", "Model Input"]
+    return {
+        'detection_windows': [(int(s), int(s) + 249) for s in starts],
+        'model_segments': [(int(s) + 50, int(s) + 149, classes[i % 3], 0.9) for i, s in enumerate(starts)],
+        'r_peaks': [int(s) + 125 for s in starts],
+    }
+
+
+# --- dashboard ---------------------------------------------------------------
+
+def clear_highlights(dashboard):
+    """Remove the highlight artists, as update_plot does before redrawing them"""
+    for patch in dashboard.highlight_patches:
+        patch.remove()
+    dashboard.highlight_patches.clear()
+
+
+def bench_dashboard(quick=False):
+    """update_plot, draw_highlights and a full frame (update + canvas draw) in follow and history views"""
+    import matplotlib.pyplot as plt
+    from ecg_dashboard import ECGDashboard
+
+    rng = np.random.default_rng(SEED)
+    sample_sizes = [10_000, 100_000] if quick else [10_000, 100_000, 1_000_000, 10_000_000]
+    segment_counts = [10, 1_000] if quick else [10, 1_000, 100_000]
+    results = []
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        for num_samples in sample_sizes:
+            signal = synthetic_ecg(num_samples, rng)
+            for num_segments in segment_counts:
+                if num_segments * 100 > num_samples:
+                    continue  # Denser than one segment per 100 samples: not reachable with 125-sample window hops
+                dashboard = ECGDashboard(window_size=1250, sampling_rate=125)
+                dashboard.raw_store.append_block(signal)
+                dashboard.filtered_store.append_block(signal)
+                dashboard.sample_count = num_samples
+                dashboard.segments.update(synthetic_segments(num_samples, num_segments, rng))
+
+                entry = {'samples': num_samples, 'segments': num_segments}
+                entry['update_plot'] = time_call(lambda: dashboard.update_plot(0))
+                # Without clearing, every call would add its artists on top of the previous ones
+                entry['draw_highlights'] = time_call(dashboard.draw_highlights,
+                                                     setup=lambda: clear_highlights(dashboard))
+                clear_highlights(dashboard)
+                entry['frame'] = time_call(lambda: (dashboard.update_plot(0), dashboard.fig.canvas.draw()), repeat=3)
+
+                # Historical view in the middle of the record
+                dashboard.follow_mode = False
+                middle = num_samples / 2 / 125
+                dashboard.manual_xlim = (middle, middle + dashboard.time_window)
+                entry['update_plot_history'] = time_call(lambda: dashboard.update_plot(0))
+                plt.close(dashboard.fig)
+                results.append(entry)
+                print(f"dashboard {num_samples} samples / {num_segments} segments: "
+                      f"update_plot {entry['update_plot']['median_s'] * 1000:.2f} ms", file=sys.stderr)
+    return results
+
+
+# --- parser ------------------------------------------------------------------
+
+def capture_log(num_samples, rng):
+    """
+    Capture MCU responses for a synthetic record from the board simulator
+
+    Returns:
+        list: (samples_sent, line) tuples in arrival order
+    """
+    from ecg_board_simulator import ECGBoardSimulator
+    simulator = ECGBoardSimulator()
+    log = []
+    buffer = ""
+    for index, value in enumerate(synthetic_ecg(num_samples, rng)):
+        simulator.write(f"{value:.4f}\0".encode('utf-8'))
+        if simulator.outgoing:
+            buffer += simulator.read(simulator.in_waiting).decode('utf-8')
+            *lines, buffer = buffer.split('\r\n')
+            log.extend((index + 1, line) for line in lines if line)
+    return log
+
+
+def load_log(path):
+    """Captured log file: one MCU line per row, optionally prefixed with '<samples_sent>\\t'"""
+    log = []
+    with open(path, encoding='utf-8', errors='ignore') as f:
+        for row in f:
+            row = row.rstrip('\r\n')
+            if not row:
+                continue
+            count, sep, line = row.partition('\t')
+            log.append((int(count), line) if sep and count.isdigit() else (0, row))
+    return log
+
+
+def bench_parser(quick=False, log_path=None):
+    """process_serial_response throughput on a captured (or simulated) response log"""
+    from ecg_integration import ECGSerialDashboardIntegration
+    from ecg_recorder import SegmentRecorder
+
+    rng = np.random.default_rng(SEED)
+    log = load_log(log_path) if log_path else capture_log(20_000 if quick else 200_000, rng)
+
+    def run():
+        integration = ECGSerialDashboardIntegration(SegmentRecorder(store_samples=False), host_rpeak_detection=False,
+                                                    enable_filtering=False, measure_latency=False)
+        received_time = time.perf_counter()
+        for samples_sent, line in log:
+            integration.process_serial_response(line, received_time, samples_sent)
+
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        timing = time_call(run, repeat=3)
+    result = {'source': log_path or 'simulator', 'lines': len(log), **timing,
+              'lines_per_s': len(log) / timing['median_s']}
+    print(f"parser: {result['lines_per_s']:.0f} lines/s", file=sys.stderr)
+    return result
+
+
+# --- loader ------------------------------------------------------------------
+
+def bench_loader(quick=False):
+    """load_csv_to_list on the repo CSVs and on synthetic CSVs"""
+    from vcom_with_dashboard import load_csv_to_list
+
+    rng = np.random.default_rng(SEED)
+    results = []
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        for filename in ('Normal.csv', 'PVC.csv'):
+            if os.path.exists(filename):
+                rows = len(load_csv_to_list(filename))
+                results.append({'file': filename, 'rows': rows, **time_call(lambda: load_csv_to_list(filename))})
+
+        with tempfile.TemporaryDirectory() as tmp:
+            for rows in ([100_000] if quick else [100_000, 1_000_000]):
+                path = os.path.join(tmp, f'synthetic_{rows}.csv')
+                with open(path, 'w', newline='') as f:
+                    writer = csv.writer(f)
+                    writer.writerow(['ecg'])
+                    writer.writerows([f"{v:.4f}"] for v in synthetic_ecg(rows, rng))
+                results.append({'file': f'synthetic_{rows}.csv', 'rows': rows,
+                                **time_call(lambda: load_csv_to_list(path), repeat=3)})
+    for entry in results:
+        print(f"loader {entry['file']}: {entry['median_s'] * 1000:.1f} ms", file=sys.stderr)
+    return results
+
+
+# --- transport ---------------------------------------------------------------
+
+class TimestampingPort:
+    def __init__(self):
+        """Serial port stand-in recording the time of every write"""
+        self.is_open = True
+        self.write_times = []
+
+    def write(self, data):
+        self.write_times.append(time.perf_counter())
+        return len(data)
+
+
+def bench_transport(quick=False, interval_seconds=0.008):
+    """TX scheduler timing accuracy: interval jitter and cumulative drift of transmit_thread_with_dashboard"""
+    from vcom_with_dashboard import transmit_thread_with_dashboard
+
+    num_samples = 500 if quick else 2500
+    port = TimestampingPort()
+    data = list(synthetic_ecg(num_samples, np.random.default_rng(SEED)))
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        thread = threading.Thread(target=transmit_thread_with_dashboard,
+                                  args=(port, data, interval_seconds, threading.Event(), None))
+        thread.start()
+        thread.join()
+
+    times = np.asarray(port.write_times)
+    intervals = np.diff(times) * 1000
+    target_ms = interval_seconds * 1000
+    drift_ms = (times[-1] - times[0]) * 1000 - target_ms * (len(times) - 1)
+    result = {
+        'samples': len(times),
+        'target_interval_ms': target_ms,
+        'mean_interval_ms': float(intervals.mean()),
+        'std_interval_ms': float(intervals.std()),
+        'p99_abs_error_ms': float(np.percentile(np.abs(intervals - target_ms), 99)),
+        'max_abs_error_ms': float(np.abs(intervals - target_ms).max()),
+        'total_drift_ms': float(drift_ms),
+        'achieved_rate_hz': float((len(times) - 1) / (times[-1] - times[0])),
+    }
+    print(f"transport: mean {result['mean_interval_ms']:.3f} ms, drift {drift_ms:.1f} ms over {len(times)} samples",
+          file=sys.stderr)
+    return result
+
+
+# --- results -----------------------------------------------------------------
+
+def environment_info():
+    info = {'python': platform.python_version(), 'platform': platform.platform(), 'numpy': np.__version__,
+            'processor': platform.processor(), 'cpu_count': os.cpu_count()}
+    try:
+        import matplotlib
+        info['matplotlib'] = matplotlib.__version__
+    except ImportError:
+        pass
+    return info
+
+
+def run_benchmarks(groups=BENCHMARK_GROUPS, quick=False, log_path=None, output_dir='benchmark_results'):
+    """
+    Run the selected benchmark groups and store the results as JSON
+
+    Returns:
+        str: Path of the results file
+    """
+    results = {'timestamp': datetime.datetime.now().isoformat(timespec='seconds'), 'quick': quick, 'seed': SEED,
+               'environment': environment_info(), 'benchmarks': {}}
+    for group in groups:
+        if group == 'dashboard':
+            results['benchmarks']['dashboard'] = bench_dashboard(quick)
+        elif group == 'parser':
+            results['benchmarks']['parser'] = bench_parser(quick, log_path)
+        elif group == 'loader':
+            results['benchmarks']['loader'] = bench_loader(quick)
+        elif group == 'transport':
+            results['benchmarks']['transport'] = bench_transport(quick)
+
+    os.makedirs(output_dir, exist_ok=True)
+    path = os.path.join(output_dir, datetime.datetime.now().strftime('%Y%m%d_%H%M%S') + '.json')
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"📝 Benchmark results written to {path}")
+    return path
+
+
+def flatten(results):
+    """Flatten a results file into {metric name: value} for comparison"""
+    flat = {}
+    benchmarks = results['benchmarks']
+    for entry in benchmarks.get('dashboard', []):
+        for key in ('update_plot', 'draw_highlights', 'frame', 'update_plot_history'):
+            flat[f"dashboard.{key}[{entry['samples']}/{entry['segments']}]"] = entry[key]['median_s']
+    if 'parser' in benchmarks:
+        flat['parser.seconds'] = benchmarks['parser']['median_s']
+    for entry in benchmarks.get('loader', []):
+        flat[f"loader[{entry['file']}]"] = entry['median_s']
+    if 'transport' in benchmarks:
+        flat['transport.p99_abs_error_ms'] = benchmarks['transport']['p99_abs_error_ms']
+        flat['transport.abs_drift_ms'] = abs(benchmarks['transport']['total_drift_ms'])
+    return flat
+
+
+def compare_results(old_path, new_path):
+    """Print new/old ratios of every metric present in both files (lower is better for all)"""
+    with open(old_path) as f:
+        old = flatten(json.load(f))
+    with open(new_path) as f:
+        new = flatten(json.load(f))
+    print(f"{'metric':<55} {'old':>12} {'new':>12} {'new/old':>8}")
+    for name in sorted(set(old) & set(new)):
+        ratio = new[name] / old[name] if old[name] else float('nan')
+        flag = '  ⚠️' if ratio > 1.1 else ''
+        print(f"{name:<55} {old[name]:>12.6g} {new[name]:>12.6g} {ratio:>8.2f}{flag}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="ECG dashboard benchmark suite")
+    parser.add_argument('--quick', action='store_true', help="smaller sizes for a fast check")
+    parser.add_argument('--only', nargs='+', choices=BENCHMARK_GROUPS, default=list(BENCHMARK_GROUPS))
+    parser.add_argument('--log', help="captured MCU response log for the parser benchmark")
+    parser.add_argument('--output-dir', default='benchmark_results')
+    parser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'), help="compare two results files")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare_results(*args.compare)
+    else:
+        run_benchmarks(args.only, args.quick, args.log, args.output_dir)
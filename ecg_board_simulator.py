@@ -0,0 +1,166 @@
+"""
+Silicon Labs board simulator
+Pyserial-like stand-in for a board: accepts samples in the same format the TX
+thread sends them and answers with firmware-style messages (detection windows,
+R-peaks, model input windows and 7-class probabilities).
+"""
+
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+from ecg_sample_store import SampleStore
+
+
+class ECGBoardSimulator:
+    def __init__(self, port='SIM', buffer_size=625, window_size=250, window_hop=125,
+                 sampling_rate=125, processing_delay=0.0):
+        """
+        Simulated board on a virtual serial port
+
+        Args:
+            port (str): Name reported as the port
+            buffer_size (int): Size of the simulated circular buffer (indices wrap at this size)
+            window_size (int): Detection window length in samples
+            window_hop (int): Samples between two detection windows
+            sampling_rate (int): Sampling rate in Hz (R-peak spacing limits)
+            processing_delay (float): Seconds before a response becomes readable
+        """
+        self.port = port
+        self.is_open = True
+        self.buffer_size = buffer_size
+        self.window_size = window_size
+        self.window_hop = window_hop
+        self.sampling_rate = sampling_rate
+        self.processing_delay = processing_delay
+
+        self.samples = SampleStore()
+        self.partial_message = ''
+        self.outgoing = deque()  # (ready_time, encoded line)
+        self.inference_count = 0
+        self.lock = threading.Lock()
+
+    # --- pyserial-like interface -------------------------------------------
+
+    def write(self, data):
+        """Receive null-terminated sample messages from the host"""
+        text = self.partial_message + data.decode('utf-8', errors='ignore')
+        messages = text.split('\0')
+        self.partial_message = messages.pop()
+        values = []
+        for message in messages:
+            try:
+                values.append(float(message))
+            except ValueError:
+                continue
+        if values:
+            self.receive_samples(values)
+        return len(data)
+
+    @property
+    def in_waiting(self):
+        """Number of response bytes ready to be read"""
+        now = time.perf_counter()
+        with self.lock:
+            return sum(len(line) for ready_time, line in self.outgoing if ready_time <= now)
+
+    def read(self, size=1):
+        """Read up to size bytes of ready responses"""
+        now = time.perf_counter()
+        chunks = []
+        total = 0
+        with self.lock:
+            while self.outgoing and self.outgoing[0][0] <= now and total < size:
+                ready_time, line = self.outgoing.popleft()
+                if total + len(line) > size:
+                    # Return the part that fits, keep the rest readable
+                    keep = size - total
+                    chunks.append(line[:keep])
+                    self.outgoing.appendleft((ready_time, line[keep:]))
+                    total = size
+                    break
+                chunks.append(line)
+                total += len(line)
+        return b''.join(chunks)
+
+    def close(self):
+        self.is_open = False
+
+    # --- simulated firmware ---------------------------------------------------
+
+    def receive_samples(self, values):
+        """Store samples and emit a detection window every window_hop samples"""
+        before = len(self.samples)
+        self.samples.append_block(values)
+        after = len(self.samples)
+        for count in range(before + 1, after + 1):
+            if count >= self.window_size and (count - self.window_size) % self.window_hop == 0:
+                self.emit_window(count - self.window_size)
+
+    def emit_window(self, absolute_start):
+        """Produce the firmware messages for the detection window starting at absolute_start"""
+        window = self.samples.get_range(absolute_start, absolute_start + self.window_size - 1)
+        buffer_start = absolute_start % self.buffer_size
+        lines = [f"Equivalent to indices {buffer_start} to {buffer_start + self.window_size - 1}"]
+
+        peaks = self.find_r_peaks(window)
+        lines.append(f"R-peaks: {len(peaks)} indices: " + ' '.join(str(p) for p in peaks))
+
+        if len(peaks) >= 2:
+            # Model input window around the second R-peak, as the dashboard highlights it
+            model_start = max(0, peaks[1] - 40)
+            model_len = min(100, self.window_size - model_start)
+            lines.append(f"Model input window: start {model_start} len {model_len}")
+            probabilities = self.classify(peaks)
+            self.inference_count += 1
+            lines.append(f"ECG inference {self.inference_count} probs: " +
+                         ' '.join(f"{p:.4f}" for p in probabilities))
+
+        ready_time = time.perf_counter() + self.processing_delay
+        with self.lock:
+            for line in lines:
+                self.outgoing.append((ready_time, (line + '\r\n').encode('utf-8')))
+
+    def find_r_peaks(self, window):
+        """
+        Simple amplitude-threshold R-peak finder
+
+        Args:
+            window (numpy.ndarray): Detection window samples
+
+        Returns:
+            list: R-peak indices relative to the window start
+        """
+        threshold = window.min() + 0.6 * (window.max() - window.min())
+        middle = window[1:-1]
+        candidates = np.flatnonzero((middle >= window[:-2]) & (middle > window[2:]) & (middle > threshold)) + 1
+        min_distance = int(0.25 * self.sampling_rate)
+        peaks = []
+        for index in candidates:
+            if peaks and index - peaks[-1] < min_distance:
+                if window[index] > window[peaks[-1]]:
+                    peaks[-1] = int(index)
+                continue
+            peaks.append(int(index))
+        return peaks
+
+    def classify(self, peaks):
+        """
+        Toy 7-class classifier: a premature second beat followed by a pause scores as PVC
+
+        Args:
+            peaks (list): R-peak indices relative to the window start
+
+        Returns:
+            numpy.ndarray: Probabilities for Normal, Abnormal, LBBB, RBBB, PVC, MI, CHF
+        """
+        scores = np.array([2.0, -1.0, -2.0, -2.0, -1.0, -2.5, -2.5])
+        if len(peaks) >= 3:
+            rr_before = peaks[1] - peaks[0]
+            rr_after = peaks[2] - peaks[1]
+            if rr_before < 0.85 * rr_after:
+                scores[4] = 3.0  # Premature beat with compensatory pause
+        exp_scores = np.exp(scores - scores.max())
+        return exp_scores / exp_scores.sum()
@@ -1,78 +1,104 @@
+import os
 import matplotlib
-# Try different backends in order of preference
-try:
-    matplotlib.use('TkAgg')  # Most reliable for Windows
-except ImportError:
+# Try different backends in order of preference (an explicit MPLBACKEND, e.g. Agg for benchmarks, wins)
+if not os.environ.get('MPLBACKEND'):
     try:
-        matplotlib.use('Qt5Agg')  # Alternative GUI backend
+        matplotlib.use('TkAgg')  # Most reliable for Windows
     except ImportError:
-        matplotlib.use('Agg')  # Fallback (no display)
-        print("Warning: No GUI backend available, plots will not display")
+        try:
+            matplotlib.use('Qt5Agg')  # Alternative GUI backend
+        except ImportError:
+            matplotlib.use('Agg')  # Fallback (no display)
+            print("Warning: No GUI backend available, plots will not display")
 
 import matplotlib.pyplot as plt
 import matplotlib.animation as animation
 from matplotlib.patches import Rectangle, Circle
 import numpy as np
-from collections import deque
 import threading
 import time
-from queue import Queue
 
-class ECGDashboard:
-    def __init__(self, window_size=1250, sampling_rate=125):
+from ecg_dashboard_base import ECGDashboardBase, CLASS_COLORS
+
+
+class ECGDashboard(ECGDashboardBase):
+    def __init__(self, window_size=1250, sampling_rate=125, show_filtered=True, filtered_offset=0.5,
+                 fig=None, ax=None, title=None, show_queue_overlay=False,
+                 data_queue_size=256, data_queue_policy='coalesce',
+                 retention_seconds=None, retention_count=None, spill_dir=None, show_overview=True,
+                 show_probabilities=True, event_min_probability=None):
         """
         ECG Real-time Dashboard
         
         Args:
             window_size (int): Number of samples to display in the scrolling window
             sampling_rate (int): Sampling rate in Hz (for time axis)
+            show_filtered (bool): Plot the filtered trace next to the raw trace (toggle with 'f')
+            filtered_offset (float): Vertical offset of the (zero-mean) filtered trace
+            fig (Figure, optional): Existing figure to draw into (e.g. one panel of ECGMultiDashboard)
+            ax (Axes, optional): Existing axis to draw into, required together with fig
+            title (str, optional): Axis title (used to label panels of a shared figure)
+            show_queue_overlay (bool): Show queue depth/backlog telemetry in the plot (toggle with 'b')
+            data_queue_size (int): Bound of the sample queue in messages (0 = unbounded)
+            data_queue_policy (str): What a full sample queue does: 'coalesce' (merge pending blocks,
+                                     lossless), 'drop_oldest' (oldest samples become a NaN gap) or
+                                     'block' (the producer waits). Segment events are never dropped.
+            retention_seconds (float, optional): Segment history kept in memory, in seconds (None = all)
+            retention_count (int, optional): Segments kept in memory per kind (None = all)
+            spill_dir (str, optional): Directory receiving evicted segments, still drawn when navigating back
+            show_overview (bool): Whole-session overview strip under the plot (own figure only)
+            show_probabilities (bool): Panel with the 7-class probability traces (own figure only)
+            event_min_probability (float, optional): Predictions below this probability are skipped by
+                                                     the jump-to-event keys ('.', ',')
         """
         print(f"ECG Dashboard initializing with matplotlib backend: {matplotlib.get_backend()}")
-        self.window_size = window_size
-        self.sampling_rate = sampling_rate
-        self.time_window = window_size / sampling_rate  # seconds
-        
-        # Data storage
-        self.ecg_data = deque(maxlen=window_size)  # Scrolling window for real-time display
-        self.time_data = deque(maxlen=window_size)  # Scrolling window for real-time display
-        
-        # Permanent historical data storage (no length limit)
-        self.all_ecg_data = []      # All ECG samples for historical navigation
-        self.all_time_data = []     # All time points for historical navigation
-        self.sample_count = 0
-        
-        # Segment tracking for highlighting
-        self.segments = {
-            'r_peaks': [],          # List of R-peak indices
-            'detection_windows': [], # List of (start, end) tuples for detection windows
-            'model_segments': [],   # List of (start, end, class, probability) tuples
-        }
-        
-        # Colors for different highlights
-        self.colors = {
-            'r_peaks': 'red',
-            'detection_windows': 'lightcoral',
-            'model_segments': 'lightblue',
-            'ecg_line': 'blue'
-        }
-        
-        # Thread-safe data queue
-        self.data_queue = Queue()
-        self.segment_queue = Queue()
+        super().__init__(window_size=window_size, sampling_rate=sampling_rate, show_filtered=show_filtered,
+                         filtered_offset=filtered_offset, show_queue_overlay=show_queue_overlay,
+                         data_queue_size=data_queue_size, data_queue_policy=data_queue_policy,
+                         retention_seconds=retention_seconds, retention_count=retention_count, spill_dir=spill_dir,
+                         event_min_probability=event_min_probability)
         
         # Setup the plot
-        self.setup_plot()
+        self.show_overview = show_overview and (fig is None or ax is None)
+        self.show_probabilities = show_probabilities and (fig is None or ax is None)
+        self.setup_plot(fig, ax, title)
         
         # Animation object (will be set when starting)
         self.animation = None
         
-    def setup_plot(self):
-        """Initialize the matplotlib figure and axis"""
-        self.fig, self.ax = plt.subplots(figsize=(15, 8))
-        self.fig.suptitle('Real-time ECG Dashboard - Use mouse to pan/zoom, keys for navigation', fontsize=14, fontweight='bold')
+    def setup_plot(self, fig=None, ax=None, title=None):
+        """
+        Initialize the matplotlib figure and axis
+        
+        Args:
+            fig (Figure, optional): Existing figure (a new one is created if None)
+            ax (Axes, optional): Existing axis inside fig
+            title (str, optional): Axis title
+        """
+        self.overview_ax = None
+        self.prob_ax = None
+        if fig is None or ax is None:
+            # Main plot, then the optional probability panel and overview strip
+            panels = ['main'] + ['probabilities'] * self.show_probabilities + ['overview'] * self.show_overview
+            ratios = {'main': 7, 'probabilities': 2, 'overview': 1}
+            self.fig, axes = plt.subplots(len(panels), 1, figsize=(15, 8 + 1.5 * self.show_probabilities),
+                                          gridspec_kw={'height_ratios': [ratios[p] for p in panels],
+                                                       'hspace': 0.35}, squeeze=False)
+            axes = dict(zip(panels, axes[:, 0]))
+            self.ax = axes['main']
+            self.prob_ax = axes.get('probabilities')
+            self.overview_ax = axes.get('overview')
+            self.fig.suptitle('Real-time ECG Dashboard - Use mouse to pan/zoom, keys for navigation', fontsize=14, fontweight='bold')
+        else:
+            self.fig, self.ax = fig, ax
+        if title:
+            self.ax.set_title(title, fontsize=12, loc='left')
         
         # Initialize empty line for ECG data
         self.ecg_line, = self.ax.plot([], [], color=self.colors['ecg_line'], linewidth=1.2, label='ECG Signal')
+        self.filtered_line, = self.ax.plot([], [], color=self.colors['filtered_line'], linewidth=1.0,
+                                           alpha=0.8, label='Filtered ECG')
+        self.filtered_line.set_visible(self.show_filtered)
         
         # Setup axis properties
         self.ax.set_xlim(0, self.time_window)
@@ -97,12 +123,70 @@ class ECGDashboard:
         #                             transform=self.ax.transAxes, fontsize=7,
         #                             bbox=dict(boxstyle='round', facecolor='lightblue', alpha=0.7))
         
+        # Heart-rate / HRV text panel (fed by attach_hrv_stats)
+        self.hrv_text = self.ax.text(0.01, 0.98, '', transform=self.ax.transAxes, fontsize=10,
+                                     family='monospace', verticalalignment='top',
+                                     bbox=dict(boxstyle='round', facecolor='honeydew', alpha=0.8))
+        self.hrv_text.set_visible(False)
+        
+        # Queue telemetry overlay (refreshed every few frames)
+        self.queue_text = self.ax.text(0.99, 0.02, '', transform=self.ax.transAxes, fontsize=8,
+                                       family='monospace', ha='right', va='bottom',
+                                       bbox=dict(boxstyle='round', facecolor='whitesmoke', alpha=0.8))
+        self.queue_text.set_visible(False)
+        self.queue_frame = 0
+        
+        # Latency histogram window (created by attach_latency_tracker)
+        self.latency_tracker = None
+        self.latency_fig = None
+        self.latency_frame = 0
+        
         # Storage for highlight patches
         self.highlight_patches = []
+
+        # Whole-session overview strip (drawn from the fixed-size overview summary)
+        if self.overview_ax is not None:
+            self.setup_overview()
         
-        # Navigation state
-        self.follow_mode = True  # True = auto-follow latest data, False = manual navigation
-        self.manual_xlim = None  # Store manual x-limits when not following
+        # Probability traces of the predictions in view (x axis shared with the main plot)
+        if self.prob_ax is not None:
+            self.setup_probability_panel()
+
+    def setup_probability_panel(self):
+        """Probability panel: one trace per class at the window centers"""
+        ax = self.prob_ax
+        ax.sharex(self.ax)
+        self.ax.tick_params(labelbottom=False)
+        self.ax.set_xlabel('')
+        ax.set_xlabel('Time (seconds)', fontsize=14)
+        ax.set_ylabel('P(class)', fontsize=12)
+        ax.set_ylim(-0.02, 1.05)
+        ax.grid(True, alpha=0.3)
+        self.prob_lines = [ax.plot([], [], color=CLASS_COLORS[name], linewidth=1.0, marker='o', markersize=3,
+                                   label=name)[0] for name in self.predictions.class_names]
+        ax.legend(loc='upper left', ncol=len(self.prob_lines), fontsize=8)
+        self.prob_key = None
+
+    def setup_overview(self):
+        """Overview axis: min/max envelope, abnormal-prediction density band, draggable viewport"""
+        ax = self.overview_ax
+        ax.set_navigate(False)  # Pan/zoom tools act on the main plot only
+        ax.set_yticks([])
+        ax.tick_params(axis='x', labelsize=8)
+        ax.set_xlim(0, self.time_window)
+        self.overview_line, = ax.plot([], [], color=self.colors['ecg_line'], linewidth=0.6)
+        # Fraction of non-Normal predictions per bin, as a strip along the bottom
+        self.overview_density = ax.imshow(np.full((1, self.overview.num_bins), np.nan), aspect='auto',
+                                          cmap='Reds', vmin=0, vmax=1, interpolation='nearest',
+                                          extent=(0, self.overview.span(self.sampling_rate), 0, 1), zorder=0)
+        self.overview_viewport = Rectangle((0, 0), self.time_window, 1, transform=ax.get_xaxis_transform(),
+                                           facecolor='gold', edgecolor='darkgoldenrod', alpha=0.35, zorder=5)
+        ax.add_patch(self.overview_viewport)
+        self.overview_version = None
+        self.overview_frame = 0
+        self.overview_drag = None  # (grab offset, view width) while dragging the viewport
+        self.fig.canvas.mpl_connect('motion_notify_event', self.on_overview_drag)
+        self.fig.canvas.mpl_connect('button_release_event', self.on_overview_release)
 
     def setup_navigation(self):
         """Setup interactive navigation capabilities"""
@@ -120,59 +204,26 @@ class ECGDashboard:
         if event.key is None:
             return
             
-        current_xlim = self.ax.get_xlim()
-        window_size = current_xlim[1] - current_xlim[0]
-        
-        if event.key == 'left':
-            # Scroll left
-            self.follow_mode = False
-            new_xlim = (current_xlim[0] - window_size * 0.1, current_xlim[1] - window_size * 0.1)
-            self.ax.set_xlim(new_xlim)
-            self.manual_xlim = new_xlim
-            self.fig.canvas.draw()
-            
-        elif event.key == 'right':
-            # Scroll right
-            self.follow_mode = False
-            new_xlim = (current_xlim[0] + window_size * 0.1, current_xlim[1] + window_size * 0.1)
-            self.ax.set_xlim(new_xlim)
-            self.manual_xlim = new_xlim
-            self.fig.canvas.draw()
-            
-        elif event.key == 'up':
-            # Zoom in (decrease window size)
-            center = (current_xlim[0] + current_xlim[1]) / 2
-            new_window_size = window_size * 0.8
-            new_xlim = (center - new_window_size/2, center + new_window_size/2)
-            self.ax.set_xlim(new_xlim)
-            if not self.follow_mode:
-                self.manual_xlim = new_xlim
-            self.fig.canvas.draw()
+        if event.key in ('left', 'right', 'up', 'down', 'r', ' ', '.', ',', 'e'):
+            # Scroll/zoom/follow/jump semantics are shared with the other backends
+            new_xlim = self.navigate(event.key, self.ax.get_xlim())
+            if new_xlim is not None:
+                self.ax.set_xlim(new_xlim)
+                # Coalesced with the next animation frame instead of a synchronous full redraw
+                self.fig.canvas.draw_idle()
             
-        elif event.key == 'down':
-            # Zoom out (increase window size)
-            center = (current_xlim[0] + current_xlim[1]) / 2
-            new_window_size = window_size * 1.25
-            new_xlim = (center - new_window_size/2, center + new_window_size/2)
-            self.ax.set_xlim(new_xlim)
-            if not self.follow_mode:
-                self.manual_xlim = new_xlim
-            self.fig.canvas.draw()
+        elif event.key == 'f':
+            # Toggle the filtered trace
+            self.show_filtered = not self.show_filtered
+            self.filtered_line.set_visible(self.show_filtered)
+            self.fig.canvas.draw_idle()
             
-        elif event.key == 'r':
-            # Reset to auto-follow mode
-            self.follow_mode = True
-            self.manual_xlim = None
-            # Will be updated in next animation frame
-            
-        elif event.key == ' ':  # Spacebar
-            # Toggle follow mode
-            if self.follow_mode:
-                self.follow_mode = False
-                self.manual_xlim = self.ax.get_xlim()
-            else:
-                self.follow_mode = True
-                self.manual_xlim = None
+        elif event.key == 'b':
+            # Toggle the queue backlog overlay
+            self.show_queue_overlay = not self.show_queue_overlay
+            self.queue_text.set_visible(False)
+            self.queue_frame = 0
+            self.fig.canvas.draw_idle()
     
     def on_mouse_press(self, event):
         """Handle mouse interaction - disable follow mode when manually panning/zooming"""
@@ -180,91 +231,136 @@ class ECGDashboard:
             self.follow_mode = False
             # Store current limits as manual limits
             self.manual_xlim = self.ax.get_xlim()
+        elif self.overview_ax is not None and event.inaxes == self.overview_ax and event.button == 1:
+            # Grab the viewport where clicked, or center it on the click
+            view_start, view_end = self.ax.get_xlim()
+            width = view_end - view_start
+            offset = event.xdata - view_start if view_start <= event.xdata <= view_end else width / 2
+            self.overview_drag = (offset, width)
+            self.on_overview_drag(event)
+
+    def on_overview_drag(self, event):
+        """Move the main view with the dragged overview viewport"""
+        if self.overview_drag is None or event.inaxes != self.overview_ax or event.xdata is None:
+            return
+        offset, width = self.overview_drag
+        self.ax.set_xlim(self.pan_to(event.xdata - offset, width))
+        self.overview_viewport.set_x(event.xdata - offset)
+        self.fig.canvas.draw_idle()
+
+    def on_overview_release(self, event):
+        self.overview_drag = None
         
-    def add_data_point(self, value):
-        """
-        Thread-safe method to add a new ECG data point
-        
-        Args:
-            value (float): ECG amplitude value
-        """
-        self.data_queue.put(('data', value))
-        
-    def add_r_peak(self, sample_index):
-        """
-        Add an R-peak marker
-        
-        Args:
-            sample_index (int): Sample index where R-peak was detected
-        """
-        self.segment_queue.put(('r_peak', sample_index))
+    def update_hrv_panel(self):
+        """Refresh the HRV text panel, only when a new beat arrived"""
+        if self.hrv_stats is None:
+            return
+        beats = self.hrv_stats.beat_count
+        if beats != self.hrv_beats_shown:
+            self.hrv_text.set_text(self.hrv_stats.format_panel())
+            self.hrv_text.set_visible(True)
+            self.hrv_beats_shown = beats
         
-    def add_detection_window(self, start_index, end_index):
+    def attach_latency_tracker(self, latency_tracker, refresh_frames=20):
         """
-        Add a detection window highlight
+        Show live sample-to-event latency histograms in a separate window
         
         Args:
-            start_index (int): Start sample index
-            end_index (int): End sample index
+            latency_tracker (PipelineLatencyTracker): Tracker updated by the integration
+            refresh_frames (int): Redraw the histograms every this many animation frames
         """
-        self.segment_queue.put(('detection_window', start_index, end_index))
+        self.latency_tracker = latency_tracker
+        self.latency_refresh_frames = refresh_frames
+        kinds = list(latency_tracker.histograms)
+        
+        self.latency_fig, axes = plt.subplots(len(kinds), 1, figsize=(7, 2.2 * len(kinds)), sharex=True)
+        self.latency_fig.suptitle('MCU pipeline latency (sample sent → event received)', fontsize=12)
+        self.latency_steps = {}
+        self.latency_axes = {}
+        for ax, kind in zip(axes, kinds):
+            self.latency_steps[kind] = ax.stairs(latency_tracker.histograms[kind], latency_tracker.bin_edges,
+                                                 fill=True, alpha=0.7)
+            ax.set_xscale('log')  # Log-spaced bins
+            ax.set_ylabel(kind, fontsize=10)
+            ax.grid(True, alpha=0.3)
+            self.latency_axes[kind] = ax
+        axes[-1].set_xlabel('Latency (ms)')
+        
+    def update_latency_histograms(self):
+        """Redraw the latency histograms (throttled to every refresh_frames frames)"""
+        if self.latency_tracker is None or self.latency_fig is None:
+            return
+        self.latency_frame += 1
+        if self.latency_frame % self.latency_refresh_frames:
+            return
+        if not plt.fignum_exists(self.latency_fig.number):
+            return
         
-    def add_model_segment(self, start_index, end_index, predicted_class, probability):
-        """
-        Add a model segment with prediction
+        summary = self.latency_tracker.summary()
+        for kind, steps in self.latency_steps.items():
+            histogram = self.latency_tracker.histograms[kind].copy()
+            steps.set_data(histogram)
+            ax = self.latency_axes[kind]
+            ax.set_ylim(0, max(1, histogram.max()) * 1.1)
+            stats = summary[kind]
+            if stats['count']:
+                ax.set_title(f"n={stats['count']}  mean={stats['mean_ms']:.1f}  p95={stats['p95_ms']:.1f}  "
+                             f"max={stats['max_ms']:.1f} ms", fontsize=9)
+        self.latency_fig.canvas.draw_idle()
+        
+    def update_queue_overlay(self, refresh_frames=10):
+        """Refresh the queue telemetry overlay every refresh_frames frames"""
+        if not self.show_queue_overlay:
+            return
+        self.queue_frame += 1
+        if self.queue_frame % refresh_frames != 1:
+            return
+        self.queue_text.set_text(self.format_queue_overlay())
+        self.queue_text.set_visible(True)
         
-        Args:
-            start_index (int): Start sample index
-            end_index (int): End sample index
-            predicted_class (str): Predicted class name
-            probability (float): Prediction probability
-        """
-        self.segment_queue.put(('model_segment', start_index, end_index, predicted_class, probability))
+    def update_probability_panel(self):
+        """Redraw the probability traces when new predictions arrived or the view moved"""
+        if self.prob_ax is None:
+            return
+        view_start, view_end = self.ax.get_xlim()
+        first_idx = int(np.floor(view_start * self.sampling_rate))
+        last_idx = int(np.ceil(view_end * self.sampling_rate))
+        prob_key = (len(self.predictions), first_idx, last_idx)
+        if prob_key == self.prob_key:
+            return
+        self.prob_key = prob_key
+        times, probabilities = self.predictions.traces(first_idx, last_idx, self.sampling_rate)
+        for i, line in enumerate(self.prob_lines):
+            line.set_data(times, probabilities[:, i])
         
-    def process_pending_segments(self, segment_type=None):
+    def update_overview(self, refresh_frames=5):
         """
-        Force immediate processing of any pending segments in the queue.
-        Useful when you need segments to be available immediately for subsequent operations.
-        
-        Args:
-            segment_type (str, optional): If specified, only process segments of this type.
-                                        Valid values: 'r_peak', 'detection_window', 'model_segment'
-                                        If None, processes all segment types.
+        Move the viewport every frame; redraw the summary every refresh_frames frames when it changed
+
+        Both cost the same whatever the session length (the summary has a fixed number of bins).
         """
-        processed_segments = []
-        temp_queue = []
-        
-        # Extract all items from queue
-        while not self.segment_queue.empty():
-            try:
-                segment_data = self.segment_queue.get_nowait()
-                
-                # Check if we should process this segment type
-                should_process = (segment_type is None) or (segment_data[0] == segment_type)
-                
-                if should_process:
-                    # Process the segment
-                    if segment_data[0] == 'r_peak':
-                        self.segments['r_peaks'].append(segment_data[1])
-                        processed_segments.append(segment_data[0])
-                    elif segment_data[0] == 'detection_window':
-                        self.segments['detection_windows'].append((segment_data[1], segment_data[2]))
-                        processed_segments.append(segment_data[0])
-                    elif segment_data[0] == 'model_segment':
-                        self.segments['model_segments'].append((segment_data[1], segment_data[2], segment_data[3], segment_data[4]))
-                        processed_segments.append(segment_data[0])
-                else:
-                    # Keep for later processing
-                    temp_queue.append(segment_data)
-            except:
-                break
-        
-        # Put back unprocessed segments
-        for segment_data in temp_queue:
-            self.segment_queue.put(segment_data)
-            
-        return processed_segments
-        
+        if self.overview_ax is None:
+            return
+        view_start, view_end = self.ax.get_xlim()
+        self.overview_viewport.set_x(view_start)
+        self.overview_viewport.set_width(view_end - view_start)
+
+        self.overview_frame += 1
+        summary = self.overview
+        if summary.version == self.overview_version or self.overview_frame % refresh_frames:
+            return
+        self.overview_version = summary.version
+        self.overview_line.set_data(*summary.envelope(self.sampling_rate))
+        self.overview_ax.set_xlim(0, max(self.time_window, summary.sample_count / self.sampling_rate))
+        if not np.isnan(summary.value_min):
+            margin = max(1e-6, (summary.value_max - summary.value_min) * 0.05)
+            low, high = summary.value_min - margin, summary.value_max + margin
+            # Density band in a strip of its own below the envelope
+            band = (high - low) * 0.35
+            self.overview_ax.set_ylim(low - band, high)
+            self.overview_density.set_data(summary.abnormal_density()[np.newaxis, :])
+            self.overview_density.set_extent((0, summary.span(self.sampling_rate), low - band, low))
+
     def update_plot(self, frame):
         """Animation update function"""
         try:
@@ -272,46 +368,21 @@ class ECGDashboard:
             if not plt.fignum_exists(self.fig.number):
                 return []
                 
+            # Telemetry is sampled before draining, so the overlay shows the backlog of this frame
+            self.update_queue_overlay()
+            
             # Process new data points
-            while not self.data_queue.empty():
-                try:
-                    msg_type, value = self.data_queue.get_nowait()
-                    if msg_type == 'data':
-                        current_time = self.sample_count / self.sampling_rate
-                        
-                        # Add to scrolling window (for real-time display)
-                        self.ecg_data.append(value)
-                        self.time_data.append(current_time)
-                        
-                        # Add to permanent storage (for historical navigation)
-                        self.all_ecg_data.append(value)
-                        self.all_time_data.append(current_time)
-                        
-                        self.sample_count += 1
-                except:
-                    break
+            self.drain_data_queue()
         except Exception as e:
             # Silently handle any animation errors
             return []
                 
-        # Process new segments
-        while not self.segment_queue.empty():
-            try:
-                segment_data = self.segment_queue.get_nowait()
-                if segment_data[0] == 'r_peak':
-                    #print(f"DEBUG: Processing R-peak at index {segment_data[1]}")
-                    self.segments['r_peaks'].append(segment_data[1])
-                elif segment_data[0] == 'detection_window':
-                    print(f"DEBUG: Processing detection window from {segment_data[1]} to {segment_data[2]}")
-                    self.segments['detection_windows'].append((segment_data[1], segment_data[2]))
-                elif segment_data[0] == 'model_segment':
-                    print(f"DEBUG: Processing model segment from {segment_data[1]} to {segment_data[2]} with class {segment_data[3]} and probability {segment_data[4]}")
-                    self.segments['model_segments'].append((segment_data[1], segment_data[2], segment_data[3], segment_data[4]))
-            except:
-                break
-        
         # Update ECG line and axis limits
         self.update_ecg_display()
+        self.update_probability_panel()
+        self.update_overview()
+        self.update_hrv_panel()
+        self.update_latency_histograms()
         
         # Clear old highlights
         for patch in self.highlight_patches:
@@ -321,25 +392,18 @@ class ECGDashboard:
         # Add current highlights
         self.draw_highlights()
         
-        return [self.ecg_line] + self.highlight_patches
+        return [self.ecg_line, self.filtered_line] + self.highlight_patches
     
     def update_ecg_display(self):
         """Update ECG line display based on current navigation mode and visible window"""
-        if len(self.all_ecg_data) == 0:
+        if self.sample_count == 0:
             return
             
         # Determine the time window to display
-        if self.follow_mode and len(self.time_data) > 0:
+        if self.follow_mode:
             # Auto-follow mode: show most recent data
-            latest_time = self.time_data[-1]
-            if latest_time > self.time_window:
-                view_start = latest_time - self.time_window
-                view_end = latest_time
-                self.ax.set_xlim(view_start, view_end)
-            else:
-                view_start = 0
-                view_end = self.time_window
-                self.ax.set_xlim(0, self.time_window)
+            view_start, view_end = self.follow_xlim()
+            self.ax.set_xlim(view_start, view_end)
         else:
             # Manual navigation mode: use current axis limits
             current_xlim = self.ax.get_xlim()
@@ -349,17 +413,24 @@ class ECGDashboard:
             else:
                 view_start, view_end = current_xlim
         
-        # Filter data for the current view window
-        visible_times = []
-        visible_ecg = []
-        
-        for i, time_point in enumerate(self.all_time_data):
-            if view_start <= time_point <= view_end:
-                visible_times.append(time_point)
-                visible_ecg.append(self.all_ecg_data[i])
+        # Sample index range of the current view window (time = index / sampling_rate)
+        first_idx, last_idx = self.visible_index_range(view_start, view_end)
         
         # Update the ECG line with visible data
-        self.ecg_line.set_data(visible_times, visible_ecg)
+        if last_idx >= first_idx:
+            visible_times = np.arange(first_idx, last_idx + 1) / self.sampling_rate
+            self.ecg_line.set_data(visible_times, self.raw_store.view(first_idx, last_idx))
+        else:
+            self.ecg_line.set_data([], [])
+        
+        # Filtered trace covers the samples that arrived through the filter stage
+        last_filtered_idx = min(last_idx, len(self.filtered_store) - 1)
+        if self.show_filtered and last_filtered_idx >= first_idx:
+            filtered_times = np.arange(first_idx, last_filtered_idx + 1) / self.sampling_rate
+            self.filtered_line.set_data(filtered_times,
+                                        self.filtered_store.view(first_idx, last_filtered_idx) + self.filtered_offset)
+        else:
+            self.filtered_line.set_data([], [])
         
         # Clear old highlights
         for patch in self.highlight_patches:
@@ -372,21 +443,25 @@ class ECGDashboard:
         # Update info text
         #self.update_info_display() #Uncomment if needed for debugging
         
-        return [self.ecg_line] + self.highlight_patches
+        return [self.ecg_line, self.filtered_line] + self.highlight_patches
         
     def draw_highlights(self):
         """Draw all segment highlights"""
-        if len(self.all_time_data) == 0:
+        if self.sample_count == 0:
             return
             
         # Get current visible time window from axis limits
         current_xlim = self.ax.get_xlim()
         window_start_time = current_xlim[0]
         window_end_time = current_xlim[1]
+        
+        # Segments overlapping the view (read back from the spill files when navigating past the retained history)
+        first_idx = int(np.floor(window_start_time * self.sampling_rate))
+        last_idx = int(np.ceil(window_end_time * self.sampling_rate))
             
         # Draw detection windows (bottom area) - distributed across 4 sub-rows starting from top
         detection_count = 0
-        for start_idx, end_idx in self.segments['detection_windows']:
+        for start_idx, end_idx in self.segments.window('detection_windows', first_idx, last_idx):
             start_time = start_idx / self.sampling_rate
             end_time = end_idx / self.sampling_rate
             
@@ -412,7 +487,7 @@ class ECGDashboard:
         
         # Draw model segments with layered positioning
         model_input_count = 0
-        for start_idx, end_idx, pred_class, probability in self.segments['model_segments']:
+        for start_idx, end_idx, pred_class, probability in self.segments.window('model_segments', first_idx, last_idx):
             start_time = start_idx / self.sampling_rate
             end_time = end_idx / self.sampling_rate
             
@@ -470,24 +545,21 @@ class ECGDashboard:
                 self.highlight_patches.append(text)
         
         # Draw R-peaks
-        for r_peak_idx in self.segments['r_peaks']:
+        for r_peak_idx in self.segments.window('r_peaks', first_idx, last_idx):
             peak_time = r_peak_idx / self.sampling_rate
             
             # Only draw if within current window
             if window_start_time <= peak_time <= window_end_time:
                 # Find corresponding ECG value if available
-                if len(self.all_time_data) > 0:
-                    time_array = np.array(self.all_time_data)
-                    closest_idx = np.argmin(np.abs(time_array - peak_time))
-                    if closest_idx < len(self.all_ecg_data):
-                        peak_value = self.all_ecg_data[closest_idx]
-                        
-                        # Draw R-peak marker using Circle patch
-                        circle = Circle((peak_time, peak_value), radius=0.02, 
-                                      facecolor='red', edgecolor='darkred', linewidth=2,
-                                      zorder=15, alpha=1.0, label='R-peak')
-                        self.ax.add_patch(circle)
-                        self.highlight_patches.append(circle)
+                if 0 <= r_peak_idx < self.sample_count:
+                    peak_value = self.raw_store.data[r_peak_idx]
+                    
+                    # Draw R-peak marker using Circle patch
+                    circle = Circle((peak_time, peak_value), radius=0.02, 
+                                  facecolor='red', edgecolor='darkred', linewidth=2,
+                                  zorder=15, alpha=1.0, label='R-peak')
+                    self.ax.add_patch(circle)
+                    self.highlight_patches.append(circle)
     
     def update_info_display(self):
         """Update the information display"""
@@ -537,7 +609,7 @@ class ECGDashboard:
         # Keep the dashboard running
         try:
             # This keeps the dashboard alive and responsive
-            while plt.get_fignums():  # Continue while figure windows are open
+            while self.is_window_open():  # Continue while the dashboard window is open
                 plt.pause(0.1)  # Process events and updates
         except KeyboardInterrupt:
             print("Dashboard received Ctrl+C - but staying open!")
@@ -545,13 +617,13 @@ class ECGDashboard:
             print("Close the plot window manually to exit")
             # Continue running despite Ctrl+C - this is the persistent behavior we want
             try:
-                while plt.get_fignums():  # Keep checking if window is open
+                while self.is_window_open():  # Keep checking if window is open
                     plt.pause(0.1)
             except KeyboardInterrupt:
                 # Even if user presses Ctrl+C again, stay open
                 print("Ctrl+C pressed again - dashboard still staying open!")
                 try:
-                    while plt.get_fignums():
+                    while self.is_window_open():
                         plt.pause(0.1)
                 except:
                     pass
@@ -573,6 +645,8 @@ class ECGDashboard:
         try:
             if hasattr(self, 'fig') and self.fig:
                 plt.close(self.fig)
+            if getattr(self, 'latency_fig', None):
+                plt.close(self.latency_fig)
         except Exception as e:
             print(f"Warning: Error closing figure: {e}")
             
@@ -601,52 +675,94 @@ class ECGDashboard:
         print("Test data sent to dashboard")
 
 
-# Example usage and integration class
-class ECGDashboardIntegration:
-    def __init__(self, dashboard):
+class ECGMultiDashboard:
+    def __init__(self, panel_names, window_size=1250, sampling_rate=125, **dashboard_kwargs):
         """
-        Integration layer between serial communication and dashboard
+        Several ECG dashboards stacked in one window (one panel per device)
         
         Args:
-            dashboard (ECGDashboard): The dashboard instance
+            panel_names (list): Panel identifiers, also used as panel titles
+            window_size (int): Number of samples to display in each panel
+            sampling_rate (int): Sampling rate in Hz (for time axis)
+            **dashboard_kwargs: Passed to every ECGDashboard panel
         """
-        self.dashboard = dashboard
-        self.sample_index = 0
-        
-        # Example: simulate R-peak detection parameters
-        self.last_r_peak_index = -50  # Prevent immediate duplicate detection
-        
-        # Example: model segment parameters
-        self.model_window_size = 100  # samples per model input
-        self.model_overlap = 50       # overlap between consecutive segments
-        
-        # Storage for recent data (for R-peak detection simulation)
-        self.recent_data = deque(maxlen=20)
+        print(f"ECG Multi-Dashboard initializing {len(panel_names)} panels with matplotlib backend: {matplotlib.get_backend()}")
+        self.fig, axes = plt.subplots(len(panel_names), 1, figsize=(15, max(4, 3.5 * len(panel_names))), squeeze=False)
+        self.fig.suptitle('Real-time ECG Dashboard - Multiple devices', fontsize=14, fontweight='bold')
+        
+        self.panels = {}
+        for name, ax in zip(panel_names, axes[:, 0]):
+            self.panels[name] = ECGDashboard(window_size=window_size, sampling_rate=sampling_rate,
+                                             fig=self.fig, ax=ax, title=name, **dashboard_kwargs)
+        
+        # Optional per-panel status (e.g. throughput and drops), refreshed about once per second
+        self.status_sources = {}
+        self.status_refresh_frames = 20
+        self.frame_count = 0
+        self.animation = None
         
-    def process_new_sample(self, ecg_value):
+    def set_status_source(self, panel_name, status_source):
         """
-        Process a new ECG sample and update dashboard
+        Show a status string in a panel title
         
         Args:
-            ecg_value (float): New ECG sample value
+            panel_name: Panel identifier
+            status_source (callable): Returns the status text, called on the GUI thread
         """
-        # Add to dashboard
-        self.dashboard.add_data_point(ecg_value)
+        self.status_sources[panel_name] = status_source
         
-        # Store for processing
-        self.recent_data.append((self.sample_index, ecg_value))        
-       
-        # Model segment processing (simulate model inference)
-        #self.process_model_segments()
+    def update_plot(self, frame):
+        """Animation update function: update every panel"""
+        artists = []
+        for panel in self.panels.values():
+            artists.extend(panel.update_plot(frame) or [])
         
-        self.sample_index += 1
+        self.frame_count += 1
+        if self.frame_count % self.status_refresh_frames == 0:
+            for name, status_source in self.status_sources.items():
+                self.panels[name].ax.set_title(f"{name} | {status_source()}", fontsize=12, loc='left')
+        return artists
         
+    def start_dashboard(self, interval=50):
+        """
+        Start the real-time multi-panel dashboard (blocks until the window is closed)
+        
+        Args:
+            interval (int): Update interval in milliseconds
+        """
+        plt.ion()
+        self.animation = animation.FuncAnimation(
+            self.fig, self.update_plot, interval=interval,
+            blit=False, cache_frame_data=False, repeat=True, save_count=None
+        )
+        plt.show(block=False)
+        plt.pause(0.1)
+        try:
+            while self.is_window_open():
+                plt.pause(0.1)
+        except KeyboardInterrupt:
+            print("Dashboard received Ctrl+C, closing...")
+        finally:
+            self.stop_dashboard()
             
-    def process_model_segments(self):
-        return
-    
-            
+    def stop_dashboard(self):
+        """Stop the animation and close the window"""
+        try:
+            if self.animation and hasattr(self.animation, 'event_source'):
+                self.animation.event_source.stop()
+            self.animation = None
+            plt.close(self.fig)
+            plt.ioff()
+        except Exception as e:
+            print(f"Warning: Error stopping multi-dashboard: {e}")
     
+    def is_window_open(self):
+        """Check if the dashboard window is still open"""
+        return plt.fignum_exists(self.fig.number)
+
+
+# Integration layer lives in ecg_integration (no matplotlib); re-exported here
+from ecg_integration import ECGDashboardIntegration
 
 
 # Example of how to integrate with your existing code
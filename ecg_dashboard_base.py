@@ -0,0 +1,401 @@
+"""
+Renderer-independent dashboard core
+Input side shared by every dashboard backend: thread-safe sample queue, sample
+and segment stores, queue telemetry and the navigation state (follow mode,
+scroll/zoom/reset keys, jump to the next/previous event). Backends (matplotlib ECGDashboard, pyqtgraph
+ECGQtDashboard) only implement drawing, and no GUI toolkit is imported here.
+"""
+
+import threading
+
+import numpy as np
+
+from ecg_sample_store import SampleStore
+from ecg_segment_store import SegmentStore
+from ecg_overview import OverviewSummary
+from ecg_prediction_store import PredictionStore, CLASS_NAMES
+from ecg_event_index import EventIndex, R_PEAK
+from ecg_queue_metrics import InstrumentedQueue, snapshot_queues, format_queue_metrics
+
+# Available rendering backends: name -> (module, class)
+DASHBOARD_BACKENDS = {
+    'matplotlib': ('ecg_dashboard', 'ECGDashboard'),
+    'pyqtgraph': ('ecg_qt_dashboard', 'ECGQtDashboard'),
+}
+
+# Trace colors of the probability panel
+CLASS_COLORS = dict(zip(CLASS_NAMES, ('green', 'orange', 'purple', 'saddlebrown', 'red', 'magenta', 'gray')))
+
+# Event kinds cycled by the 'e' key (',' and '.' jump to the previous/next one)
+EVENT_TARGETS = ['PVC'] + [name for name in CLASS_NAMES if name != 'PVC'] + [R_PEAK]
+
+
+def merge_sample_blocks(messages):
+    """
+    Coalesce queued sample blocks: contiguous blocks become one block
+
+    Args:
+        messages (list): ('block', start_index, raw_block, filtered_block) messages
+
+    Returns:
+        list: Equivalent, shorter list of messages
+    """
+    merged = []
+    run = []
+
+    def flush():
+        if len(run) == 1:
+            merged.append(run[0])
+        elif run:
+            filtered = None
+            if run[0][3] is not None:
+                filtered = np.concatenate([np.asarray(m[3], dtype=float) for m in run])
+            merged.append(('block', run[0][1], np.concatenate([np.asarray(m[2], dtype=float) for m in run]), filtered))
+        run.clear()
+
+    for message in messages:
+        if run:
+            last = run[-1]
+            contiguous = message[1] == last[1] + len(last[2])
+            if not contiguous or (message[3] is None) != (last[3] is None):
+                flush()
+        run.append(message)
+    flush()
+    return merged
+
+
+def create_dashboard(backend='matplotlib', **kwargs):
+    """
+    Create a dashboard of the given rendering backend (imported on demand)
+
+    Args:
+        backend (str): Key of DASHBOARD_BACKENDS
+        **kwargs: Passed to the dashboard constructor
+
+    Returns:
+        ECGDashboardBase: The dashboard
+    """
+    if backend not in DASHBOARD_BACKENDS:
+        raise ValueError(f"Unknown dashboard backend '{backend}', expected one of {list(DASHBOARD_BACKENDS)}")
+    module_name, class_name = DASHBOARD_BACKENDS[backend]
+    module = __import__(module_name)
+    return getattr(module, class_name)(**kwargs)
+
+
+class ECGDashboardBase:
+    def __init__(self, window_size=1250, sampling_rate=125, show_filtered=True, filtered_offset=0.5,
+                 show_queue_overlay=False, data_queue_size=256, data_queue_policy='coalesce',
+                 retention_seconds=None, retention_count=None, spill_dir=None, event_min_probability=None):
+        """
+        Input side and navigation state of a dashboard (see ECGDashboard for the arguments)
+        """
+        self.window_size = window_size
+        self.sampling_rate = sampling_rate
+        self.time_window = window_size / sampling_rate  # seconds
+
+        # Permanent historical data storage (no length limit), indexed by sample number
+        # Time of sample i is i / sampling_rate, so no separate time storage is needed
+        self.raw_store = SampleStore()       # All raw ECG samples for historical navigation
+        self.filtered_store = SampleStore()  # Filtered samples, when a filter stage feeds blocks
+        self.sample_count = 0
+        self.show_filtered = show_filtered
+        self.filtered_offset = filtered_offset
+
+        # Segment tracking for highlighting (written by the parser thread, read by the GUI)
+        # 'r_peaks': R-peak indices, 'detection_windows': (start, end) tuples,
+        # 'model_segments': (start, end, class, probability) tuples
+        self.segments = SegmentStore(max_count=retention_count,
+                                     max_span=int(retention_seconds * sampling_rate) if retention_seconds else None,
+                                     spill_dir=spill_dir)
+
+        # Colors for different highlights
+        self.colors = {
+            'r_peaks': 'red',
+            'detection_windows': 'lightcoral',
+            'model_segments': 'lightblue',
+            'ecg_line': 'blue',
+            'filtered_line': 'darkgreen'
+        }
+
+        # Full 7-class probability vectors of every prediction (columnar, queried by sample range)
+        self.predictions = PredictionStore()
+
+        # R-peaks and predictions by class, sorted by sample index, for jump-to-next navigation
+        # (fed from the segment store, so segments extended into it directly are indexed too)
+        self.events = EventIndex(min_score=event_min_probability)
+        self.events_seen = {'r_peaks': 0, 'model_segments': 0}
+        self.event_target = EVENT_TARGETS[0]
+
+        # Thread-safe data queues, instrumented for depth/backlog telemetry
+        # Sample messages carry their absolute start index, so dropped blocks leave an aligned gap
+        # (segments bypass the queues: they go straight into the locked SegmentStore and are never dropped)
+        self.data_queue = InstrumentedQueue('data_queue', maxsize=data_queue_size, policy=data_queue_policy,
+                                            merge=merge_sample_blocks)
+        self.input_lock = threading.Lock()
+        self.samples_queued = 0   # Producer-side sample index of the next queued sample
+        self.lost_samples = 0     # Samples replaced by NaN after drop_oldest
+        self.extra_queues = []  # Queues of other components shown in the telemetry (e.g. response_queue)
+        self.show_queue_overlay = show_queue_overlay
+
+        # Heart-rate / HRV statistics (fed by attach_hrv_stats)
+        self.hrv_stats = None
+        self.hrv_beats_shown = None
+
+        # Whole-session min/max and prediction summary for the overview strip (fixed size)
+        self.overview = OverviewSummary(bin_size=sampling_rate)
+        self.overview_predictions_seen = 0
+
+        # Navigation state
+        self.follow_mode = True  # True = auto-follow latest data, False = manual navigation
+        self.manual_xlim = None  # Store manual x-limits when not following
+
+    def register_queue(self, queue):
+        """
+        Include another component's InstrumentedQueue in the telemetry
+
+        Args:
+            queue (InstrumentedQueue): Queue to report (e.g. the serial response_queue)
+        """
+        self.extra_queues.append(queue)
+
+    def get_queue_metrics(self):
+        """
+        Telemetry snapshot of the dashboard queues and registered queues
+
+        Returns:
+            dict: Per queue: depth, high_water, enqueue/dequeue rates, oldest_age_ms
+        """
+        return snapshot_queues([self.data_queue] + self.extra_queues)
+
+    def format_queue_overlay(self):
+        """Text of the queue telemetry overlay"""
+        text = format_queue_metrics(self.get_queue_metrics())
+        if self.lost_samples:
+            text += f"\nsamples lost to overload: {self.lost_samples}"
+        return text
+
+    def add_data_point(self, value):
+        """
+        Thread-safe method to add a new ECG data point
+
+        Args:
+            value (float): ECG amplitude value
+        """
+        self.add_data_block([value])
+
+    def add_data_block(self, raw_block, filtered_block=None):
+        """
+        Thread-safe method to add a block of ECG samples with one queue operation
+
+        Args:
+            raw_block (numpy.ndarray): Raw ECG amplitude values
+            filtered_block (numpy.ndarray, optional): Filtered values for the same samples
+        """
+        with self.input_lock:
+            start_index = self.samples_queued
+            self.samples_queued += len(raw_block)
+            self.data_queue.put(('block', start_index, raw_block, filtered_block))
+
+    def add_r_peak(self, sample_index):
+        """
+        Add an R-peak marker
+
+        Args:
+            sample_index (int): Sample index where R-peak was detected
+        """
+        self.segments.append('r_peaks', sample_index)
+
+    def add_detection_window(self, start_index, end_index):
+        """
+        Add a detection window highlight
+
+        Args:
+            start_index (int): Start sample index
+            end_index (int): End sample index
+        """
+        self.segments.append('detection_windows', (start_index, end_index))
+
+    def add_model_segment(self, start_index, end_index, predicted_class, probability):
+        """
+        Add a model segment with prediction
+
+        Args:
+            start_index (int): Start sample index
+            end_index (int): End sample index
+            predicted_class (str): Predicted class name
+            probability (float): Prediction probability
+        """
+        self.segments.append('model_segments', (start_index, end_index, predicted_class, probability))
+
+    def add_class_probabilities(self, start_index, end_index, probabilities):
+        """
+        Keep the probability vector of a prediction (all classes, not only the argmax)
+
+        Args:
+            start_index (int): Start sample index of the model input window
+            end_index (int): End sample index of the model input window
+            probabilities (list): One probability per class of CLASS_NAMES
+        """
+        self.predictions.append(start_index, end_index, probabilities)
+
+    def process_pending_segments(self, segment_type=None):
+        """
+        Kept for callers of the former segment queue: segments are stored as soon as
+        they are added, so nothing is ever pending.
+
+        Returns:
+            list: Always empty
+        """
+        return []
+
+    def drain_data_queue(self):
+        """Move the queued sample blocks into the stores (GUI thread)"""
+        while not self.data_queue.empty():
+            try:
+                _, start_index, raw_block, filtered_block = self.data_queue.get_nowait()
+                if start_index > self.sample_count:
+                    # Older blocks were dropped under overload: keep indices aligned with a gap
+                    self.lost_samples += start_index - self.sample_count
+                    gap = np.full(start_index - self.sample_count, np.nan)
+                    self.raw_store.append_block(gap)
+                    self.overview.add_block(gap)
+                    self.sample_count = start_index
+                    if filtered_block is not None and len(self.filtered_store) < start_index:
+                        self.filtered_store.append_block(np.full(start_index - len(self.filtered_store), np.nan))
+                # Add to permanent storage (for historical navigation)
+                self.raw_store.append_block(raw_block)
+                self.overview.add_block(raw_block)
+                if filtered_block is not None:
+                    self.filtered_store.append_block(filtered_block)
+                self.sample_count += len(raw_block)
+            except:
+                break
+        self.update_overview_predictions()
+        self.update_event_index()
+
+    def update_overview_predictions(self):
+        """Count the model predictions added since the last frame into the overview summary"""
+        new_segments = self.segments.since('model_segments', self.overview_predictions_seen)
+        self.overview_predictions_seen += len(new_segments)
+        for start_idx, _, pred_class, _ in new_segments:
+            if pred_class != 'Model Input':
+                self.overview.add_prediction(start_idx, pred_class != 'Normal')
+
+    def update_event_index(self):
+        """Index the R-peaks and predictions added to the segment store since the last frame"""
+        new_peaks = self.segments.since('r_peaks', self.events_seen['r_peaks'])
+        self.events_seen['r_peaks'] += len(new_peaks)
+        for sample_index in new_peaks:
+            self.events.add(R_PEAK, sample_index)
+        new_segments = self.segments.since('model_segments', self.events_seen['model_segments'])
+        self.events_seen['model_segments'] += len(new_segments)
+        for start_idx, end_idx, pred_class, probability in new_segments:
+            if pred_class != 'Model Input':
+                self.events.add(pred_class, (start_idx + end_idx) // 2, probability)
+
+    def attach_hrv_stats(self, hrv_stats):
+        """
+        Show rolling heart-rate / HRV statistics in the dashboard text panel
+
+        Args:
+            hrv_stats (IncrementalHRVStats): Statistics engine updated by the integration
+        """
+        self.hrv_stats = hrv_stats
+        self.hrv_beats_shown = None
+
+    def follow_xlim(self):
+        """Time range (seconds) shown in follow mode: the newest time_window of data"""
+        latest_time = (self.sample_count - 1) / self.sampling_rate
+        if latest_time > self.time_window:
+            return latest_time - self.time_window, latest_time
+        return 0, self.time_window
+
+    def navigate(self, key, current_xlim):
+        """
+        Apply a navigation key to the view, shared by all backends
+
+        'left'/'right' scroll by 10% and leave follow mode, 'up'/'down' zoom around
+        the center, 'r' resets to follow mode and ' ' toggles follow mode.
+        '.'/',' center the view on the next/previous event of the current target
+        (found by binary search in the event index) and 'e' cycles the target.
+
+        Args:
+            key (str): Key name
+            current_xlim (tuple): Currently shown time range in seconds
+
+        Returns:
+            tuple or None: New time range to show, None when the view is left as is
+                           (follow mode picks its range on the next frame)
+        """
+        window_size = current_xlim[1] - current_xlim[0]
+        new_xlim = None
+        if key in ('left', 'right'):
+            self.follow_mode = False
+            step = window_size * 0.1 * (-1 if key == 'left' else 1)
+            new_xlim = (current_xlim[0] + step, current_xlim[1] + step)
+            self.manual_xlim = new_xlim
+        elif key in ('up', 'down'):
+            center = (current_xlim[0] + current_xlim[1]) / 2
+            new_window_size = window_size * (0.8 if key == 'up' else 1.25)
+            new_xlim = (center - new_window_size/2, center + new_window_size/2)
+            if not self.follow_mode:
+                self.manual_xlim = new_xlim
+        elif key == 'r':
+            self.follow_mode = True
+            self.manual_xlim = None
+        elif key == ' ':
+            if self.follow_mode:
+                self.follow_mode = False
+                self.manual_xlim = tuple(current_xlim)
+            else:
+                self.follow_mode = True
+                self.manual_xlim = None
+        elif key in ('.', ','):
+            new_xlim = self.jump_to_event(key == '.', current_xlim)
+        elif key == 'e':
+            self.event_target = EVENT_TARGETS[(EVENT_TARGETS.index(self.event_target) + 1) % len(EVENT_TARGETS)]
+            print(f"🎯 Jump target: {self.event_target} ({self.events.count(self.event_target, thresholded=True)} events)")
+        return new_xlim
+
+    def jump_to_event(self, forward, current_xlim):
+        """
+        Center the view on the next (or previous) event of the current target
+
+        The search starts from the view center, so repeated jumps walk through
+        the events one by one. Predictions below event_min_probability are skipped.
+
+        Returns:
+            tuple or None: New time range, None when there is no such event
+        """
+        window_size = current_xlim[1] - current_xlim[0]
+        center_index = (current_xlim[0] + current_xlim[1]) / 2 * self.sampling_rate
+        if forward:
+            event_index = self.events.next(self.event_target, center_index + 0.5, thresholded=True)
+        else:
+            event_index = self.events.previous(self.event_target, center_index - 0.5, thresholded=True)
+        if event_index is None:
+            print(f"🎯 No {'next' if forward else 'previous'} {self.event_target} event")
+            return None
+        return self.pan_to(event_index / self.sampling_rate - window_size / 2, window_size)
+
+    def pan_to(self, view_start, window_size):
+        """
+        Show window_size seconds from view_start on (e.g. dragged in the overview), leaving follow mode
+
+        Returns:
+            tuple: The new time range
+        """
+        self.follow_mode = False
+        self.manual_xlim = (view_start, view_start + window_size)
+        return self.manual_xlim
+
+    def visible_index_range(self, view_start, view_end):
+        """
+        Sample index range of a time range, clipped to the stored samples
+
+        Returns:
+            tuple: (first_idx, last_idx), empty when last_idx < first_idx
+        """
+        first_idx = max(0, int(np.ceil(view_start * self.sampling_rate)))
+        last_idx = min(self.sample_count - 1, int(np.floor(view_end * self.sampling_rate)))
+        return first_idx, last_idx
@@ -0,0 +1,101 @@
+"""
+Event index for jump-to-next navigation
+R-peaks and predictions kept sorted by sample index, one list per event kind
+(R-peaks and each predicted class), so the next or previous event of a kind is
+found by binary search instead of scrolling through the recording.
+"""
+
+import bisect
+import threading
+
+R_PEAK = 'r_peak'
+
+
+def insert_sorted(positions, sample_index):
+    """Append in the common in-order case, insort otherwise"""
+    if not positions or sample_index >= positions[-1]:
+        positions.append(sample_index)
+    else:
+        bisect.insort_right(positions, sample_index)
+
+
+class EventIndex:
+    def __init__(self, min_score=None):
+        """
+        Sorted per-kind event positions with O(log n) next/previous lookup
+
+        Each kind keeps the sorted sample positions of all its events and, when
+        min_score is set, a second sorted list of the events scoring at least
+        min_score (the prediction probability, 1.0 for R-peaks), so threshold
+        filtered lookups are binary searches too. Events arrive almost in order,
+        so adding one is an append in the common case and an insort otherwise.
+        Written and read by the GUI thread; the lock keeps other readers safe.
+
+        Args:
+            min_score (float, optional): Threshold of the filtered lookups
+        """
+        self.min_score = min_score
+        self.positions = {}
+        self.above_threshold = {}
+        self.lock = threading.Lock()
+
+    def add(self, kind, sample_index, score=1.0):
+        """
+        Add one event
+
+        Args:
+            kind (str): Event kind (R_PEAK or a class name)
+            sample_index (int): Absolute sample index of the event
+            score (float): Probability of the event, for threshold filtering
+        """
+        with self.lock:
+            insert_sorted(self.positions.setdefault(kind, []), sample_index)
+            if self.min_score is not None and score >= self.min_score:
+                insert_sorted(self.above_threshold.setdefault(kind, []), sample_index)
+
+    def sorted_positions(self, kind, thresholded):
+        if thresholded and self.min_score is not None:
+            return self.above_threshold.get(kind, [])
+        return self.positions.get(kind, [])
+
+    def count(self, kind, start_index=None, end_index=None, thresholded=False):
+        """Number of events of a kind, optionally within an absolute sample range (inclusive)"""
+        with self.lock:
+            positions = self.sorted_positions(kind, thresholded)
+            first = 0 if start_index is None else bisect.bisect_left(positions, start_index)
+            last = len(positions) if end_index is None else bisect.bisect_right(positions, end_index)
+            return max(0, last - first)
+
+    def next(self, kind, after_index, thresholded=False):
+        """
+        First event of a kind strictly after a sample index
+
+        Args:
+            kind (str): Event kind
+            after_index (float): Sample index to search from
+            thresholded (bool): Only events scoring at least min_score
+
+        Returns:
+            int or None: Sample index of the event, None when there is none
+        """
+        with self.lock:
+            positions = self.sorted_positions(kind, thresholded)
+            i = bisect.bisect_right(positions, after_index)
+            return positions[i] if i < len(positions) else None
+
+    def previous(self, kind, before_index, thresholded=False):
+        """
+        Last event of a kind strictly before a sample index
+
+        Args:
+            kind (str): Event kind
+            before_index (float): Sample index to search from
+            thresholded (bool): Only events scoring at least min_score
+
+        Returns:
+            int or None: Sample index of the event, None when there is none
+        """
+        with self.lock:
+            positions = self.sorted_positions(kind, thresholded)
+            i = bisect.bisect_left(positions, before_index) - 1
+            return positions[i] if i >= 0 else None
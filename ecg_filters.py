@@ -0,0 +1,74 @@
+"""
+Streaming ECG filters
+SOS biquad cascades whose state persists across blocks, so a signal filtered
+block by block is identical to the same signal filtered in one piece.
+"""
+
+import numpy as np
+from scipy.signal import butter, iirnotch, sosfilt, sosfilt_zi, tf2sos
+
+
+class StreamingSOSFilter:
+    def __init__(self, sos):
+        """
+        Stateful second-order-sections filter
+
+        Args:
+            sos (numpy.ndarray): Filter coefficients of shape (n_sections, 6)
+        """
+        self.sos = np.asarray(sos, dtype=np.float64)
+        self.zi = None  # Initialized from the first sample to avoid a start-up step
+
+    def process_block(self, samples):
+        """
+        Filter a block of samples, continuing from the state left by the previous block
+
+        Args:
+            samples (array-like): Samples to filter, in order
+
+        Returns:
+            numpy.ndarray: Filtered samples
+        """
+        x = np.asarray(samples, dtype=np.float64)
+        if x.size == 0:
+            return x
+        if self.zi is None:
+            self.zi = sosfilt_zi(self.sos) * x[0]
+        y, self.zi = sosfilt(self.sos, x, zi=self.zi)
+        return y
+
+    def reset(self):
+        """Forget the filter state (next block starts a new signal)"""
+        self.zi = None
+
+
+class ECGFilterChain(StreamingSOSFilter):
+    def __init__(self, sampling_rate=125, highpass=0.5, lowpass=40.0, notch=50.0, notch_quality=30.0, order=2):
+        """
+        Baseline wander removal, bandpass and mains notch as one SOS cascade
+
+        Args:
+            sampling_rate (int): Sampling rate in Hz
+            highpass (float or None): High-pass cutoff in Hz for baseline wander removal (None to disable)
+            lowpass (float or None): Low-pass cutoff in Hz (None to disable)
+            notch (float or None): Mains frequency in Hz, 50 or 60 (None to disable)
+            notch_quality (float): Quality factor of the notch
+            order (int): Butterworth order of the high-pass and low-pass sections
+        """
+        self.sampling_rate = sampling_rate
+        nyquist = 0.5 * sampling_rate
+        sections = []
+
+        if highpass:
+            sections.append(butter(order, highpass / nyquist, btype='highpass', output='sos'))
+        if lowpass and lowpass < nyquist:
+            sections.append(butter(order, lowpass / nyquist, btype='lowpass', output='sos'))
+        if notch and notch < nyquist:
+            b, a = iirnotch(notch, notch_quality, fs=sampling_rate)
+            sections.append(tf2sos(b, a))
+
+        if sections:
+            sos = np.vstack(sections)
+        else:
+            sos = np.array([[1.0, 0.0, 0.0, 1.0, 0.0, 0.0]])  # Pass-through
+        super().__init__(sos)
@@ -0,0 +1,130 @@
+"""
+Credit-based flow control for accelerated replay
+The TX thread may run at most `window` samples ahead of the last sample the
+board acknowledged (the end of its latest detection window), so replay runs as
+fast as the firmware absorbs samples without sleeps and without overrunning
+the MCU circular buffer.
+"""
+
+import threading
+import time
+
+from ecg_logging import get_logger
+
+logger = get_logger('flow')
+
+
+class CreditWindow:
+    def __init__(self, window=500, buffer_size=625, stall_timeout=2.0, sampling_rate=125):
+        """
+        Sliding send window driven by board acknowledgements
+
+        The window must stay below the MCU buffer size: the buffer index
+        reconciler can only place a detection window correctly while fewer than
+        buffer_size samples are in flight.
+
+        Args:
+            window (int): Samples allowed in flight beyond the last acknowledged sample
+            buffer_size (int): MCU circular buffer size in samples
+            stall_timeout (float): Seconds without an acknowledgement before the in-flight
+                                   samples are assumed consumed (keeps a silent board from
+                                   blocking the replay forever)
+            sampling_rate (int): Real-time sample rate, for the speed-up report
+        """
+        if window >= buffer_size:
+            raise ValueError(f"Credit window ({window}) must be smaller than the MCU buffer ({buffer_size})")
+        self.window = window
+        self.stall_timeout = stall_timeout
+        self.sampling_rate = sampling_rate
+        self.condition = threading.Condition()
+        self.acknowledged = 0   # Samples the board reported as consumed
+        self.samples_sent = 0
+        self.credit_waits = 0   # Times the TX thread had to wait for credit
+        self.wait_time = 0.0
+        self.stalls = 0
+        self.start_time = None
+        self.end_time = None
+
+    def acknowledge(self, samples_consumed):
+        """
+        Record that the board consumed samples up to samples_consumed (parser thread)
+
+        Args:
+            samples_consumed (int): Absolute index of the newest acknowledged sample + 1
+        """
+        with self.condition:
+            if samples_consumed > self.acknowledged:
+                self.acknowledged = samples_consumed
+                self.condition.notify()
+
+    def acquire(self, wanted, stop_event=None):
+        """
+        Wait until samples may be sent and reserve them (TX thread)
+
+        Args:
+            wanted (int): Samples the caller would like to send
+            stop_event (threading.Event, optional): Aborts the wait when set
+
+        Returns:
+            int: Samples to send now (0 only when stop_event was set)
+        """
+        if self.start_time is None:
+            self.start_time = time.perf_counter()
+        with self.condition:
+            credit = self.acknowledged + self.window - self.samples_sent
+            if credit <= 0:
+                self.credit_waits += 1
+                wait_start = time.perf_counter()
+                deadline = wait_start + self.stall_timeout
+                while credit <= 0:
+                    if stop_event is not None and stop_event.is_set():
+                        return 0
+                    remaining = deadline - time.perf_counter()
+                    if remaining <= 0:
+                        # No acknowledgement for stall_timeout: assume the board drained its input
+                        self.stalls += 1
+                        logger.warning("⚠️  No acknowledgement for %.1fs at sample %d (acknowledged %d), resuming",
+                                       self.stall_timeout, self.samples_sent, self.acknowledged)
+                        self.acknowledged = self.samples_sent
+                    else:
+                        self.condition.wait(min(remaining, 0.1))
+                    credit = self.acknowledged + self.window - self.samples_sent
+                self.wait_time += time.perf_counter() - wait_start
+            count = min(wanted, credit)
+            self.samples_sent += count
+            return count
+
+    def finish(self):
+        """Mark the end of the replay (freezes the rate report)"""
+        self.end_time = time.perf_counter()
+
+    def stats(self):
+        """
+        Replay rate and flow-control counters
+
+        Returns:
+            dict: samples_sent, acknowledged, in_flight, elapsed_s, samples_per_second,
+                  realtime_factor, credit_waits, wait_time_s, stalls
+        """
+        with self.condition:
+            sent, acknowledged = self.samples_sent, self.acknowledged
+        end = self.end_time or time.perf_counter()
+        elapsed = end - self.start_time if self.start_time else 0.0
+        rate = sent / elapsed if elapsed > 0 else 0.0
+        return {
+            'samples_sent': sent,
+            'acknowledged': acknowledged,
+            'in_flight': max(0, sent - acknowledged),
+            'elapsed_s': elapsed,
+            'samples_per_second': rate,
+            'realtime_factor': rate / self.sampling_rate,
+            'credit_waits': self.credit_waits,
+            'wait_time_s': self.wait_time,
+            'stalls': self.stalls,
+        }
+
+    def format_stats(self):
+        s = self.stats()
+        return (f"TX {s['samples_sent']} samples in {s['elapsed_s']:.1f}s: {s['samples_per_second']:.0f} samples/s "
+                f"({s['realtime_factor']:.1f}x real time) | in flight {s['in_flight']}/{self.window} | "
+                f"credit waits {s['credit_waits']} ({s['wait_time_s']:.1f}s) | stalls {s['stalls']}")
@@ -0,0 +1,179 @@
+"""
+Incremental heart-rate and HRV statistics
+Rolling HR, SDNN and RMSSD updated in O(1) per beat from a stream of R-peak indices.
+"""
+
+import csv
+import threading
+import time
+from collections import deque
+
+
+class IncrementalHRVStats:
+    def __init__(self, sampling_rate=125, window_beats=60, min_rr=0.3, max_rr=2.0,
+                 duplicate_tolerance=0.08, export_path=None):
+        """
+        Rolling heart-rate / HRV engine
+
+        RR intervals are kept in integer samples, so the running sums are exact
+        and do not drift however long the session runs.
+
+        Args:
+            sampling_rate (int): Sampling rate in Hz (converts sample indices to time)
+            window_beats (int): Number of RR intervals in the rolling window
+            min_rr (float): Shortest plausible RR interval in seconds (shorter ones are rejected)
+            max_rr (float): Longest plausible RR interval in seconds (longer ones break the chain)
+            duplicate_tolerance (float): Peaks this close (seconds) to the last beat are repeat reports of it
+            export_path (str, optional): CSV file that receives one row per accepted beat
+        """
+        self.sampling_rate = sampling_rate
+        self.window_beats = window_beats
+        self.min_rr_samples = int(round(min_rr * sampling_rate))
+        self.max_rr_samples = int(round(max_rr * sampling_rate))
+        self.duplicate_samples = int(round(duplicate_tolerance * sampling_rate))
+
+        # Rolling window of RR intervals and of squared successive differences
+        self.rr_window = deque()
+        self.rr_sum = 0
+        self.rr_sq_sum = 0
+        self.diff_sq_window = deque()
+        self.diff_sq_sum = 0
+
+        self.last_peak = None
+        self.last_rr = None
+        self.beat_count = 0
+        self.rejected_count = 0
+        self.lock = threading.Lock()
+
+        # Optional per-beat export (streamed to disk, nothing kept in memory)
+        self.export_file = None
+        self.export_writer = None
+        if export_path:
+            self.export_file = open(export_path, 'w', newline='')
+            self.export_writer = csv.writer(self.export_file)
+            self.export_writer.writerow(['wall_time', 'peak_index', 'rr_ms', 'hr_bpm', 'sdnn_ms', 'rmssd_ms'])
+
+    def add_peaks(self, peak_indices):
+        """
+        Add R-peaks in increasing order; duplicates and peaks older than the last beat are ignored
+
+        Args:
+            peak_indices (list): Absolute R-peak sample indices
+        """
+        for peak in peak_indices:
+            self.add_peak(peak)
+
+    def add_peak(self, peak_index):
+        """
+        Add one R-peak and update the rolling statistics in O(1)
+
+        Args:
+            peak_index (int): Absolute R-peak sample index
+
+        Returns:
+            bool: True if the peak was accepted as a new beat
+        """
+        with self.lock:
+            if self.last_peak is not None:
+                rr = peak_index - self.last_peak
+                if rr <= self.duplicate_samples:
+                    # Repeat report of the same beat (overlapping windows) or an older peak
+                    return False
+                if rr < self.min_rr_samples:
+                    # Implausibly short RR interval: artifact
+                    self.rejected_count += 1
+                    return False
+                if rr > self.max_rr_samples:
+                    # Gap in the data: restart the successive difference chain
+                    self.last_rr = None
+                else:
+                    self.push_rr(rr)
+            self.last_peak = peak_index
+            self.beat_count += 1
+            if self.export_writer is not None and self.last_rr is not None:
+                stats = self.compute_stats()
+                self.export_writer.writerow([f"{time.time():.3f}", peak_index, f"{stats['rr_ms']:.1f}",
+                                             f"{stats['hr_bpm']:.1f}", f"{stats['sdnn_ms']:.2f}",
+                                             f"{stats['rmssd_ms']:.2f}"])
+            return True
+
+    def push_rr(self, rr):
+        """Append one RR interval (in samples) to the rolling window, evicting the oldest"""
+        self.rr_window.append(rr)
+        self.rr_sum += rr
+        self.rr_sq_sum += rr * rr
+        if len(self.rr_window) > self.window_beats:
+            old = self.rr_window.popleft()
+            self.rr_sum -= old
+            self.rr_sq_sum -= old * old
+
+        if self.last_rr is not None:
+            diff_sq = (rr - self.last_rr) ** 2
+            self.diff_sq_window.append(diff_sq)
+            self.diff_sq_sum += diff_sq
+            if len(self.diff_sq_window) > self.window_beats - 1:
+                self.diff_sq_sum -= self.diff_sq_window.popleft()
+        self.last_rr = rr
+
+    def compute_stats(self):
+        """Compute HR / SDNN / RMSSD from the running sums (caller holds the lock)"""
+        ms_per_sample = 1000.0 / self.sampling_rate
+        n = len(self.rr_window)
+        stats = {
+            'beats': self.beat_count,
+            'rejected': self.rejected_count,
+            'window_rr': n,
+            'rr_ms': None,
+            'hr_bpm': None,
+            'sdnn_ms': None,
+            'rmssd_ms': None,
+        }
+        if n == 0:
+            return stats
+
+        mean_rr = self.rr_sum / n
+        stats['rr_ms'] = self.last_rr * ms_per_sample if self.last_rr is not None else mean_rr * ms_per_sample
+        stats['hr_bpm'] = 60.0 * self.sampling_rate / mean_rr
+        if n > 1:
+            # Sample variance from exact integer sums
+            variance = (self.rr_sq_sum - self.rr_sum * self.rr_sum / n) / (n - 1)
+            stats['sdnn_ms'] = max(variance, 0.0) ** 0.5 * ms_per_sample
+        else:
+            stats['sdnn_ms'] = 0.0
+        if self.diff_sq_window:
+            stats['rmssd_ms'] = (self.diff_sq_sum / len(self.diff_sq_window)) ** 0.5 * ms_per_sample
+        else:
+            stats['rmssd_ms'] = 0.0
+        return stats
+
+    def snapshot(self):
+        """
+        Get the current rolling statistics (thread-safe)
+
+        Returns:
+            dict: beats, rejected, window_rr, rr_ms, hr_bpm, sdnn_ms, rmssd_ms
+        """
+        with self.lock:
+            return self.compute_stats()
+
+    def format_panel(self):
+        """
+        Format the current statistics for the dashboard text panel
+
+        Returns:
+            str: Multi-line summary
+        """
+        stats = self.snapshot()
+        if stats['hr_bpm'] is None:
+            return f"HR: -- bpm\nBeats: {stats['beats']}"
+        return (f"HR: {stats['hr_bpm']:.0f} bpm | RR: {stats['rr_ms']:.0f} ms\n"
+                f"SDNN: {stats['sdnn_ms']:.1f} ms | RMSSD: {stats['rmssd_ms']:.1f} ms\n"
+                f"Beats: {stats['beats']} (window {stats['window_rr']} RR)")
+
+    def close(self):
+        """Close the per-beat export file"""
+        with self.lock:
+            if self.export_file is not None:
+                self.export_file.close()
+                self.export_file = None
+                self.export_writer = None
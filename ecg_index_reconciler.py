@@ -0,0 +1,72 @@
+"""
+Circular buffer index reconciliation
+Maps MCU circular-buffer indices to absolute sample indices using the host's
+TX sample counter as the authoritative clock, instead of guessing wraps from
+jumps in the reported indices.
+"""
+
+
+class BufferIndexReconciler:
+    def __init__(self, buffer_size=625):
+        """
+        Resolve the buffer wrap count consistent with the number of samples sent
+
+        A window reported by the MCU can only cover samples the host has already
+        sent, so its absolute end lies in [samples_sent - buffer_size, samples_sent - 1].
+        Exactly one wrap count satisfies that, as long as the MCU reports a window
+        less than one buffer length (buffer_size samples) after its last sample was sent.
+
+        Args:
+            buffer_size (int): MCU circular buffer size in samples
+        """
+        self.buffer_size = buffer_size
+        self.wrap_counter = 0
+        self.last_absolute_start = None
+        self.backward_jumps = 0  # Windows that moved backwards by more than half a buffer
+
+    def resolve_wrap(self, buffer_start, buffer_end, samples_sent):
+        """
+        Find the wrap count of a window reported in buffer indices
+
+        Args:
+            buffer_start (int): Window start index in the circular buffer (0 to buffer_size - 1)
+            buffer_end (int): Window end index as reported (may exceed buffer_size when the window straddles a wrap)
+            samples_sent (int): Number of samples the host had sent when the window was received
+
+        Returns:
+            int: Wrap count, so that absolute index = buffer index + wrap count * buffer_size
+        """
+        span = buffer_end - buffer_start
+        if span < 0:
+            span += self.buffer_size  # End reported already wrapped
+        newest_sent = samples_sent - 1
+
+        # Largest wrap count whose window end has already been sent
+        wrap = (newest_sent - (buffer_start + span)) // self.buffer_size
+        wrap = max(wrap, 0)
+
+        absolute_start = buffer_start + wrap * self.buffer_size
+        if self.last_absolute_start is not None and absolute_start < self.last_absolute_start - self.buffer_size // 2:
+            self.backward_jumps += 1
+        self.last_absolute_start = absolute_start
+        self.wrap_counter = wrap
+        return wrap
+
+    def to_absolute(self, buffer_start, buffer_end, samples_sent):
+        """
+        Convert a window from buffer indices to absolute sample indices
+
+        Args:
+            buffer_start (int): Window start index in the circular buffer
+            buffer_end (int): Window end index as reported
+            samples_sent (int): Number of samples the host had sent when the window was received
+
+        Returns:
+            tuple: (absolute_start, absolute_end)
+        """
+        wrap = self.resolve_wrap(buffer_start, buffer_end, samples_sent)
+        span = buffer_end - buffer_start
+        if span < 0:
+            span += self.buffer_size
+        absolute_start = buffer_start + wrap * self.buffer_size
+        return absolute_start, absolute_start + span
@@ -0,0 +1,601 @@
+"""
+ECG pipeline integration
+Integration layer between the serial/BLE transport and a dashboard: block
+processing, filtering, host-side analysis and MCU response parsing. Does not
+import matplotlib, so the pipeline also runs headless (see vcom_headless.py).
+"""
+
+import logging
+import time
+from collections import deque
+
+import numpy as np
+
+# Host-side R-peak detection is optional (requires scipy)
+try:
+    from ecg_rpeak_detector import StreamingRPeakDetector, RPeakComparator
+except ImportError:
+    StreamingRPeakDetector = None
+    RPeakComparator = None
+
+from ecg_sample_store import SampleStore
+from ecg_prediction_store import CLASS_NAMES
+from ecg_hrv import IncrementalHRVStats
+from ecg_shadow_inference import ShadowInference
+from ecg_latency import PipelineLatencyTracker
+from ecg_index_reconciler import BufferIndexReconciler
+from ecg_logging import get_logger
+
+# Streaming filter stage is optional (requires scipy)
+try:
+    from ecg_filters import ECGFilterChain
+except ImportError:
+    ECGFilterChain = None
+
+# Parser messages are logged asynchronously (see ecg_logging.setup_logging); per-message detail is DEBUG
+logger = get_logger('integration')
+
+class ECGDashboardIntegration:
+    def __init__(self, dashboard, host_rpeak_detection=True, analysis_block_size=10, enable_filtering=True,
+                 hrv_beat_source='mcu', hrv_export_path=None, model_window_consumer=None):
+        """
+        Integration layer between serial communication and dashboard
+        
+        Samples are buffered into blocks; each block is filtered, analyzed and
+        handed to the dashboard with a single queue operation.
+        
+        Args:
+            dashboard (ECGDashboard): The dashboard instance
+            host_rpeak_detection (bool): Run the host-side R-peak detector to cross-check the MCU
+            analysis_block_size (int): Number of samples per block (display latency is one block)
+            enable_filtering (bool): Run the streaming filter stage (baseline wander, bandpass, notch)
+            hrv_beat_source (str): R-peaks feeding the HR/HRV statistics: 'mcu', 'host' or None
+            hrv_export_path (str, optional): CSV file receiving one row of HR/HRV metrics per beat
+            model_window_consumer (callable, optional): Called as consumer(starts, windows) with the
+                                                        model-sized windows completed by each block
+                                                        (zero-copy views, shape (n, model_window_size))
+        """
+        self.dashboard = dashboard
+        self.sample_index = 0
+        
+        # Example: simulate R-peak detection parameters
+        self.last_r_peak_index = -50  # Prevent immediate duplicate detection
+        
+        # Example: model segment parameters
+        self.model_window_size = 100  # samples per model input
+        self.model_overlap = 50       # overlap between consecutive segments
+        self.model_window_consumer = model_window_consumer
+        self.next_model_window_start = 0
+        
+        # Storage for recent data (for R-peak detection simulation)
+        self.recent_data = deque(maxlen=20)
+        
+        # Host-side analysis runs on blocks of samples rather than per sample
+        self.analysis_block_size = analysis_block_size
+        self.pending_block = []
+        
+        # All samples by absolute index, for host-side analysis of past windows
+        self.sample_store = SampleStore()
+        
+        # Streaming filter stage between acquisition and the dashboard
+        self.filter_chain = None
+        if enable_filtering:
+            if ECGFilterChain is None:
+                print("Warning: scipy not available, filter stage disabled")
+            else:
+                self.filter_chain = ECGFilterChain(sampling_rate=dashboard.sampling_rate)
+        
+        # Host-side R-peak detector and comparison against firmware R-peaks
+        self.rpeak_detector = None
+        self.rpeak_comparator = None
+        if host_rpeak_detection:
+            if StreamingRPeakDetector is None:
+                print("Warning: scipy not available, host-side R-peak detection disabled")
+            else:
+                self.rpeak_detector = StreamingRPeakDetector(sampling_rate=dashboard.sampling_rate)
+                self.rpeak_comparator = RPeakComparator()
+        
+        # Rolling heart-rate / HRV statistics shown in the dashboard
+        self.hrv_beat_source = hrv_beat_source
+        self.hrv_stats = None
+        if hrv_beat_source:
+            self.hrv_stats = IncrementalHRVStats(sampling_rate=dashboard.sampling_rate, export_path=hrv_export_path)
+            self.dashboard.attach_hrv_stats(self.hrv_stats)
+        
+    def process_new_sample(self, ecg_value):
+        """
+        Process a new ECG sample and update dashboard
+        
+        Args:
+            ecg_value (float): New ECG sample value
+        """
+        # Store for processing
+        self.recent_data.append((self.sample_index, ecg_value))        
+        self.pending_block.append(ecg_value)
+        
+        # Filter, analyze and add to dashboard once a full block is buffered
+        if len(self.pending_block) >= self.analysis_block_size:
+            self.process_sample_block()
+        
+        self.sample_index += 1
+        
+    def process_sample_block(self):
+        """Filter the samples buffered since the last block, run host-side analysis and update dashboard"""
+        if not self.pending_block:
+            return
+        block = np.asarray(self.pending_block, dtype=float)
+        self.pending_block = []
+        self.sample_store.append_block(block)
+        
+        # Raw and filtered traces go to the dashboard together
+        filtered = self.filter_chain.process_block(block) if self.filter_chain is not None else None
+        self.dashboard.add_data_block(block, filtered)
+        
+        if self.rpeak_detector is not None:
+            host_peaks = self.rpeak_detector.process_block(block)
+            if host_peaks:
+                self.rpeak_comparator.add_host_peaks(host_peaks)
+                if self.hrv_stats and self.hrv_beat_source == 'host':
+                    self.hrv_stats.add_peaks(host_peaks)
+        
+        # Model-sized windows completed by this block (host-side features/inference)
+        self.process_model_segments()
+    
+    def add_mcu_r_peaks(self, absolute_indices):
+        """
+        Register R-peaks reported by the MCU for comparison with the host detector
+        
+        Args:
+            absolute_indices (list): Absolute sample indices of firmware R-peaks
+        """
+        if self.rpeak_comparator is not None:
+            self.rpeak_comparator.add_mcu_peaks(absolute_indices)
+        if self.hrv_stats and self.hrv_beat_source == 'mcu':
+            self.hrv_stats.add_peaks(sorted(absolute_indices))
+    
+    def report_rpeak_comparison(self):
+        """Flush pending samples and print the host vs MCU R-peak comparison"""
+        self.process_sample_block()
+        if self.rpeak_comparator is None:
+            return None
+        
+        stats = self.rpeak_comparator.summary()
+        print("\n--- Host vs MCU R-peak Comparison ---")
+        print(f"Host R-peaks: {stats['host_peaks']} | MCU R-peaks: {stats['mcu_peaks']}")
+        print(f"Matched: {stats['matched']} | MCU only: {stats['mcu_only']} | Host only: {stats['host_only']}")
+        print(f"Agreement: {stats['agreement']*100:.1f}%")
+        if stats['mean_offset'] is not None:
+            print(f"Index offset (MCU - host): mean {stats['mean_offset']:.2f}, max |{stats['max_abs_offset']}| samples")
+        return stats
+            
+    def report_hrv(self):
+        """Print the final HR/HRV statistics and close the metrics export"""
+        if not self.hrv_stats:
+            return None
+        
+        stats = self.hrv_stats.snapshot()
+        self.hrv_stats.close()
+        print(f"\n--- Heart Rate / HRV ({self.hrv_beat_source} R-peaks) ---")
+        print(self.hrv_stats.format_panel())
+        print(f"Rejected RR intervals: {stats['rejected']}")
+        return stats
+            
+    def process_model_segments(self):
+        """Hand the model windows completed since the last call to the window consumer, without copying"""
+        if self.model_window_consumer is None:
+            return
+        hop = self.model_window_size - self.model_overlap
+        starts, windows = self.sample_store.windows(self.model_window_size, hop, self.next_model_window_start)
+        if len(starts):
+            self.next_model_window_start = int(starts[-1]) + hop
+            self.model_window_consumer(starts, windows)
+
+
+# Enhanced ECG Dashboard Integration
+class ECGSerialDashboardIntegration(ECGDashboardIntegration):
+    """Extended integration class for serial communication + dashboard"""
+    
+    def __init__(self, dashboard, shadow_classifier=None, shadow_batch_size=32, shadow_workers=None,
+                 measure_latency=True, response_history=1000, response_spill_path=None, credit_window=None, **kwargs):
+        """
+        Args:
+            dashboard (ECGDashboard): The dashboard instance
+            shadow_classifier (callable, optional): Reference classifier for host-side shadow inference
+            shadow_batch_size (int): Model input windows per shadow inference batch
+            shadow_workers (int, optional): Shadow inference worker processes (default: CPU count)
+            measure_latency (bool): Measure sample-to-event latency of the MCU pipeline
+            response_history (int, optional): Received lines kept in memory (None = all)
+            response_spill_path (str, optional): Text file receiving the lines evicted from memory
+            credit_window (CreditWindow, optional): Acknowledged with every detection window (accelerated replay)
+            **kwargs: Passed to ECGDashboardIntegration (filtering, HRV, host R-peak options)
+        """
+        super().__init__(dashboard, **kwargs)
+        self.received_responses = deque()
+        self.response_history = response_history
+        self.response_spill_path = response_spill_path
+        self.responses_evicted = 0
+        if response_spill_path:
+            open(response_spill_path, 'w').close()
+        
+        # Host-side shadow inference on the model input windows (disabled without a classifier)
+        self.shadow_inference = None
+        if shadow_classifier is not None:
+            self.shadow_inference = ShadowInference(shadow_classifier, self.sample_store,
+                                                    batch_size=shadow_batch_size, max_workers=shadow_workers)
+        
+        # Circular buffer wrap-around tracking
+        self.buffer_size = 625  # MCU circular buffer size
+        self.wrap_counter = 0   # Number of times buffer has wrapped
+        self.last_detection_start = None  # Last observed detection window start index
+        
+        # Wrap count is resolved against the host TX sample counter (self.sample_index);
+        # the start-index-drop heuristic is only used when no samples were sent (e.g. log replay)
+        self.index_reconciler = BufferIndexReconciler(self.buffer_size)
+        
+        # Model window tracking - to share indices between model input window and predictions
+        self.last_model_start = None  # Absolute start index of last model input window
+        self.last_model_end = None    # Absolute end index of last model input window
+        
+        # End-to-end latency: events are timed against the TX time of the newest sample they cover
+        self.latency_tracker = PipelineLatencyTracker() if measure_latency else None
+        self.last_detection_end = None  # Absolute end index of last detection window
+        
+        # Accelerated replay: each detection window tells the TX thread how far the board has consumed
+        self.credit_window = credit_window
+
+    def evict_responses(self):
+        """Drop the oldest received lines beyond response_history (appending them to the spill file if set)"""
+        evicted = [self.received_responses.popleft()
+                   for _ in range(len(self.received_responses) - self.response_history)]
+        self.responses_evicted += len(evicted)
+        if self.response_spill_path:
+            with open(self.response_spill_path, 'a', encoding='utf-8') as f:
+                f.write('\n'.join(evicted) + '\n')
+    
+    def get_response_history(self):
+        """
+        All received lines of the session, reading the evicted ones back from the spill file
+        
+        Returns:
+            list: Received lines, oldest first (evicted lines are missing without a spill file)
+        """
+        spilled = []
+        if self.response_spill_path and self.responses_evicted:
+            with open(self.response_spill_path, encoding='utf-8') as f:
+                spilled = f.read().splitlines()
+        return spilled + list(self.received_responses)
+    
+    def convert_buffer_index_to_absolute(self, buffer_index):
+        """
+        Convert circular buffer index to absolute index using wrap counter
+        
+        Args:
+            buffer_index (int): Index from circular buffer (0-625)
+            
+        Returns:
+            int: Absolute index accounting for buffer wraps
+        """
+        return buffer_index + (self.wrap_counter * self.buffer_size)
+    
+    def report_shadow_inference(self):
+        """Flush pending shadow windows, stop the worker pool and print the host vs MCU summary"""
+        if not self.shadow_inference:
+            return None
+        
+        self.process_sample_block()
+        self.shadow_inference.shutdown(wait=True)
+        stats = self.shadow_inference.summary()
+        print("\n--- Host Shadow Inference vs MCU ---")
+        print(f"Windows: {stats['windows_submitted']} in {stats['batches_submitted']} batches | Compared: {stats['compared']} | Errors: {stats['errors']}")
+        if stats['class_agreement'] is not None:
+            print(f"Class agreement: {stats['class_agreement']*100:.1f}% | Mean |P_host - P_mcu|: {stats['mean_abs_prob_diff']:.4f}")
+        return stats
+    
+    def report_latency(self):
+        """Print the end-of-run sample-to-event latency summary"""
+        if not self.latency_tracker:
+            return None
+        
+        print("\n--- MCU Pipeline Latency (sample sent → event received) ---")
+        print(self.latency_tracker.format_summary())
+        return self.latency_tracker.summary()
+    
+    def samples_sent_at(self, received_time):
+        """
+        Number of samples the host had sent when a line was received
+        
+        Args:
+            received_time (float): time.perf_counter() when the line arrived
+            
+        Returns:
+            int: TX sample count at that time (current count when no TX timestamps are available)
+        """
+        samples_sent = self.sample_index
+        if self.latency_tracker and samples_sent > 0:
+            return self.latency_tracker.samples_sent_before(received_time, samples_sent)
+        return samples_sent
+    
+    def reconcile_detection_window(self, buffer_start_idx, buffer_end_idx, received_time, samples_sent=None):
+        """
+        Convert a detection window from circular buffer indices to absolute indices
+        
+        Args:
+            buffer_start_idx (int): Start index reported by the MCU
+            buffer_end_idx (int): End index reported by the MCU
+            received_time (float): time.perf_counter() when the line arrived
+            samples_sent (int, optional): TX sample count when the line arrived (looked up if None)
+            
+        Returns:
+            tuple: (absolute_start_idx, absolute_end_idx)
+        """
+        previous_wrap = self.wrap_counter
+        if samples_sent is None:
+            samples_sent = self.samples_sent_at(received_time)
+        
+        if samples_sent > 0:
+            # Anchor to the TX sample counter: the window must end at or before the newest sample sent
+            absolute_start_idx, absolute_end_idx = self.index_reconciler.to_absolute(buffer_start_idx, buffer_end_idx, samples_sent)
+            self.wrap_counter = self.index_reconciler.wrap_counter
+        else:
+            # No TX reference: detect wrap-around when the start index is much smaller than the previous one
+            if self.last_detection_start is not None and buffer_start_idx < self.last_detection_start - 100:
+                self.wrap_counter += 1
+            absolute_start_idx = self.convert_buffer_index_to_absolute(buffer_start_idx)
+            absolute_end_idx = self.convert_buffer_index_to_absolute(buffer_end_idx)
+        
+        if self.wrap_counter != previous_wrap:
+            logger.info("🔄 Buffer wrap-around detected! Counter: %d (detection start: %s → %d)",
+                        self.wrap_counter, self.last_detection_start, buffer_start_idx)
+        self.last_detection_start = buffer_start_idx
+        return absolute_start_idx, absolute_end_idx
+    
+    def get_buffer_stats(self):
+        """
+        Get current buffer wrap statistics for debugging
+        
+        Returns:
+            dict: Buffer statistics including wrap count, last detection start, etc.
+        """
+        return {
+            'wrap_counter': self.wrap_counter,
+            'last_detection_start': self.last_detection_start,
+            'buffer_size': self.buffer_size,
+            'current_offset': self.wrap_counter * self.buffer_size,
+            'samples_sent': self.sample_index,
+            'backward_jumps': self.index_reconciler.backward_jumps
+        }
+        
+    def process_serial_response(self, response_text, received_time=None, samples_sent=None):
+        """
+        Process responses received from serial communication
+        
+        Args:
+            response_text (str): One line received from the MCU
+            received_time (float, optional): time.perf_counter() when the line arrived (defaults to now)
+            samples_sent (int, optional): TX sample count when the line arrived, when the samples
+                                          were not sent through this integration (e.g. test rig parsers)
+        """
+        self.received_responses.append(response_text)
+        if self.response_history and len(self.received_responses) >= self.response_history + max(1, self.response_history // 10):
+            self.evict_responses()
+        if received_time is None:
+            received_time = time.perf_counter()
+        
+        # DEBUG: Print all received messages to see what we're getting
+        #print(f"📨 DEBUG: Received message: '{response_text}'")
+
+        # Process detection windows
+        # Expected format: "Equivalent to indices 414 to 663"
+        if "Equivalent to indices" in response_text:
+            #print(f"🔍 DEBUG: Found detection window message: '{response_text}'")
+            
+            try:
+                # Split the response and find the indices
+                parts = response_text.split()
+                #print(f"🔍 DEBUG: Split parts: {parts}")
+
+                # Find "indices" keyword and extract start/end indices
+                if "indices" in parts and "to" in parts:
+                    indices_idx = parts.index("indices")
+                    
+                    # Make sure we have the right structure: "indices XXX to YYY"
+                    if indices_idx + 3 < len(parts):
+                        try:
+                            buffer_start_idx = int(parts[indices_idx + 1])  # Number after "indices"
+                            buffer_end_idx = int(parts[indices_idx + 3])    # Number after "to"
+                            
+                            # Convert buffer indices to absolute indices (wrap count resolved against the TX counter)
+                            absolute_start_idx, absolute_end_idx = self.reconcile_detection_window(buffer_start_idx, buffer_end_idx, received_time, samples_sent)
+                           
+                            # Latency from sending the window's last sample to receiving the window
+                            self.last_detection_end = absolute_end_idx
+                            if self.credit_window:
+                                self.credit_window.acknowledge(absolute_end_idx + 1)
+                            if self.latency_tracker:
+                                self.latency_tracker.record_event('detection', absolute_end_idx, received_time)
+                            
+                            # Add detection window to dashboard with absolute indices
+                            # Stored immediately, so subsequent R-peak/model lines see it as the latest window
+                            self.dashboard.add_detection_window(absolute_start_idx, absolute_end_idx)
+                            
+                            logger.debug("🔍 Added detection window to dashboard: %d→%d to %d→%d (wrap count: %d)",
+                                         buffer_start_idx, absolute_start_idx, buffer_end_idx, absolute_end_idx, self.wrap_counter)
+                            
+                        except ValueError as ve:
+                            logger.warning("⚠️  Error parsing detection window indices: %s", ve)
+                    else:
+                        logger.debug("🔍 Detection window structure check failed: '%s'", response_text)
+                        
+                else:
+                    logger.debug("🔍 Missing keywords. 'indices' in parts: %s, 'to' in parts: %s", 'indices' in parts, 'to' in parts)
+                            
+            except Exception as e:
+                logger.exception("⚠️  Error parsing detection window: %s", e)
+
+        
+                
+        # Process R-peak detections
+        # Expected format: "R-peaks: 3 indices: 20 123 222"
+        if "R-peaks:" in response_text:
+            try:
+                # Split the response and find the indices part
+                parts = response_text.split()
+                
+                # Find the "indices:" keyword
+                if "indices:" in parts:
+                    indices_idx = parts.index("indices:")
+                    
+                    # Extract the number of R-peaks
+                    if indices_idx >= 2:
+                        num_peaks = int(parts[1])  # The number after "R-peaks:"
+                        
+                        # Extract all R-peak indices after "indices:"
+                        r_peak_indices = []
+                        for i in range(indices_idx + 1, min(indices_idx + 1 + num_peaks, len(parts))):
+                            try:
+                                r_peak_idx = int(parts[i])
+                                r_peak_indices.append(r_peak_idx)
+                            except ValueError:
+                                continue
+                        
+                        # R-peaks are relative to the start of the detection window
+                        # Convert r peaks to absolute indices using the latest detection window
+                        original_r_peaks = r_peak_indices.copy()  # Keep original for logging
+                        last_window = self.dashboard.segments.latest('detection_windows')
+                        if last_window is not None:
+                            window_start = last_window[0]  # This is already an absolute index
+                            r_peak_indices = [idx + window_start for idx in r_peak_indices]
+                            
+                            # Cross-check all firmware R-peaks against the host detector
+                            self.add_mcu_r_peaks(r_peak_indices)
+                            
+                            # Recorders that keep the full per-window R-peak set (e.g. the batch runner)
+                            add_r_peak_set = getattr(self.dashboard, 'add_r_peak_set', None)
+                            if add_r_peak_set:
+                                add_r_peak_set(r_peak_indices)
+                            
+                            if self.latency_tracker:
+                                self.latency_tracker.record_event('r_peaks', self.last_detection_end, received_time)
+
+                        # Add all R-peaks to dashboard
+                        #for r_peak_idx in r_peak_indices:
+                        #    self.dashboard.add_r_peak(r_peak_idx)
+                        #Add only the 2nd R-peak to avoid clutter
+                        added_peak_index = []
+                        if len(r_peak_indices) >= 2:
+                            self.dashboard.add_r_peak(r_peak_indices[1])
+                            added_peak_index = [r_peak_indices[1]]  # Keep only the added peak for logging
+
+                        logger.debug("📈 Detected %d R-peaks: %s→%s (relative to window start %s). Added %s to dashboard",
+                                     len(r_peak_indices), original_r_peaks, r_peak_indices,
+                                     window_start if last_window is not None else 'N/A',
+                                     added_peak_index[0] if added_peak_index else 'N/A')
+
+            except Exception as e:
+                logger.warning("⚠️  Error parsing R-peaks: %s", e)
+                pass
+
+
+        # Process model input windows
+        # Expected format: "Model input window: start 20 len 82"
+        if "Model input window:" in response_text:
+            try:
+                # Split the response and find the start/len values
+                parts = response_text.split()
+                
+                # Find "start" and "len" keywords
+                if "start" in parts and "len" in parts:
+                    start_idx = parts.index("start")
+                    len_idx = parts.index("len")
+                    
+                    # Make sure we have the right structure and enough parts
+                    if start_idx + 1 < len(parts) and len_idx + 1 < len(parts):
+                        try:
+                            relative_model_start = int(parts[start_idx + 1])  # Start index relative to detection window
+                            model_length = int(parts[len_idx + 1])   # Length of model input window
+                            
+                            # Model indices are relative to the start of the detection window
+                            # Convert to absolute indices using the latest detection window
+                            last_window = self.dashboard.segments.latest('detection_windows')
+                            if last_window is not None:
+                                window_start = last_window[0]  # This is already an absolute index
+                                
+                                # Calculate absolute indices: window_start + relative_position
+                                absolute_model_start = window_start + relative_model_start
+                                absolute_model_end = absolute_model_start + model_length - 1
+                                
+                                # Store model window indices for use by prediction parsing
+                                self.last_model_start = absolute_model_start
+                                self.last_model_end = absolute_model_end
+                                
+                                # Add model segment to dashboard with absolute indices
+                                # Note: Using "Model Input" as class name with 100% probability for visualization
+                                self.dashboard.add_model_segment(absolute_model_start, absolute_model_end, "Model Input", 1.0)
+                                
+                                # Run the reference classifier on the same window
+                                if self.shadow_inference:
+                                    self.shadow_inference.submit_window(absolute_model_start, absolute_model_end)
+                                
+                                logger.debug("📊 Added model input window to dashboard: relative_start=%d, len=%d → absolute indices %d to %d (relative to window start %d)",
+                                             relative_model_start, model_length, absolute_model_start, absolute_model_end, window_start)
+                                
+                            else:
+                                logger.warning("⚠️  No detection window available for model input window calculation")
+                            
+                        except ValueError as ve:
+                            logger.warning("⚠️  Error parsing model input window values: %s", ve)
+                            
+            except Exception as e:
+                logger.warning("⚠️  Error parsing model input window: %s", e)
+                pass
+
+        # Process model predictions
+        if "probs: " in response_text:
+            try:
+                # Extract prediction info from response (adjust format as needed)
+                # Expected format: "'ECG inference 2 probs: prob_class0 prob_class1 prob_class2 prob_class3 prob_class4 prob_class5 prob_class6'"
+                parts = response_text.split()
+                
+                if len(parts) >= 10:  # "ECG inference 2 probs:" + 7 probability values
+                    # Extract probabilities (should start from index 4)
+                    probs_start_idx = response_text.find("probs:") + 6  # Find "probs:" and skip it
+                    prob_text = response_text[probs_start_idx:].strip()
+                    prob_values = prob_text.split()
+                    
+                    if len(prob_values) >= 7:
+                        # Convert probability strings to floats
+                        probabilities = [float(p) for p in prob_values[:7]]
+                        
+                        # Find the class with highest probability
+                        max_prob_idx = probabilities.index(max(probabilities))
+                        pred_class = CLASS_NAMES[max_prob_idx]
+                        probability = probabilities[max_prob_idx]
+                        
+                        # Model windows lie inside the detection window, so its end is the newest sample covered
+                        if self.latency_tracker:
+                            self.latency_tracker.record_event('prediction', self.last_detection_end, received_time)
+                        
+                        # Use the model window indices from the most recent model input window
+                        if self.last_model_start is not None and self.last_model_end is not None:
+                            # Add model segment with prediction to dashboard using stored indices
+                            self.dashboard.add_model_segment(self.last_model_start, self.last_model_end, pred_class, probability)
+                            add_class_probabilities = getattr(self.dashboard, 'add_class_probabilities', None)
+                            if add_class_probabilities:
+                                add_class_probabilities(self.last_model_start, self.last_model_end, probabilities)
+                            logger.info("🤖 Model Prediction: %s (%.2f%%) at indices %d to %d",
+                                        pred_class, probability * 100, self.last_model_start, self.last_model_end)
+                            
+                            # Keep the full MCU probability vector next to the host shadow result
+                            if self.shadow_inference:
+                                self.shadow_inference.record_mcu_prediction(self.last_model_start, self.last_model_end, probabilities)
+                        else:
+                            logger.warning("⚠️  No model input window indices available for prediction visualization")
+                        
+                        # Detailed probability breakdown (one record, only built when DEBUG is on)
+                        if logger.isEnabledFor(logging.DEBUG):
+                            breakdown = "\n".join(f"  {class_name}: {prob:.4f}{' ← PREDICTED' if i == max_prob_idx else ''}"
+                                                  for i, (class_name, prob) in enumerate(zip(CLASS_NAMES, probabilities)))
+                            logger.debug("Model prediction breakdown:\n%s", breakdown)
+                        
+            except Exception as e:
+                logger.warning("Error parsing model prediction: %s", e)
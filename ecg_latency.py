@@ -0,0 +1,167 @@
+"""
+End-to-end MCU pipeline latency measurement
+The TX path timestamps every sample index it sends; the response parser looks up
+the timestamp of the newest sample an event covers and records the latency.
+"""
+
+import threading
+
+import numpy as np
+
+EVENT_KINDS = ('detection', 'r_peaks', 'prediction')
+
+
+class PipelineLatencyTracker:
+    def __init__(self, capacity=4096, min_latency_ms=0.01, max_latency_ms=1000.0, bins_per_decade=20):
+        """
+        Sample-to-event latency tracker with log-spaced fixed-bin histograms
+
+        Histograms use fixed bins, so memory stays constant however many events arrive.
+        Bins are log-spaced (about 12% wide at 20 per decade), so sub-millisecond
+        simulator latencies and 100 ms board latencies are resolved alike.
+
+        Args:
+            capacity (int): Initial number of TX timestamps allocated (grows as needed)
+            min_latency_ms (float): Lower edge of the histogram (smaller values go to the first bin)
+            max_latency_ms (float): Upper edge of the histogram (larger values go to the last bin)
+            bins_per_decade (int): Histogram resolution
+        """
+        self.tx_times = np.full(capacity, np.nan)
+        self.lock = threading.Lock()
+
+        decades = np.log10(max_latency_ms / min_latency_ms)
+        self.bin_edges = np.geomspace(min_latency_ms, max_latency_ms, int(round(decades * bins_per_decade)) + 1)
+        self.histograms = {kind: np.zeros(len(self.bin_edges) - 1, dtype=np.int64) for kind in EVENT_KINDS}
+        self.counts = {kind: 0 for kind in EVENT_KINDS}
+        self.sums = {kind: 0.0 for kind in EVENT_KINDS}
+        self.minima = {kind: np.inf for kind in EVENT_KINDS}
+        self.maxima = {kind: 0.0 for kind in EVENT_KINDS}
+        self.unmatched = {kind: 0 for kind in EVENT_KINDS}
+
+    def record_tx(self, sample_index, send_time):
+        """
+        Record when a sample index was sent (called from the TX thread)
+
+        Args:
+            sample_index (int): Absolute sample index
+            send_time (float): time.perf_counter() right after the write
+        """
+        if sample_index >= self.tx_times.size:
+            with self.lock:
+                if sample_index >= self.tx_times.size:
+                    grown = np.full(max(sample_index + 1, 2 * self.tx_times.size), np.nan)
+                    grown[:self.tx_times.size] = self.tx_times
+                    self.tx_times = grown
+        self.tx_times[sample_index] = send_time
+
+    def samples_sent_before(self, event_time, samples_sent):
+        """
+        Count the samples that had been sent at a given time
+
+        Args:
+            event_time (float): time.perf_counter() timestamp
+            samples_sent (int): Number of samples sent so far (upper bound of the search)
+
+        Returns:
+            int: Number of samples whose send time is not after event_time
+        """
+        tx_times = self.tx_times
+        samples_sent = min(samples_sent, tx_times.size)
+        return int(np.searchsorted(tx_times[:samples_sent], event_time, side='right'))
+
+    def record_event(self, kind, sample_index, received_time):
+        """
+        Record the latency of an event covering samples up to sample_index
+
+        Args:
+            kind (str): 'detection', 'r_peaks' or 'prediction'
+            sample_index (int): Absolute index of the newest sample the event covers
+            received_time (float): time.perf_counter() when the event line was received
+
+        Returns:
+            float or None: Latency in milliseconds, or None if the sample was never timestamped
+        """
+        tx_times = self.tx_times
+        if sample_index is None or not 0 <= sample_index < tx_times.size or np.isnan(tx_times[sample_index]):
+            self.unmatched[kind] += 1
+            return None
+        latency_ms = (received_time - tx_times[sample_index]) * 1000.0
+        if latency_ms < 0:
+            # Event claims to cover a sample not sent yet: index reconciliation is off
+            self.unmatched[kind] += 1
+            return None
+
+        with self.lock:
+            bin_index = min(max(int(np.searchsorted(self.bin_edges, latency_ms, side='right')) - 1, 0),
+                            len(self.histograms[kind]) - 1)
+            self.histograms[kind][bin_index] += 1
+            self.counts[kind] += 1
+            self.sums[kind] += latency_ms
+            self.minima[kind] = min(self.minima[kind], latency_ms)
+            self.maxima[kind] = max(self.maxima[kind], latency_ms)
+        return latency_ms
+
+    def percentile(self, kind, q):
+        """
+        Approximate percentile from the histogram, interpolated (log-linearly) within
+        its bin and clipped to the observed minimum and maximum
+
+        Args:
+            kind (str): Event kind
+            q (float): Percentile in [0, 100]
+
+        Returns:
+            float or None: Latency in milliseconds
+        """
+        histogram = self.histograms[kind]
+        total = histogram.sum()
+        if total == 0:
+            return None
+        cumulative = np.cumsum(histogram)
+        target = q / 100.0 * total
+        rank = min(int(np.searchsorted(cumulative, target)), len(histogram) - 1)
+        below = cumulative[rank] - histogram[rank]
+        fraction = (target - below) / histogram[rank] if histogram[rank] else 1.0
+        lower_edge, upper_edge = self.bin_edges[rank], self.bin_edges[rank + 1]
+        value = float(lower_edge * (upper_edge / lower_edge) ** fraction)
+        return min(max(value, self.minima[kind]), self.maxima[kind])
+
+    def summary(self):
+        """
+        Per-event-kind latency summary
+
+        Returns:
+            dict: kind -> count, unmatched, mean_ms, p50_ms, p95_ms, p99_ms, max_ms
+        """
+        with self.lock:
+            result = {}
+            for kind in EVENT_KINDS:
+                count = self.counts[kind]
+                result[kind] = {
+                    'count': count,
+                    'unmatched': self.unmatched[kind],
+                    'mean_ms': self.sums[kind] / count if count else None,
+                    'p50_ms': self.percentile(kind, 50),
+                    'p95_ms': self.percentile(kind, 95),
+                    'p99_ms': self.percentile(kind, 99),
+                    'max_ms': self.maxima[kind] if count else None,
+                }
+            return result
+
+    def format_summary(self):
+        """
+        Format the summary as a table for the end-of-run report
+
+        Returns:
+            str: One line per event kind
+        """
+        lines = [f"{'Event':<12}{'count':>8}{'mean':>10}{'p50':>10}{'p95':>10}{'p99':>10}{'max':>10}  (ms)"]
+        for kind, stats in self.summary().items():
+            if stats['count'] == 0:
+                lines.append(f"{kind:<12}{0:>8}{'--':>10}{'--':>10}{'--':>10}{'--':>10}{'--':>10}")
+                continue
+            lines.append(f"{kind:<12}{stats['count']:>8}{stats['mean_ms']:>10.1f}{stats['p50_ms']:>10.1f}"
+                         f"{stats['p95_ms']:>10.1f}{stats['p99_ms']:>10.1f}{stats['max_ms']:>10.1f}")
+            if stats['unmatched']:
+                lines[-1] += f"  ({stats['unmatched']} unmatched)"
+        return '\n'.join(lines)
@@ -0,0 +1,110 @@
+"""
+Asynchronous leveled logging
+Hot-path modules log through the 'ecg' logger; records are only enqueued on
+the calling thread and formatted/written by a background QueueListener to the
+console and, optionally, a JSONL file.
+"""
+
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+
+ROOT_LOGGER = 'ecg'
+
+_listener = None
+
+
+def get_logger(name):
+    """
+    Logger of one module below the 'ecg' root logger
+
+    Args:
+        name (str): Module name (e.g. 'integration')
+
+    Returns:
+        logging.Logger: Logger named 'ecg.<name>'
+    """
+    return logging.getLogger(f"{ROOT_LOGGER}.{name}")
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that leaves message formatting to the listener thread"""
+
+    def prepare(self, record):
+        # The stock prepare() formats the message on the calling thread; callers pass
+        # immutable arguments, so the record can be queued as-is
+        return record
+
+
+class JsonlFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, thread, message"""
+
+    def format(self, record):
+        entry = {
+            'time': record.created,
+            'level': record.levelname,
+            'logger': record.name,
+            'thread': record.threadName,
+            'message': record.getMessage(),
+        }
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+def setup_logging(level='INFO', jsonl_path=None, console=True, console_level=None):
+    """
+    Route the 'ecg' loggers through a queue to a background writer thread
+
+    Debug output is off unless level='DEBUG'. Calling it again replaces the
+    previous configuration.
+
+    Args:
+        level (str or int): Lowest level that is enqueued at all
+        jsonl_path (str, optional): Append every record as JSON to this file
+        console (bool): Also write records to stdout
+        console_level (str or int, optional): Console threshold (default: level)
+
+    Returns:
+        logging.handlers.QueueListener: The running listener
+    """
+    global _listener
+    shutdown_logging()
+
+    handlers = []
+    if console:
+        console_handler = logging.StreamHandler(sys.stdout)
+        console_handler.setFormatter(logging.Formatter('%(message)s'))
+        console_handler.setLevel(console_level or level)
+        handlers.append(console_handler)
+    if jsonl_path:
+        file_handler = logging.FileHandler(jsonl_path, encoding='utf-8')
+        file_handler.setFormatter(JsonlFormatter())
+        handlers.append(file_handler)
+
+    log_queue = queue.SimpleQueue()
+    logger = logging.getLogger(ROOT_LOGGER)
+    logger.handlers = [DeferredQueueHandler(log_queue)]
+    logger.setLevel(level)
+    logger.propagate = False
+
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+
+def set_log_level(level):
+    """Change the level of the 'ecg' loggers at run time (e.g. 'DEBUG' to see per-message output)"""
+    logging.getLogger(ROOT_LOGGER).setLevel(level)
+
+
+def shutdown_logging():
+    """Flush the queued records and stop the writer thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
@@ -0,0 +1,119 @@
+"""
+Session overview summary
+Fixed number of min/max bins covering the whole session, plus per-bin counts of
+model predictions, for drawing an overview strip under the main plot. When the
+session outgrows the bins, neighbouring bins are merged and the bin size doubles,
+so the arrays to draw never grow and appends stay amortized O(1) per sample.
+"""
+
+import numpy as np
+
+
+class OverviewSummary:
+    def __init__(self, num_bins=1024, bin_size=125):
+        """
+        Incremental min/max summary of a growing sample stream
+
+        Args:
+            num_bins (int): Number of bins kept (even; the drawn size, independent of session length)
+            bin_size (int): Initial samples per bin (doubled each time the bins fill up)
+        """
+        self.num_bins = num_bins + num_bins % 2
+        self.bin_size = bin_size
+        self.mins = np.full(self.num_bins, np.nan)
+        self.maxs = np.full(self.num_bins, np.nan)
+        self.predictions = np.zeros(self.num_bins, dtype=np.int64)  # Model predictions per bin
+        self.abnormal = np.zeros(self.num_bins, dtype=np.int64)     # Non-Normal predictions per bin
+        self.sample_count = 0
+        self.value_min = np.nan
+        self.value_max = np.nan
+        self.version = 0  # Changes whenever the summary changes (lets backends skip redraws)
+
+    def add_block(self, block):
+        """
+        Fold a block of new samples into the bins (NaN gaps are ignored)
+
+        Args:
+            block (array-like): Samples following the ones already added
+        """
+        block = np.asarray(block, dtype=float)
+        if block.size == 0:
+            return
+        while self.sample_count + block.size > self.num_bins * self.bin_size:
+            self.compress()
+
+        # Finish the partially filled bin
+        offset = 0
+        partial = self.sample_count % self.bin_size
+        if partial:
+            offset = min(block.size, self.bin_size - partial)
+            self.fold(self.sample_count // self.bin_size, block[:offset])
+        # Whole bins at once, then the start of the next bin
+        first_bin = (self.sample_count + offset) // self.bin_size
+        whole = (block.size - offset) // self.bin_size
+        if whole:
+            chunk = block[offset:offset + whole * self.bin_size].reshape(whole, self.bin_size)
+            self.mins[first_bin:first_bin + whole] = np.fmin.reduce(chunk, axis=1)
+            self.maxs[first_bin:first_bin + whole] = np.fmax.reduce(chunk, axis=1)
+            offset += whole * self.bin_size
+        if offset < block.size:
+            self.fold(first_bin + whole, block[offset:])
+
+        self.value_min = np.fmin(self.value_min, np.fmin.reduce(block))
+        self.value_max = np.fmax(self.value_max, np.fmax.reduce(block))
+        self.sample_count += block.size
+        self.version += 1
+
+    def fold(self, bin_index, values):
+        self.mins[bin_index] = np.fmin(self.mins[bin_index], np.fmin.reduce(values))
+        self.maxs[bin_index] = np.fmax(self.maxs[bin_index], np.fmax.reduce(values))
+
+    def add_prediction(self, sample_index, abnormal):
+        """
+        Count one model prediction in the bin of its start sample
+
+        Args:
+            sample_index (int): Start sample index of the predicted segment
+            abnormal (bool): Prediction is not 'Normal' (PVC or other class)
+        """
+        while sample_index >= self.num_bins * self.bin_size:
+            self.compress()
+        bin_index = max(0, sample_index) // self.bin_size
+        self.predictions[bin_index] += 1
+        self.abnormal[bin_index] += bool(abnormal)
+        self.version += 1
+
+    def compress(self):
+        """Merge neighbouring bins pairwise and double the bin size"""
+        half = self.num_bins // 2
+        self.mins[:half] = np.fmin(self.mins[0::2], self.mins[1::2])
+        self.maxs[:half] = np.fmax(self.maxs[0::2], self.maxs[1::2])
+        self.predictions[:half] = self.predictions[0::2] + self.predictions[1::2]
+        self.abnormal[:half] = self.abnormal[0::2] + self.abnormal[1::2]
+        self.mins[half:] = np.nan
+        self.maxs[half:] = np.nan
+        self.predictions[half:] = 0
+        self.abnormal[half:] = 0
+        self.bin_size *= 2
+
+    def span(self, sampling_rate):
+        """Time (seconds) covered by all bins at the current bin size"""
+        return self.num_bins * self.bin_size / sampling_rate
+
+    def envelope(self, sampling_rate):
+        """
+        Min/max envelope as one zig-zag polyline (fixed length, NaN where there is no data)
+
+        Returns:
+            tuple: (times, values), each of length 2 * num_bins
+        """
+        times = np.repeat((np.arange(self.num_bins) + 0.5) * self.bin_size / sampling_rate, 2)
+        values = np.empty(2 * self.num_bins)
+        values[0::2] = self.mins
+        values[1::2] = self.maxs
+        return times, values
+
+    def abnormal_density(self):
+        """Fraction of non-Normal predictions per bin (NaN for bins without predictions)"""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(self.predictions > 0, self.abnormal / self.predictions, np.nan)
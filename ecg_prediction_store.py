@@ -0,0 +1,164 @@
+"""
+Columnar prediction store
+Every 7-class probability vector from the "probs:" parser, kept as growable
+NumPy columns (start, end, probabilities) indexed by absolute sample range, with
+vectorized queries: threshold filters, class occupancy over time and
+probability traces for a plot panel.
+"""
+
+import threading
+
+import numpy as np
+
+CLASS_NAMES = ["Normal", "Abnormal", "LBBB", "RBBB", "PVC", "MI", "CHF"]
+
+
+class PredictionStore:
+    def __init__(self, class_names=CLASS_NAMES, initial_capacity=1024):
+        """
+        Append-only columns of model predictions, amortized O(1) appends
+
+        Rows are kept in arrival order, which is sample order for the MCU
+        (model windows only move forward), so range queries use binary search
+        on the start column.
+
+        Args:
+            class_names (list): Class of each probability column
+            initial_capacity (int): Rows allocated up front
+        """
+        self.class_names = list(class_names)
+        self.starts = np.empty(initial_capacity, dtype=np.int64)
+        self.ends = np.empty(initial_capacity, dtype=np.int64)
+        self.probabilities = np.empty((initial_capacity, len(self.class_names)), dtype=np.float32)
+        self.length = 0
+        self.ordered = True  # Starts never decrease (else range queries fall back to a full mask)
+        self.max_span = 0    # Longest window (end - start), bounds the binary search of range queries
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return self.length
+
+    def class_index(self, class_name):
+        return self.class_names.index(class_name)
+
+    def append(self, start_index, end_index, probabilities):
+        """
+        Add one prediction
+
+        Args:
+            start_index (int): Absolute start sample of the model input window
+            end_index (int): Absolute end sample of the model input window
+            probabilities (list): One probability per class
+        """
+        with self.lock:
+            if self.length == self.starts.size:
+                # Grow geometrically so appends stay amortized O(1)
+                capacity = 2 * self.starts.size
+                self.starts = np.resize(self.starts, capacity)
+                self.ends = np.resize(self.ends, capacity)
+                grown = np.empty((capacity, self.probabilities.shape[1]), dtype=self.probabilities.dtype)
+                grown[:self.length] = self.probabilities[:self.length]
+                self.probabilities = grown
+            if self.length and start_index < self.starts[self.length - 1]:
+                self.ordered = False
+            self.max_span = max(self.max_span, end_index - start_index)
+            self.starts[self.length] = start_index
+            self.ends[self.length] = end_index
+            self.probabilities[self.length] = probabilities[:self.probabilities.shape[1]]
+            self.length += 1
+
+    def columns(self):
+        """
+        Snapshot of the filled columns (views, valid until the next reallocation)
+
+        Returns:
+            tuple: (starts, ends, probabilities)
+        """
+        with self.lock:
+            n = self.length
+            return self.starts[:n], self.ends[:n], self.probabilities[:n]
+
+    def rows_in_range(self, start_index, end_index):
+        """
+        Rows whose window overlaps an absolute sample range
+
+        Returns:
+            numpy.ndarray: Row indices into the columns() arrays
+        """
+        starts, ends, _ = self.columns()
+        if not self.ordered:
+            return np.flatnonzero((ends >= start_index) & (starts <= end_index))
+        # Only windows starting within max_span before the range can reach into it
+        first = int(np.searchsorted(starts, start_index - self.max_span, side='left'))
+        last = int(np.searchsorted(starts, end_index, side='right'))
+        return first + np.flatnonzero(ends[first:last] >= start_index)
+
+    def in_range(self, start_index, end_index):
+        """
+        Predictions overlapping an absolute sample range
+
+        Returns:
+            tuple: (starts, ends, probabilities) of the overlapping rows
+        """
+        starts, ends, probabilities = self.columns()
+        rows = self.rows_in_range(start_index, end_index)
+        return starts[rows], ends[rows], probabilities[rows]
+
+    def where(self, class_name, min_probability, start_index=None, end_index=None):
+        """
+        Windows where P(class) exceeds a threshold, e.g. where('PVC', 0.8)
+
+        Args:
+            class_name (str): Class to test
+            min_probability (float): Exclusive probability threshold
+            start_index (int, optional): Restrict to windows overlapping this sample range
+            end_index (int, optional): End of the range (inclusive)
+
+        Returns:
+            tuple: (starts, ends, probabilities) of the matching rows
+        """
+        if start_index is None and end_index is None:
+            starts, ends, probabilities = self.columns()
+        else:
+            starts, ends, probabilities = self.in_range(start_index if start_index is not None else 0,
+                                                        end_index if end_index is not None else np.iinfo(np.int64).max)
+        mask = probabilities[:, self.class_index(class_name)] > min_probability
+        return starts[mask], ends[mask], probabilities[mask]
+
+    def predicted_classes(self):
+        """Argmax class index of every row"""
+        return self.columns()[2].argmax(axis=1)
+
+    def class_occupancy(self, bin_samples, start_index=0, end_index=None):
+        """
+        Predictions per (argmax) class in fixed time bins
+
+        Args:
+            bin_samples (int): Bin width in samples
+            start_index (int): First sample of the first bin
+            end_index (int, optional): Last sample covered (default: newest window end)
+
+        Returns:
+            tuple: (bin_starts, counts) with counts of shape (bins, classes);
+                   divide by counts.sum(axis=1) for the class fractions
+        """
+        starts, ends, probabilities = self.columns()
+        if end_index is None:
+            end_index = int(ends.max()) if len(ends) else start_index
+        bins = max(1, (end_index - start_index) // bin_samples + 1)
+        selected = (starts >= start_index) & (starts <= end_index)
+        bin_index = (starts[selected] - start_index) // bin_samples
+        classes = probabilities[selected].argmax(axis=1)
+        num_classes = probabilities.shape[1]
+        counts = np.bincount(bin_index * num_classes + classes, minlength=bins * num_classes)
+        return start_index + np.arange(bins) * bin_samples, counts[:bins * num_classes].reshape(bins, num_classes)
+
+    def traces(self, start_index, end_index, sampling_rate):
+        """
+        Probability of every class at each window center in a sample range (for plotting)
+
+        Returns:
+            tuple: (times in seconds, probabilities of shape (rows, classes))
+        """
+        starts, ends, probabilities = self.in_range(start_index, end_index)
+        return (starts + ends) / (2.0 * sampling_rate), probabilities
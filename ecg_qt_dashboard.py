@@ -0,0 +1,391 @@
+"""
+High-rate dashboard backend (pyqtgraph)
+Same inputs and navigation as ECGDashboard (follow mode, arrow keys, R reset,
+Space toggle, ,/. event jumps, F filtered trace, B queue overlay, session overview strip) drawn
+with pyqtgraph. Visible traces are peak-downsampled to about one min/max pair per
+pixel column, so the frame cost hardly grows with the number of visible samples (100k+).
+
+Requires: pip install pyqtgraph PyQt5
+Offscreen check: python ecg_qt_dashboard.py --offscreen [--points 100000]
+"""
+
+import argparse
+import os
+import time
+
+import numpy as np
+
+# pyqtgraph and a Qt binding are optional (only needed for this backend)
+try:
+    import pyqtgraph as pg
+    from pyqtgraph.Qt import QtCore, QtWidgets
+except ImportError:
+    pg = None
+
+from ecg_dashboard_base import ECGDashboardBase, CLASS_COLORS
+
+QT_KEYS = {}
+if pg is not None:
+    QT_KEYS = {
+        QtCore.Qt.Key_Left: 'left', QtCore.Qt.Key_Right: 'right', QtCore.Qt.Key_Up: 'up',
+        QtCore.Qt.Key_Down: 'down', QtCore.Qt.Key_R: 'r', QtCore.Qt.Key_Space: ' ',
+        QtCore.Qt.Key_F: 'f', QtCore.Qt.Key_B: 'b', QtCore.Qt.Key_Period: '.', QtCore.Qt.Key_Comma: ',',
+        QtCore.Qt.Key_E: 'e',
+    }
+
+    class ECGPlotWindow(pg.GraphicsLayoutWidget):
+        """Plot window forwarding key presses to the dashboard"""
+
+        def __init__(self, key_handler, **kwargs):
+            super().__init__(**kwargs)
+            self.key_handler = key_handler
+
+        def keyPressEvent(self, event):
+            key = QT_KEYS.get(event.key())
+            if key is None:
+                super().keyPressEvent(event)
+            else:
+                self.key_handler(key)
+
+
+class ECGQtDashboard(ECGDashboardBase):
+    def __init__(self, window_size=1250, sampling_rate=125, title=None, fps=60, show_overview=True,
+                 show_probabilities=True, **kwargs):
+        """
+        ECG real-time dashboard drawn with pyqtgraph
+
+        Args:
+            window_size (int): Number of samples to display in the scrolling window
+            sampling_rate (int): Sampling rate in Hz (for time axis)
+            title (str, optional): Window title
+            fps (int): Target frame rate
+            show_overview (bool): Whole-session overview strip with a draggable viewport
+            show_probabilities (bool): Panel with the 7-class probability traces
+            **kwargs: Input options of ECGDashboardBase (show_filtered, data_queue_policy, retention, ...)
+        """
+        if pg is None:
+            raise ImportError("The pyqtgraph backend needs pyqtgraph and a Qt binding: pip install pyqtgraph PyQt5")
+        super().__init__(window_size=window_size, sampling_rate=sampling_rate, **kwargs)
+        self.fps = fps
+        self.frame_count = 0
+        self.segment_key = None
+
+        self.app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+        print(f"ECG Dashboard initializing with pyqtgraph on Qt platform: {self.app.platformName()}")
+        # Plain (non-segmented) polylines are the fastest raster path for one thin pen
+        pg.setConfigOptions(antialias=False, background='w', foreground='k', segmentedLineMode='off')
+        self.window = ECGPlotWindow(self.on_key, title=title or 'Real-time ECG Dashboard (pyqtgraph)')
+        self.window.resize(1500, 800)
+        self.plot = self.window.addPlot(row=0, col=0)
+        self.plot.setLabel('bottom', 'Time (seconds)')
+        self.plot.setLabel('left', 'Normalized ECG Amplitude')
+        self.plot.showGrid(x=True, y=True, alpha=0.3)
+        self.plot.setYRange(-0.1, 1.1)
+        self.plot.setXRange(0, self.time_window, padding=0)
+        self.plot.addLegend(offset=(-10, 10))
+        # Mouse pan/zoom leaves follow mode, like in the matplotlib backend
+        self.plot.getViewBox().sigRangeChangedManually.connect(self.on_manual_range)
+
+        # Segment highlights: one bar item per row group, one scatter for all R-peaks
+        # (translucent brushes rather than item opacity, which would force an extra composition pass)
+        self.detection_bars = pg.BarGraphItem(x0=[], width=[], y0=[], height=[],
+                                              brush=self.translucent_brush(self.colors['detection_windows'], 0.6), pen=None)
+        self.input_bars = pg.BarGraphItem(x0=[], width=[], y0=[], height=[],
+                                          brush=self.translucent_brush(self.colors['model_segments'], 0.6), pen=None)
+        self.prediction_bars = pg.BarGraphItem(x0=[], width=[], y0=[], height=[], brushes=[], pen=None)
+        for item in (self.prediction_bars, self.input_bars, self.detection_bars):
+            self.plot.addItem(item)
+        self.prediction_labels = []
+        self.prediction_brushes = {name: self.translucent_brush(color, 0.4) for name, color in
+                                   (('Normal', 'lightgreen'), ('PVC', 'lightcoral'), ('other', 'lightyellow'))}
+
+        # Width-1 pens and about one min/max pair per pixel column keep 100k+ points cheap
+        self.ecg_curve = self.plot.plot([], [], pen=pg.mkPen(self.colors['ecg_line'], width=1), name='ECG Signal',
+                                        autoDownsampleFactor=1.0)
+        self.filtered_curve = self.plot.plot([], [], pen=pg.mkPen(self.colors['filtered_line'], width=1),
+                                             name='Filtered ECG', autoDownsampleFactor=1.0)
+        for curve in (self.ecg_curve, self.filtered_curve):
+            curve.setDownsampling(auto=True, method='peak')
+            curve.setClipToView(True)
+            curve.setSkipFiniteCheck(True)
+        self.filtered_curve.setVisible(self.show_filtered)
+        self.r_peak_scatter = pg.ScatterPlotItem(size=9, brush=pg.mkBrush(self.colors['r_peaks']),
+                                                 pen=pg.mkPen('darkred', width=2), name='R-peak')
+        self.r_peak_scatter.setZValue(15)
+        self.plot.addItem(self.r_peak_scatter)
+
+        # Probability traces and whole-session overview strip
+        self.prob_plot = None
+        if show_probabilities:
+            self.setup_probability_panel(row=1)
+        self.overview_plot = None
+        if show_overview:
+            self.setup_overview(row=1 + show_probabilities)
+
+        # HR/HRV panel and queue telemetry below the plot
+        self.status_label = self.window.addLabel('', row=1 + show_probabilities + show_overview, col=0, justify='left')
+
+        self.timer = QtCore.QTimer()
+        self.timer.timeout.connect(self.render_frame)
+
+    def setup_probability_panel(self, row):
+        """Probability row: one trace per class at the window centers, x axis linked to the main plot"""
+        self.prob_plot = self.window.addPlot(row=row, col=0)
+        self.prob_plot.setMaximumHeight(160)
+        self.prob_plot.setXLink(self.plot)
+        self.prob_plot.setYRange(-0.02, 1.05, padding=0)
+        self.prob_plot.setMouseEnabled(x=False, y=False)
+        self.prob_plot.hideButtons()
+        self.prob_plot.setLabel('left', 'P(class)')
+        self.prob_plot.addLegend(offset=(10, 5), colCount=len(self.predictions.class_names))
+        self.prob_curves = [self.prob_plot.plot([], [], pen=pg.mkPen(CLASS_COLORS[name], width=1), symbol='o',
+                                                symbolSize=4, symbolPen=None,
+                                                symbolBrush=pg.mkBrush(CLASS_COLORS[name]), name=name)
+                            for name in self.predictions.class_names]
+        self.prob_key = None
+
+    def setup_overview(self, row):
+        """Overview row: min/max envelope, abnormal-prediction density band, draggable viewport"""
+        self.overview_plot = self.window.addPlot(row=row, col=0)
+        self.overview_plot.setMaximumHeight(110)
+        self.overview_plot.hideAxis('left')
+        self.overview_plot.setMouseEnabled(x=False, y=False)
+        self.overview_plot.hideButtons()
+        self.overview_curve = self.overview_plot.plot([], [], pen=pg.mkPen(self.colors['ecg_line'], width=1))
+        # Fraction of non-Normal predictions per bin (transparent where there are none)
+        self.overview_density = pg.ImageItem(levels=(0, 1))
+        self.overview_density.setLookupTable(pg.ColorMap([0, 1], [(255, 220, 220, 0), (200, 0, 0, 255)]).getLookupTable())
+        self.overview_density.setZValue(-10)
+        self.overview_plot.addItem(self.overview_density)
+        self.overview_region = pg.LinearRegionItem(values=(0, self.time_window),
+                                                   brush=self.translucent_brush('gold', 0.35))
+        self.overview_region.sigRegionChanged.connect(self.on_overview_region)
+        self.overview_plot.addItem(self.overview_region)
+        self.overview_version = None
+        self.updating_overview = False
+
+    @staticmethod
+    def translucent_brush(color, alpha):
+        brush = pg.mkBrush(color)
+        brush_color = brush.color()
+        brush_color.setAlphaF(alpha)
+        brush.setColor(brush_color)
+        return brush
+
+    def on_key(self, key):
+        """Navigation keys (shared semantics) and display toggles"""
+        if key == 'f':
+            self.show_filtered = not self.show_filtered
+            self.filtered_curve.setVisible(self.show_filtered)
+        elif key == 'b':
+            self.show_queue_overlay = not self.show_queue_overlay
+        else:
+            (x0, x1), _ = self.plot.getViewBox().viewRange()
+            new_xlim = self.navigate(key, (x0, x1))
+            if new_xlim is not None:
+                self.plot.setXRange(*new_xlim, padding=0)
+
+    def on_manual_range(self, *args):
+        (x0, x1), _ = self.plot.getViewBox().viewRange()
+        self.follow_mode = False
+        self.manual_xlim = (x0, x1)
+
+    def on_overview_region(self):
+        """Dragging the overview viewport moves (or, by its edges, resizes) the main view"""
+        if self.updating_overview:
+            return
+        x0, x1 = self.overview_region.getRegion()
+        self.plot.setXRange(*self.pan_to(x0, x1 - x0), padding=0)
+
+    def update_probability_panel(self, first_idx, last_idx):
+        """Redraw the probability traces when new predictions arrived or the view moved"""
+        if self.prob_plot is None:
+            return
+        prob_key = (len(self.predictions), first_idx, last_idx)
+        if prob_key == self.prob_key:
+            return
+        self.prob_key = prob_key
+        times, probabilities = self.predictions.traces(first_idx, last_idx, self.sampling_rate)
+        for i, curve in enumerate(self.prob_curves):
+            curve.setData(times, probabilities[:, i])
+
+    def update_overview(self, view_start, view_end, refresh_frames=5):
+        """Move the viewport; redraw the fixed-size summary every refresh_frames frames when it changed"""
+        if self.overview_plot is None:
+            return
+        self.updating_overview = True
+        self.overview_region.setRegion((view_start, view_end))
+        self.updating_overview = False
+
+        summary = self.overview
+        if summary.version == self.overview_version or self.frame_count % refresh_frames:
+            return
+        self.overview_version = summary.version
+        self.overview_curve.setData(*summary.envelope(self.sampling_rate), connect='finite')
+        self.overview_plot.setXRange(0, max(self.time_window, summary.sample_count / self.sampling_rate), padding=0)
+        if not np.isnan(summary.value_min):
+            margin = max(1e-6, (summary.value_max - summary.value_min) * 0.05)
+            low, high = summary.value_min - margin, summary.value_max + margin
+            # Density band in a strip of its own below the envelope
+            band = (high - low) * 0.35
+            self.overview_plot.setYRange(low - band, high, padding=0)
+            density = np.nan_to_num(summary.abnormal_density(), nan=0.0)
+            self.overview_density.setImage(density[:, np.newaxis], levels=(0, 1), autoLevels=False)
+            self.overview_density.setRect(QtCore.QRectF(0, low - band, summary.span(self.sampling_rate), band))
+
+    def render_frame(self):
+        """Timer callback: ingest queued samples and redraw the visible window"""
+        self.drain_data_queue()
+        self.frame_count += 1
+        if self.sample_count == 0:
+            return
+
+        if self.follow_mode:
+            view_start, view_end = self.follow_xlim()
+            self.plot.setXRange(view_start, view_end, padding=0)
+        elif self.manual_xlim is not None:
+            view_start, view_end = self.manual_xlim
+            self.plot.setXRange(view_start, view_end, padding=0)
+        else:
+            (view_start, view_end), _ = self.plot.getViewBox().viewRange()
+        first_idx, last_idx = self.visible_index_range(view_start, view_end)
+
+        if last_idx >= first_idx:
+            times = np.arange(first_idx, last_idx + 1) / self.sampling_rate
+            self.ecg_curve.setData(times, self.raw_store.view(first_idx, last_idx))
+            last_filtered_idx = min(last_idx, len(self.filtered_store) - 1)
+            if self.show_filtered and last_filtered_idx >= first_idx:
+                self.filtered_curve.setData(times[:last_filtered_idx - first_idx + 1],
+                                            self.filtered_store.view(first_idx, last_filtered_idx) + self.filtered_offset)
+        else:
+            self.ecg_curve.setData([], [])
+
+        # Highlights only change when segments arrive or the view moves
+        segment_key = (tuple(self.segments.counts().values()), first_idx, last_idx)
+        if segment_key != self.segment_key:
+            self.segment_key = segment_key
+            self.draw_highlights(first_idx, last_idx)
+        self.update_probability_panel(first_idx, last_idx)
+        self.update_overview(view_start, view_end)
+        self.update_status()
+
+    def draw_highlights(self, first_idx, last_idx):
+        """Update the segment items for the visible index range (same layout as ECGDashboard)"""
+        rate = self.sampling_rate
+        windows = self.segments.window('detection_windows', first_idx, last_idx)
+        rows = np.arange(len(windows)) % 4
+        starts = np.array([w[0] for w in windows], dtype=float) / rate
+        ends = np.array([w[1] for w in windows], dtype=float) / rate
+        self.detection_bars.setOpts(x0=starts, width=ends - starts, y0=-0.025 - rows * 0.025, height=0.025)
+
+        models = self.segments.window('model_segments', first_idx, last_idx)
+        inputs = [m for m in models if m[2] == 'Model Input']
+        predictions = [m for m in models if m[2] != 'Model Input']
+        rows = np.arange(len(inputs)) % 4
+        starts = np.array([m[0] for m in inputs], dtype=float) / rate
+        ends = np.array([m[1] for m in inputs], dtype=float) / rate
+        self.input_bars.setOpts(x0=starts, width=ends - starts, y0=0.075 - rows * 0.025, height=0.025)
+
+        starts = np.array([m[0] for m in predictions], dtype=float) / rate
+        ends = np.array([m[1] for m in predictions], dtype=float) / rate
+        self.prediction_bars.setOpts(x0=starts, width=ends - starts, y0=0.1, height=1.0,
+                                     brushes=[self.prediction_brushes.get(m[2], self.prediction_brushes['other'])
+                                              for m in predictions])
+        # Reuse text items for the prediction labels
+        while len(self.prediction_labels) < len(predictions):
+            label = pg.TextItem(anchor=(0.5, 0.5), color='k', fill=pg.mkBrush(255, 255, 255, 200))
+            self.plot.addItem(label)
+            self.prediction_labels.append(label)
+        for label, (start, end, pred_class, probability) in zip(self.prediction_labels, predictions):
+            label.setText(f"{pred_class}\n{probability:.2f}")
+            label.setPos((start + end) / 2 / rate, 0.95)
+            label.setVisible(True)
+        for label in self.prediction_labels[len(predictions):]:
+            label.setVisible(False)
+
+        peaks = [p for p in self.segments.window('r_peaks', first_idx, last_idx) if 0 <= p < self.sample_count]
+        self.r_peak_scatter.setData(np.array(peaks, dtype=float) / rate, self.raw_store.data[peaks])
+
+    def update_status(self, refresh_frames=10):
+        """HR/HRV text (on new beats) and queue telemetry (every refresh_frames frames)"""
+        new_beat = self.hrv_stats is not None and self.hrv_stats.beat_count != self.hrv_beats_shown
+        if not new_beat and (not self.show_queue_overlay or self.frame_count % refresh_frames):
+            return
+        lines = []
+        if self.hrv_stats is not None:
+            self.hrv_beats_shown = self.hrv_stats.beat_count
+            lines.append(self.hrv_stats.format_panel())
+        if self.show_queue_overlay:
+            lines.append(self.format_queue_overlay())
+        text = '\n'.join(lines).replace(' ', '&nbsp;').replace('\n', '<br>')
+        self.status_label.setText(f"<span style='font-family: monospace; font-size: 9pt'>{text}</span>")
+
+    def attach_latency_tracker(self, latency_tracker, refresh_frames=20):
+        """Live latency histograms are only drawn by the matplotlib backend (the end-of-run summary still applies)"""
+        print("ℹ️  Latency histograms are not shown by the pyqtgraph backend")
+
+    def start_dashboard(self, interval=None):
+        """
+        Show the window and run the Qt event loop (blocks until the window is closed)
+
+        Args:
+            interval (int, optional): Frame interval in ms (default: 1000 / fps)
+        """
+        self.window.show()
+        self.timer.start(interval or int(1000 / self.fps))
+        try:
+            self.app.exec_()
+        except KeyboardInterrupt:
+            pass
+        self.timer.stop()
+
+    def stop_dashboard(self):
+        """Stop the frame timer and close the window"""
+        self.timer.stop()
+        self.window.close()
+
+    def is_window_open(self):
+        return self.window.isVisible()
+
+
+def measure_frame_rate(num_points=100000, frames=120, sampling_rate=125):
+    """
+    Render frames with num_points visible samples and report the achieved frame rate
+
+    Runs on any Qt platform; with QT_QPA_PLATFORM=offscreen no display is needed.
+    Each frame appends one 8 ms block (as the TX thread does), redraws and paints.
+
+    Returns:
+        float: Frames per second
+    """
+    dashboard = ECGQtDashboard(window_size=num_points, sampling_rate=sampling_rate, show_filtered=False)
+    t = np.arange(num_points + frames) / sampling_rate
+    signal = 0.5 + 0.4 * np.sin(2 * np.pi * 1.2 * t) ** 15
+    dashboard.add_data_block(signal[:num_points])
+    for start in range(0, num_points, 250):
+        dashboard.add_detection_window(start, start + 249)
+        dashboard.add_r_peak(start + 100)
+    dashboard.window.show()
+    dashboard.render_frame()
+
+    start_time = time.perf_counter()
+    for frame in range(frames):
+        dashboard.add_data_block(signal[num_points + frame:num_points + frame + 1])
+        dashboard.render_frame()
+        dashboard.window.repaint()
+        dashboard.app.processEvents()
+    elapsed = time.perf_counter() - start_time
+    dashboard.stop_dashboard()
+    return frames / elapsed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="pyqtgraph dashboard frame-rate check")
+    parser.add_argument('--offscreen', action='store_true', help="Render without a display (QT_QPA_PLATFORM=offscreen)")
+    parser.add_argument('--points', type=int, default=100000, help="Visible samples")
+    parser.add_argument('--frames', type=int, default=120, help="Frames to render")
+    args = parser.parse_args()
+    if args.offscreen:
+        os.environ['QT_QPA_PLATFORM'] = 'offscreen'
+    fps = measure_frame_rate(args.points, args.frames)
+    print(f"📈 {args.points} visible points: {fps:.1f} frames/s")
@@ -0,0 +1,168 @@
+"""
+Queue telemetry and backpressure
+Drop-in queue.Queue replacement that tracks depth, enqueue/dequeue rates,
+high-water mark and the age of the oldest waiting item, with an explicit
+policy for what happens when a bounded queue is full.
+"""
+
+import queue
+import time
+from collections import deque
+
+QUEUE_POLICIES = ('block', 'drop_oldest', 'coalesce')
+
+
+class InstrumentedQueue(queue.Queue):
+    def __init__(self, name, maxsize=0, rate_window=1.0, policy='block', droppable=None, merge=None):
+        """
+        FIFO queue with built-in backlog telemetry and a full-queue policy
+
+        Counters are updated inside Queue's own lock (_put/_get hooks), so they
+        cost no extra locking. Items are stored with their enqueue time.
+
+        Policies when maxsize is reached:
+            'block'       - the producer waits, as with queue.Queue (backpressure)
+            'drop_oldest' - the oldest droppable item is discarded; items that are not
+                            droppable are always kept, even above maxsize
+            'coalesce'    - the pending items are passed to merge() and replaced by its
+                            result; if that does not free a slot, falls back to drop_oldest
+
+        Args:
+            name (str): Name shown in snapshots
+            maxsize (int): Queue bound (0 = unbounded), as for queue.Queue
+            rate_window (float): Seconds over which enqueue/dequeue rates are measured
+            policy (str): One of QUEUE_POLICIES
+            droppable (callable, optional): item -> bool, items that may be dropped (default: all)
+            merge (callable, optional): list of items -> shorter list of items, for 'coalesce'
+        """
+        if policy not in QUEUE_POLICIES:
+            raise ValueError(f"Unknown queue policy '{policy}', expected one of {QUEUE_POLICIES}")
+        if policy == 'coalesce' and merge is None:
+            raise ValueError("The 'coalesce' policy needs a merge function")
+        super().__init__(maxsize)
+        self.name = name
+        self.rate_window = rate_window
+        self.policy = policy
+        self.droppable = droppable
+        self.merge = merge
+        self.total_put = 0
+        self.total_get = 0
+        self.high_water = 0
+        self.dropped = 0      # Items discarded by drop_oldest
+        self.coalesced = 0    # Items merged away by coalesce
+        self.blocked_puts = 0 # Puts that found the queue full under the block policy
+        self.rate_time = time.perf_counter()
+        self.rate_put = 0
+        self.rate_get = 0
+        self.enqueue_rate = 0.0
+        self.dequeue_rate = 0.0
+
+    def put(self, item, block=True, timeout=None):
+        """Put an item, applying the queue policy when the queue is full"""
+        if self.maxsize <= 0 or self.policy == 'block':
+            if self.maxsize > 0 and self.full():
+                with self.mutex:
+                    self.blocked_puts += 1
+            return super().put(item, block, timeout)
+        with self.not_full:
+            if self._qsize() >= self.maxsize:
+                if self.policy == 'coalesce':
+                    self._coalesce()
+                if self._qsize() >= self.maxsize:
+                    self._drop_oldest()
+            self._put(item)
+            self.unfinished_tasks += 1
+            self.not_empty.notify()
+
+    def _drop_oldest(self):
+        for position, (_, pending) in enumerate(self.queue):
+            if self.droppable is None or self.droppable(pending):
+                del self.queue[position]
+                self.dropped += 1
+                self.unfinished_tasks -= 1
+                return True
+        return False
+
+    def _coalesce(self):
+        # Merged items keep the enqueue time of the oldest pending item
+        oldest = self.queue[0][0]
+        merged = self.merge([pending for _, pending in self.queue])
+        removed = len(self.queue) - len(merged)
+        self.queue = deque((oldest, pending) for pending in merged)
+        self.coalesced += removed
+        self.unfinished_tasks -= removed
+
+    # queue.Queue storage hooks (called with self.mutex held)
+
+    def _init(self, maxsize):
+        self.queue = deque()
+
+    def _put(self, item):
+        self.queue.append((time.perf_counter(), item))
+        self.total_put += 1
+        if len(self.queue) > self.high_water:
+            self.high_water = len(self.queue)
+
+    def _get(self):
+        self.total_get += 1
+        return self.queue.popleft()[1]
+
+    def snapshot(self):
+        """
+        Current telemetry of this queue
+
+        Returns:
+            dict: depth, high_water, totals, rates (items/s) and oldest_age_ms
+        """
+        now = time.perf_counter()
+        with self.mutex:
+            depth = len(self.queue)
+            oldest_age = (now - self.queue[0][0]) if depth else 0.0
+            elapsed = now - self.rate_time
+            if elapsed >= self.rate_window:
+                self.enqueue_rate = (self.total_put - self.rate_put) / elapsed
+                self.dequeue_rate = (self.total_get - self.rate_get) / elapsed
+                self.rate_time = now
+                self.rate_put = self.total_put
+                self.rate_get = self.total_get
+            return {
+                'name': self.name,
+                'depth': depth,
+                'maxsize': self.maxsize,
+                'high_water': self.high_water,
+                'total_put': self.total_put,
+                'total_get': self.total_get,
+                'policy': self.policy,
+                'dropped': self.dropped,
+                'coalesced': self.coalesced,
+                'blocked_puts': self.blocked_puts,
+                'enqueue_rate': self.enqueue_rate,
+                'dequeue_rate': self.dequeue_rate,
+                'oldest_age_ms': oldest_age * 1000,
+            }
+
+
+def snapshot_queues(queues):
+    """
+    Telemetry of several queues
+
+    Args:
+        queues (iterable): InstrumentedQueue instances (others are skipped)
+
+    Returns:
+        dict: Snapshot per queue name
+    """
+    return {q.name: q.snapshot() for q in queues if isinstance(q, InstrumentedQueue)}
+
+
+def format_queue_metrics(snapshots):
+    """One line per queue: depth, high-water mark, rates, oldest item age and overload handling"""
+    lines = []
+    for name, m in snapshots.items():
+        line = (f"{name:<15} depth {m['depth']:>5} (max {m['high_water']:>5}) | "
+                f"in {m['enqueue_rate']:>6.1f}/s out {m['dequeue_rate']:>6.1f}/s | "
+                f"oldest {m['oldest_age_ms']:>6.0f} ms")
+        if m['dropped'] or m['coalesced'] or m['blocked_puts']:
+            line += f" | dropped {m['dropped']} coalesced {m['coalesced']} blocked {m['blocked_puts']}"
+        lines.append(line)
+    return '\n'.join(lines)
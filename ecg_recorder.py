@@ -0,0 +1,167 @@
+"""
+Segment recorder
+Dashboard stand-in with the same input methods as ECGDashboard that records
+samples and segments without rendering (and without importing matplotlib).
+"""
+
+import time
+import tracemalloc
+
+# Peak RSS is only available on Unix
+try:
+    import resource
+except ImportError:
+    resource = None
+
+from ecg_prediction_store import PredictionStore
+from ecg_sample_store import SampleStore
+from ecg_segment_store import SegmentStore
+
+
+class SegmentRecorder:
+    def __init__(self, sampling_rate=125, store_samples=True):
+        """
+        Record what the integration would send to a dashboard
+
+        Args:
+            sampling_rate (int): Sampling rate in Hz
+            store_samples (bool): Keep the sample blocks (disable when only segments matter)
+        """
+        self.sampling_rate = sampling_rate
+        self.store_samples = store_samples
+        self.raw_store = SampleStore()
+        self.filtered_store = SampleStore()
+        self.sample_count = 0
+
+        self.segments = SegmentStore()
+        self.predictions = PredictionStore()  # Full 7-class probability vectors
+        self.hrv_stats = None
+
+    def add_data_point(self, value):
+        self.add_data_block([value])
+
+    def add_data_block(self, raw_block, filtered_block=None):
+        if self.store_samples:
+            self.raw_store.append_block(raw_block)
+            if filtered_block is not None:
+                self.filtered_store.append_block(filtered_block)
+        self.sample_count += len(raw_block)
+
+    def add_r_peak(self, sample_index):
+        self.segments.append('r_peaks', sample_index)
+
+    def add_detection_window(self, start_index, end_index):
+        self.segments.append('detection_windows', (start_index, end_index))
+
+    def add_model_segment(self, start_index, end_index, predicted_class, probability):
+        self.segments.append('model_segments', (start_index, end_index, predicted_class, probability))
+
+    def add_class_probabilities(self, start_index, end_index, probabilities):
+        self.predictions.append(start_index, end_index, probabilities)
+
+    def process_pending_segments(self, segment_type=None):
+        # Segments are recorded immediately, nothing is pending
+        return []
+
+    def attach_hrv_stats(self, hrv_stats):
+        self.hrv_stats = hrv_stats
+
+    def attach_latency_tracker(self, latency_tracker, refresh_frames=20):
+        pass
+
+    def get_predictions(self):
+        """
+        Get the model predictions (model input windows excluded)
+
+        Returns:
+            list: (start, end, class, probability) tuples
+        """
+        return [segment for segment in self.segments['model_segments'] if segment[2] != 'Model Input']
+
+
+class MetricsSink(SegmentRecorder):
+    def __init__(self, sampling_rate=125, store_samples=False, trace_memory=False):
+        """
+        Segment recorder that measures pipeline throughput and memory (headless mode)
+
+        Args:
+            sampling_rate (int): Sampling rate in Hz
+            store_samples (bool): Keep the sample blocks
+            trace_memory (bool): Track peak Python allocations with tracemalloc (slows the run down)
+        """
+        super().__init__(sampling_rate, store_samples)
+        self.trace_memory = trace_memory
+        self.started_tracing = False
+        self.start_time = None
+        self.stop_time = None
+        self.peak_traced_bytes = None
+
+    def start(self):
+        """Start the measurement"""
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.started_tracing = True
+        self.start_time = time.perf_counter()
+
+    def stop(self):
+        """Stop the measurement"""
+        self.stop_time = time.perf_counter()
+        if tracemalloc.is_tracing():
+            self.peak_traced_bytes = tracemalloc.get_traced_memory()[1]
+            if self.started_tracing:
+                tracemalloc.stop()
+                self.started_tracing = False
+
+    def metrics(self):
+        """
+        Get throughput and memory metrics
+
+        Returns:
+            dict: Samples, events per kind, rates and memory
+        """
+        end_time = self.stop_time if self.stop_time is not None else time.perf_counter()
+        elapsed = (end_time - self.start_time) if self.start_time is not None else 0.0
+        events = {
+            'detection_windows': len(self.segments['detection_windows']),
+            'r_peaks': len(self.segments['r_peaks']),
+            'model_inputs': len(self.segments['model_segments']) - len(self.get_predictions()),
+            'predictions': len(self.get_predictions()),
+        }
+        total_events = sum(events.values())
+
+        max_rss_mb = None
+        if resource is not None:
+            # ru_maxrss is in kilobytes on Linux
+            max_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+        return {
+            'samples': self.sample_count,
+            'elapsed': elapsed,
+            'samples_per_second': self.sample_count / elapsed if elapsed > 0 else None,
+            'events': events,
+            'total_events': total_events,
+            'events_per_second': total_events / elapsed if elapsed > 0 else None,
+            'realtime_factor': self.sample_count / self.sampling_rate / elapsed if elapsed > 0 else None,
+            'peak_traced_mb': self.peak_traced_bytes / 2**20 if self.peak_traced_bytes is not None else None,
+            'max_rss_mb': max_rss_mb,
+        }
+
+    def format_metrics(self):
+        """Multi-line metrics summary"""
+        m = self.metrics()
+        if m['samples_per_second'] is None:
+            return "No samples processed"
+        lines = [
+            f"Samples: {m['samples']} in {m['elapsed']:.2f} s → {m['samples_per_second']:.0f} samples/s "
+            f"({m['realtime_factor']:.1f}x real time at {self.sampling_rate} Hz)",
+            f"Events: {m['total_events']} → {m['events_per_second']:.1f} events/s (" +
+            ', '.join(f"{kind}: {count}" for kind, count in m['events'].items()) + ")",
+        ]
+        memory = []
+        if m['peak_traced_mb'] is not None:
+            memory.append(f"peak traced {m['peak_traced_mb']:.1f} MB")
+        if m['max_rss_mb'] is not None:
+            memory.append(f"max RSS {m['max_rss_mb']:.1f} MB")
+        if memory:
+            lines.append("Memory: " + ', '.join(memory))
+        return '\n'.join(lines)
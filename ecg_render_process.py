@@ -0,0 +1,178 @@
+"""
+Separate rendering process
+Acquisition-side dashboard stand-in that publishes samples through a shared-memory
+ring and segments through an event queue to an ECGDashboard running in its own
+process, so GUI redraws never take the GIL of the TX/RX threads.
+"""
+
+import multiprocessing
+import queue
+import threading
+
+import numpy as np
+
+from ecg_logging import get_logger
+from ecg_recorder import SegmentRecorder
+from ecg_shared_ring import SharedSampleRing
+
+logger = get_logger('render')
+
+
+class RemoteHRVPanel:
+    def __init__(self):
+        """HR/HRV panel text received from the acquisition process (mimics IncrementalHRVStats for the dashboard)"""
+        self.beat_count = 0
+        self.text = ''
+
+    def format_panel(self):
+        return self.text
+
+
+def render_process_main(ring_name, events, window_size, sampling_rate, poll_interval=0.02):
+    """
+    Renderer process: attach to the ring, mirror samples and segments into an ECGDashboard
+
+    A pump thread copies new ring samples and queued events into the dashboard's
+    own queues until the writer closes the ring or the window is closed; the
+    dashboard GUI runs in this process' main thread.
+    """
+    from ecg_dashboard import ECGDashboard  # matplotlib is only imported in the renderer
+
+    ring = SharedSampleRing(name=ring_name)
+    dashboard = ECGDashboard(window_size=window_size, sampling_rate=sampling_rate)
+    hrv_panel = RemoteHRVPanel()
+    dashboard.attach_hrv_stats(hrv_panel)
+
+    stop_event = threading.Event()
+
+    def pump():
+        cursor = 0
+        while not stop_event.is_set():
+            # Read the flag before the samples, so the block written before closing is still pumped
+            closed = ring.closed
+            start, raw, filtered, lost = ring.read_since(cursor)
+            if lost:
+                # Renderer fell more than a ring behind: keep indices aligned with a gap
+                gap = np.full(lost, np.nan)
+                dashboard.add_data_block(gap, gap if ring.with_filtered else None)
+                logger.warning("⚠️  Renderer lost %d samples (ring overrun)", lost)
+            if raw.size:
+                dashboard.add_data_block(raw, filtered)
+            cursor = start + raw.size
+
+            handled = 0
+            while True:
+                try:
+                    event = events.get_nowait()
+                except queue.Empty:
+                    break
+                handled += 1
+                kind = event[0]
+                if kind == 'r_peak':
+                    dashboard.add_r_peak(event[1])
+                elif kind == 'detection_window':
+                    dashboard.add_detection_window(event[1], event[2])
+                elif kind == 'model_segment':
+                    dashboard.add_model_segment(*event[1:])
+                elif kind == 'probabilities':
+                    dashboard.add_class_probabilities(*event[1:])
+                elif kind == 'hrv':
+                    hrv_panel.text = event[2]
+                    hrv_panel.beat_count = event[1]
+            if closed and not raw.size and not handled:
+                break  # Acquisition finished and drained: the window stays open with the final data
+            stop_event.wait(poll_interval)
+
+    pump_thread = threading.Thread(target=pump, daemon=True, name="Render-Pump")
+    pump_thread.start()
+    try:
+        dashboard.start_dashboard()
+    finally:
+        # The pump must be out of read_since() before the mapping is released
+        stop_event.set()
+        pump_thread.join()
+        ring.close()
+
+
+class RenderProcessPublisher(SegmentRecorder):
+    def __init__(self, window_size=1250, sampling_rate=125, ring_capacity=65536, with_filtered=True):
+        """
+        Dashboard stand-in for the acquisition process, rendering happens in a child process
+
+        Has the same input methods as ECGDashboard. Samples go into a shared-memory
+        ring (one copy, no pickling); segments and HRV text go through a
+        multiprocessing queue. Segments are also kept locally because the serial
+        parser reads the latest detection window back.
+
+        Args:
+            window_size (int): Samples shown by the renderer
+            sampling_rate (int): Sampling rate in Hz
+            ring_capacity (int): Samples kept in the shared ring (the renderer may lag this much)
+            with_filtered (bool): Also publish the filtered trace
+        """
+        super().__init__(sampling_rate, store_samples=False)
+        self.window_size = window_size
+        self.ring = SharedSampleRing(ring_capacity, with_filtered=with_filtered)
+        self.events = multiprocessing.Queue()
+        self.process = None
+        self.hrv_beats_sent = None
+        self.ring_lock = threading.Lock()  # The TX thread may still write while the ring is released
+
+    def start_renderer(self):
+        """Start the renderer process (the dashboard window appears there)"""
+        if self.process is None:
+            self.process = multiprocessing.Process(
+                target=render_process_main,
+                args=(self.ring.name, self.events, self.window_size, self.sampling_rate),
+                name="ECG-Renderer")
+            self.process.start()
+
+    def add_data_block(self, raw_block, filtered_block=None):
+        super().add_data_block(raw_block, filtered_block)
+        with self.ring_lock:
+            if self.ring is None:
+                return
+            self.ring.write_block(raw_block, filtered_block)
+        if self.hrv_stats is not None and self.hrv_stats.beat_count != self.hrv_beats_sent:
+            self.hrv_beats_sent = self.hrv_stats.beat_count
+            self.events.put(('hrv', self.hrv_beats_sent, self.hrv_stats.format_panel()))
+
+    def add_r_peak(self, sample_index):
+        super().add_r_peak(sample_index)
+        self.events.put(('r_peak', sample_index))
+
+    def add_detection_window(self, start_index, end_index):
+        super().add_detection_window(start_index, end_index)
+        self.events.put(('detection_window', start_index, end_index))
+
+    def add_model_segment(self, start_index, end_index, predicted_class, probability):
+        super().add_model_segment(start_index, end_index, predicted_class, probability)
+        self.events.put(('model_segment', start_index, end_index, predicted_class, probability))
+
+    def add_class_probabilities(self, start_index, end_index, probabilities):
+        super().add_class_probabilities(start_index, end_index, probabilities)
+        self.events.put(('probabilities', start_index, end_index, list(probabilities)))
+
+    def start_dashboard(self, interval=50):
+        """Start the renderer (if needed) and wait until its window is closed"""
+        self.start_renderer()
+        self.process.join()
+        self.close()
+
+    def stop_dashboard(self):
+        """Close the renderer process"""
+        if self.process is not None and self.process.is_alive():
+            self.process.terminate()
+            self.process.join(timeout=2.0)
+        self.close()
+
+    def is_window_open(self):
+        return self.process is not None and self.process.is_alive()
+
+    def close(self):
+        """Release the shared ring"""
+        with self.ring_lock:
+            if self.ring is not None:
+                self.ring.mark_closed()
+                self.ring.close()
+                self.ring = None
@@ -0,0 +1,303 @@
+"""
+Streaming host-side R-peak detector
+Pan-Tompkins style QRS detection that runs on blocks of samples on the host,
+used to cross-check the R-peaks reported by the MCU firmware.
+"""
+
+import threading
+from bisect import bisect_left, insort
+from collections import deque
+
+import numpy as np
+from scipy.signal import butter, lfilter
+
+from ecg_filters import StreamingSOSFilter
+
+
+class StreamingRPeakDetector:
+    def __init__(self, sampling_rate=125, lowcut=5.0, highcut=15.0,
+                 integration_window=0.150, refractory_period=0.200, learning_period=2.0):
+        """
+        Chunked Pan-Tompkins R-peak detector
+
+        All filter stages (bandpass, derivative, moving window integration) carry
+        their state between blocks, so feeding the signal in blocks of any size
+        gives the same result as feeding it in one piece.
+
+        Args:
+            sampling_rate (int): Sampling rate in Hz
+            lowcut (float): Bandpass low cutoff in Hz
+            highcut (float): Bandpass high cutoff in Hz
+            integration_window (float): Moving window integration length in seconds
+            refractory_period (float): Minimum distance between two R-peaks in seconds
+            learning_period (float): Initial signal length (seconds) used to seed the thresholds
+        """
+        self.sampling_rate = sampling_rate
+
+        # Stage 1: bandpass filter (SOS cascade, state carried between blocks)
+        nyquist = 0.5 * sampling_rate
+        self.bandpass = StreamingSOSFilter(butter(2, [lowcut / nyquist, highcut / nyquist], btype='band', output='sos'))
+
+        # Stage 2: five-point derivative
+        self.derivative_b = np.array([2.0, 1.0, 0.0, -1.0, -2.0]) * (sampling_rate / 8.0)
+        self.derivative_zi = np.zeros(len(self.derivative_b) - 1)
+
+        # Stage 3: moving window integration (after squaring)
+        self.integration_width = max(1, int(round(integration_window * sampling_rate)))
+        self.integration_b = np.ones(self.integration_width) / self.integration_width
+        self.integration_zi = np.zeros(self.integration_width - 1)
+
+        # Peak localization: search the raw signal this far back from an integrator peak
+        self.search_width = self.integration_width + int(round(0.05 * sampling_rate))
+        self.refractory_samples = int(round(refractory_period * sampling_rate))
+        self.learning_samples = int(round(learning_period * sampling_rate))
+
+        # Raw signal history (absolute index of first element tracked separately)
+        self.history_length = max(self.learning_samples, 3 * sampling_rate) + self.search_width
+        self.raw_history = np.zeros(0)
+        self.history_start = 0
+
+        # Last two integrator outputs, needed to find local maxima across block boundaries
+        self.integrated_tail = np.zeros(0)
+        self.samples_processed = 0
+
+        # Adaptive thresholds (Pan-Tompkins SPKI / NPKI)
+        self.learning = True
+        self.learning_max = 0.0
+        self.learning_sum = 0.0
+        self.learning_candidates = []
+        self.signal_level = 0.0
+        self.noise_level = 0.0
+        self.threshold = 0.0
+
+        # Search-back state
+        self.rr_intervals = deque(maxlen=8)
+        self.noise_candidates = []  # (integrator index, value) since the last accepted QRS
+        self.last_qrs_index = None  # Integrator index of last accepted QRS
+        self.last_r_peak = None     # Absolute sample index of last R-peak
+
+    def process_block(self, samples):
+        """
+        Process a block of raw ECG samples
+
+        Args:
+            samples (array-like): New raw ECG samples, in order
+
+        Returns:
+            list: Absolute sample indices of R-peaks confirmed by this block
+        """
+        x = np.asarray(samples, dtype=float)
+        if x.size == 0:
+            return []
+
+        # Vectorized filter chain over the whole block
+        filtered = self.bandpass.process_block(x)
+        derivative, self.derivative_zi = lfilter(self.derivative_b, 1.0, filtered, zi=self.derivative_zi)
+        integrated, self.integration_zi = lfilter(self.integration_b, 1.0, derivative * derivative, zi=self.integration_zi)
+
+        # Keep enough raw signal to localize peaks in this and the previous blocks
+        self.raw_history = np.concatenate((self.raw_history, x))
+
+        # Local maxima of the integrated signal, including the sample held over from the last block
+        extended = np.concatenate((self.integrated_tail, integrated))
+        extended_start = self.samples_processed - len(self.integrated_tail)
+        middle = extended[1:-1]
+        is_peak = (middle > extended[:-2]) & (middle >= extended[2:])
+        candidate_positions = np.flatnonzero(is_peak) + 1
+        candidates = [(extended_start + int(k), float(extended[k])) for k in candidate_positions]
+
+        self.integrated_tail = extended[-2:]
+        self.samples_processed += len(x)
+
+        new_peaks = []
+        if self.learning:
+            self.learning_max = max(self.learning_max, float(integrated.max()))
+            self.learning_sum += float(integrated.sum())
+            self.learning_candidates.extend(candidates)
+            if self.samples_processed >= self.learning_samples:
+                # Seed thresholds from the learning period, then replay its candidates
+                self.signal_level = 0.25 * self.learning_max
+                self.noise_level = 0.5 * self.learning_sum / self.samples_processed
+                self.update_threshold()
+                self.learning = False
+                candidates = self.learning_candidates
+                self.learning_candidates = []
+            else:
+                candidates = []
+
+        for index, value in candidates:
+            peak = self.classify_candidate(index, value)
+            if peak is not None:
+                new_peaks.append(peak)
+
+        # Trim raw history to the configured length
+        excess = len(self.raw_history) - self.history_length
+        if excess > 0:
+            self.raw_history = self.raw_history[excess:]
+            self.history_start += excess
+            self.noise_candidates = [c for c in self.noise_candidates if c[0] - self.search_width >= self.history_start]
+
+        return new_peaks
+
+    def update_threshold(self):
+        """Recompute the primary detection threshold from the signal and noise levels"""
+        self.threshold = self.noise_level + 0.25 * (self.signal_level - self.noise_level)
+
+    def classify_candidate(self, index, value):
+        """
+        Run the adaptive threshold logic for one integrator peak
+
+        Args:
+            index (int): Absolute index of the integrator peak
+            value (float): Integrator value at the peak
+
+        Returns:
+            int or None: Absolute R-peak index if the candidate was accepted as QRS
+        """
+        if self.last_qrs_index is not None and index - self.last_qrs_index < self.refractory_samples:
+            return None
+
+        if value > self.threshold:
+            self.signal_level = 0.125 * value + 0.875 * self.signal_level
+            self.update_threshold()
+            return self.accept_qrs(index)
+
+        self.noise_level = 0.125 * value + 0.875 * self.noise_level
+        self.update_threshold()
+        self.noise_candidates.append((index, value))
+
+        # Search back for a missed beat when no QRS was found for 1.66 average RR intervals
+        if self.rr_intervals and self.last_qrs_index is not None:
+            rr_average = sum(self.rr_intervals) / len(self.rr_intervals)
+            if index - self.last_qrs_index > 1.66 * rr_average:
+                secondary_threshold = 0.5 * self.threshold
+                eligible = [c for c in self.noise_candidates if c[1] > secondary_threshold]
+                if eligible:
+                    best_index, best_value = max(eligible, key=lambda c: c[1])
+                    self.signal_level = 0.25 * best_value + 0.75 * self.signal_level
+                    self.update_threshold()
+                    return self.accept_qrs(best_index)
+        return None
+
+    def accept_qrs(self, index):
+        """
+        Record an accepted QRS and localize its R-peak in the raw signal
+
+        Args:
+            index (int): Absolute index of the integrator peak
+
+        Returns:
+            int or None: Absolute R-peak index, or None if it duplicates the previous peak
+        """
+        if self.last_qrs_index is not None:
+            self.rr_intervals.append(index - self.last_qrs_index)
+        self.last_qrs_index = index
+        self.noise_candidates = []
+
+        search_start = max(index - self.search_width, self.history_start)
+        lo = search_start - self.history_start
+        hi = index - self.history_start + 1
+        window = self.raw_history[lo:hi]
+        if window.size == 0:
+            return None
+        r_peak = search_start + int(np.argmax(window))
+
+        if self.last_r_peak is not None and r_peak - self.last_r_peak < self.refractory_samples:
+            return None
+        self.last_r_peak = r_peak
+        return r_peak
+
+
+class RPeakComparator:
+    def __init__(self, tolerance_samples=10):
+        """
+        Compare host-detected R-peaks against the R-peaks reported by the MCU
+
+        Args:
+            tolerance_samples (int): Maximum index difference for two peaks to be considered the same beat
+        """
+        self.tolerance_samples = tolerance_samples
+        self.host_peaks = []  # Sorted absolute indices
+        self.mcu_peaks = []   # Sorted, de-duplicated absolute indices
+        self.lock = threading.Lock()
+
+    def add_host_peaks(self, peak_indices):
+        """
+        Add R-peaks found by the host detector
+
+        Args:
+            peak_indices (list): Absolute sample indices, in increasing order
+        """
+        with self.lock:
+            self.host_peaks.extend(peak_indices)
+
+    def add_mcu_peaks(self, peak_indices):
+        """
+        Add R-peaks reported by the firmware
+
+        Overlapping detection windows report the same beat more than once, so
+        peaks within the tolerance of an already known MCU peak are merged.
+
+        Args:
+            peak_indices (list): Absolute sample indices
+        """
+        with self.lock:
+            for peak in peak_indices:
+                pos = bisect_left(self.mcu_peaks, peak)
+                if pos < len(self.mcu_peaks) and self.mcu_peaks[pos] - peak <= self.tolerance_samples:
+                    continue
+                if pos > 0 and peak - self.mcu_peaks[pos - 1] <= self.tolerance_samples:
+                    continue
+                insort(self.mcu_peaks, peak)
+
+    def summary(self):
+        """
+        Match MCU peaks to host peaks and summarize the agreement
+
+        Only host peaks inside the span covered by MCU peaks are counted as
+        host-only, since the firmware does not report beats outside its windows.
+
+        Returns:
+            dict: Peak counts, matches and index offset statistics (MCU - host)
+        """
+        with self.lock:
+            host = np.asarray(self.host_peaks, dtype=np.int64)
+            mcu = np.asarray(self.mcu_peaks, dtype=np.int64)
+
+        stats = {
+            'host_peaks': int(host.size),
+            'mcu_peaks': int(mcu.size),
+            'matched': 0,
+            'mcu_only': int(mcu.size),
+            'host_only': 0,
+            'agreement': 0.0,
+            'mean_offset': None,
+            'max_abs_offset': None,
+        }
+        if host.size == 0 or mcu.size == 0:
+            return stats
+
+        # Nearest host peak for every MCU peak
+        pos = np.searchsorted(host, mcu)
+        left = host[np.clip(pos - 1, 0, host.size - 1)]
+        right = host[np.clip(pos, 0, host.size - 1)]
+        nearest = np.where(np.abs(mcu - left) <= np.abs(mcu - right), left, right)
+        offsets = mcu - nearest
+        matched = np.abs(offsets) <= self.tolerance_samples
+
+        # Host peaks in the covered span with no MCU peak nearby
+        in_span = host[(host >= mcu[0] - self.tolerance_samples) & (host <= mcu[-1] + self.tolerance_samples)]
+        mpos = np.searchsorted(mcu, in_span)
+        distance = np.minimum(np.abs(in_span - mcu[np.clip(mpos, 0, mcu.size - 1)]),
+                              np.abs(in_span - mcu[np.clip(mpos - 1, 0, mcu.size - 1)]))
+        host_only = int(np.count_nonzero(distance > self.tolerance_samples))
+
+        n_matched = int(np.count_nonzero(matched))
+        stats['matched'] = n_matched
+        stats['mcu_only'] = int(mcu.size - n_matched)
+        stats['host_only'] = host_only
+        stats['agreement'] = n_matched / float(mcu.size + host_only)
+        if n_matched:
+            stats['mean_offset'] = float(offsets[matched].mean())
+            stats['max_abs_offset'] = int(np.abs(offsets[matched]).max())
+        return stats
@@ -0,0 +1,128 @@
+"""
+Sample storage for host-side analysis
+Growable NumPy buffer of ECG samples addressed by absolute sample index,
+with zero-copy strided window views for window-by-window host analysis.
+"""
+
+import threading
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+class SampleStore:
+    def __init__(self, initial_capacity=4096, dtype=np.float64):
+        """
+        Append-only sample store with amortized O(1) block appends
+
+        Args:
+            initial_capacity (int): Number of samples allocated up front
+            dtype: NumPy dtype of the stored samples
+        """
+        self.data = np.empty(initial_capacity, dtype=dtype)
+        self.length = 0
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return self.length
+
+    def append_block(self, block):
+        """
+        Append a block of samples
+
+        Args:
+            block (array-like): Samples to append, in order
+        """
+        block = np.asarray(block, dtype=self.data.dtype)
+        with self.lock:
+            needed = self.length + block.size
+            if needed > self.data.size:
+                # Grow geometrically so appends stay amortized O(1)
+                new_data = np.empty(max(needed, 2 * self.data.size), dtype=self.data.dtype)
+                new_data[:self.length] = self.data[:self.length]
+                self.data = new_data
+            self.data[self.length:needed] = block
+            self.length = needed
+
+    def get_range(self, start_index, end_index):
+        """
+        Copy out the samples of an absolute index range
+
+        Args:
+            start_index (int): First absolute sample index
+            end_index (int): Last absolute sample index (inclusive)
+
+        Returns:
+            numpy.ndarray or None: Samples, or None if the range is not fully stored yet
+        """
+        with self.lock:
+            if start_index < 0 or end_index < start_index or end_index >= self.length:
+                return None
+            return self.data[start_index:end_index + 1].copy()
+
+    def view(self, start_index, end_index):
+        """
+        Zero-copy view of an absolute index range, clipped to the stored samples
+
+        Only safe on the thread that appends (a later append may reallocate).
+
+        Args:
+            start_index (int): First absolute sample index
+            end_index (int): Last absolute sample index (inclusive)
+
+        Returns:
+            numpy.ndarray: View of the stored samples
+        """
+        start_index = max(0, start_index)
+        end_index = min(end_index, self.length - 1)
+        return self.data[start_index:end_index + 1]
+
+    def windows(self, window_size, hop, start_index=0, end_index=None):
+        """
+        Zero-copy strided views of every complete window in an absolute index range
+
+        Windows start at start_index, start_index + hop, ... and must end by
+        end_index. The result shares memory with the store (read-only): the
+        samples are never copied, whatever the window size or hop. The view
+        stays valid on any thread, since stored samples never change and a
+        reallocation leaves the viewed buffer alive.
+
+        Args:
+            window_size (int): Samples per window
+            hop (int): Samples between consecutive window starts (window_size - overlap)
+            start_index (int): Absolute start of the first window
+            end_index (int, optional): Last absolute sample index windows may cover
+                                       (inclusive, default: newest stored sample)
+
+        Returns:
+            tuple: (starts, windows) with the absolute start index of each window
+                   and an array of shape (n_windows, window_size)
+        """
+        if window_size < 1 or hop < 1:
+            raise ValueError(f"Window size ({window_size}) and hop ({hop}) must be positive")
+        with self.lock:
+            data, length = self.data, self.length
+        start_index = max(0, start_index)
+        end_index = length - 1 if end_index is None else min(end_index, length - 1)
+        if end_index - start_index + 1 < window_size:
+            return np.empty(0, dtype=np.int64), np.empty((0, window_size), dtype=data.dtype)
+        windows = sliding_window_view(data[start_index:end_index + 1], window_size)[::hop]
+        return start_index + hop * np.arange(len(windows), dtype=np.int64), windows
+
+    def window_batches(self, window_size, hop, batch_size, start_index=0, end_index=None):
+        """
+        Iterate over windows() in batches (each batch is still a zero-copy view)
+
+        Args:
+            window_size (int): Samples per window
+            hop (int): Samples between consecutive window starts
+            batch_size (int): Windows per batch
+            start_index (int): Absolute start of the first window
+            end_index (int, optional): Last absolute sample index windows may cover
+
+        Yields:
+            tuple: (starts, windows) with at most batch_size windows
+        """
+        starts, windows = self.windows(window_size, hop, start_index, end_index)
+        for i in range(0, len(starts), batch_size):
+            yield starts[i:i + batch_size], windows[i:i + batch_size]
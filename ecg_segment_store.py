@@ -0,0 +1,268 @@
+"""
+Segment storage shared by the parser and the dashboard
+Per-kind append-only lists of R-peaks, detection windows and model segments,
+protected by one lock, with O(1) lookup of the latest segment of a kind and
+optional retention (by count or time span) that spills evicted segments to disk.
+"""
+
+import bisect
+import os
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+SEGMENT_KINDS = ('r_peaks', 'detection_windows', 'model_segments')
+
+# On-disk record of each kind (appended raw, read back with np.fromfile)
+SPILL_DTYPES = {
+    'r_peaks': np.dtype([('start', np.int64)]),
+    'detection_windows': np.dtype([('start', np.int64), ('end', np.int64)]),
+    'model_segments': np.dtype([('start', np.int64), ('end', np.int64), ('cls', np.int16), ('probability', np.float32)]),
+}
+
+
+def session_spill_dir(base_dir):
+    """
+    Fresh per-session subdirectory of base_dir for spill files
+
+    A SegmentStore truncates the spill files of its directory, so runs and
+    dashboards sharing base_dir each need their own subdirectory.
+
+    Returns:
+        str: Path of the new directory (e.g. base_dir/session_20250101_120000_k3j9x2qa)
+    """
+    os.makedirs(base_dir, exist_ok=True)
+    return tempfile.mkdtemp(prefix=time.strftime('session_%Y%m%d_%H%M%S_'), dir=base_dir)
+
+
+def segment_bounds(segment):
+    """(start, end) sample indices of an R-peak index or a (start, end, ...) tuple"""
+    if isinstance(segment, tuple):
+        return segment[0], segment[1]
+    return segment, segment
+
+
+class SegmentStore:
+    def __init__(self, kinds=SEGMENT_KINDS, max_count=None, max_span=None, spill_dir=None):
+        """
+        Thread-safe segment store, indexable like the former segments dict
+
+        Writers (the serial parser thread) append under the lock; the GUI thread
+        reads store[kind] directly since lists only grow at the end. Readers that
+        need a consistent value across threads use latest(), since() or window().
+
+        With a retention limit, the oldest segments of a kind are evicted in
+        batches (a tenth of the limit at a time, so appends stay amortized O(1)).
+        Evicted segments are appended to <spill_dir>/<kind>.seg when spill_dir is
+        set and window() still finds them; otherwise they are discarded.
+
+        Args:
+            kinds (tuple): Segment kinds kept by the store
+            max_count (int, optional): Segments kept in memory per kind
+            max_span (int, optional): Samples of history kept in memory, counted back
+                                      from the newest segment of each kind
+            spill_dir (str, optional): Directory receiving evicted segments
+        """
+        self.lock = threading.Lock()
+        self.lists = {kind: [] for kind in kinds}
+        self.evicted = {kind: 0 for kind in kinds}  # Segments dropped from memory per kind
+        self.max_count = max(1, max_count) if max_count else None
+        self.max_span = max_span
+        self.spill_dir = spill_dir
+        self.spill_classes = []  # Class names of spilled model segments (index stored on disk)
+        # Spill files are read by binary search on the start column: valid while starts never
+        # decrease, and a match can start at most the longest spilled segment before the range
+        self.spill_ordered = {kind: True for kind in kinds}
+        self.spill_last_start = {kind: None for kind in kinds}
+        self.spill_max_span = {kind: 0 for kind in kinds}
+        if spill_dir:
+            os.makedirs(spill_dir, exist_ok=True)
+            for kind in kinds:
+                open(self.spill_path(kind), 'wb').close()
+        self.window_cache = {}
+
+    def __getitem__(self, kind):
+        return self.lists[kind]
+
+    def __contains__(self, kind):
+        return kind in self.lists
+
+    def __iter__(self):
+        return iter(self.lists)
+
+    def keys(self):
+        return self.lists.keys()
+
+    def items(self):
+        return self.lists.items()
+
+    def values(self):
+        return self.lists.values()
+
+    def append(self, kind, segment):
+        """
+        Add one segment
+
+        Args:
+            kind (str): One of the store's kinds
+            segment: R-peak index, (start, end) or (start, end, class, probability)
+        """
+        with self.lock:
+            self.lists[kind].append(segment)
+            self.apply_retention(kind)
+
+    def extend(self, kind, segments):
+        """Add several segments of one kind in order"""
+        with self.lock:
+            self.lists[kind].extend(segments)
+            self.apply_retention(kind)
+
+    def update(self, segments):
+        """Replace the segments of the given kinds (dict of kind -> list)"""
+        with self.lock:
+            for kind, values in segments.items():
+                self.lists[kind] = list(values)
+                self.evicted[kind] = 0
+
+    def latest(self, kind, default=None):
+        """
+        Most recent segment of a kind, in O(1)
+
+        Args:
+            kind (str): Segment kind
+            default: Returned when there is no segment of this kind yet
+
+        Returns:
+            The last appended segment, or default
+        """
+        with self.lock:
+            values = self.lists[kind]
+            return values[-1] if values else default
+
+    def since(self, kind, start):
+        """
+        Segments of a kind from absolute position start on (for incremental readers)
+
+        Positions count every segment ever appended, so they stay valid across
+        evictions; evicted segments are skipped.
+        """
+        with self.lock:
+            return self.lists[kind][max(0, start - self.evicted[kind]):]
+
+    def counts(self):
+        """Number of segments ever appended per kind (including evicted ones)"""
+        with self.lock:
+            return {kind: len(values) + self.evicted[kind] for kind, values in self.lists.items()}
+
+    # Retention
+
+    def apply_retention(self, kind):
+        """Evict old segments of a kind once a batch exceeds the limits (lock held)"""
+        values = self.lists[kind]
+        evict = 0
+        if self.max_count and len(values) >= self.max_count + max(1, self.max_count // 10):
+            evict = len(values) - self.max_count
+        if self.max_span and len(values) > 1:
+            cutoff = segment_bounds(values[-1])[1] - self.max_span
+            # Only evict once the oldest segment is a tenth of the span past the cutoff
+            if segment_bounds(values[0])[1] < cutoff - self.max_span // 10:
+                while evict < len(values) - 1 and segment_bounds(values[evict])[1] < cutoff:
+                    evict += 1
+        if evict:
+            if self.spill_dir:
+                self.spill(kind, values[:evict])
+            del values[:evict]
+            self.evicted[kind] += evict
+
+    def spill_path(self, kind):
+        return os.path.join(self.spill_dir, f"{kind}.seg")
+
+    def spill(self, kind, segments):
+        records = np.zeros(len(segments), dtype=SPILL_DTYPES[kind])
+        if kind == 'r_peaks':
+            records['start'] = segments
+        elif kind == 'detection_windows':
+            records['start'] = [s[0] for s in segments]
+            records['end'] = [s[1] for s in segments]
+        else:
+            for i, (start, end, predicted_class, probability) in enumerate(segments):
+                if predicted_class not in self.spill_classes:
+                    self.spill_classes.append(predicted_class)
+                records[i] = (start, end, self.spill_classes.index(predicted_class), probability)
+        if len(records):
+            starts = records['start']
+            ends = records['end'] if 'end' in records.dtype.names else starts
+            last_start = self.spill_last_start[kind]
+            if np.any(np.diff(starts) < 0) or (last_start is not None and starts[0] < last_start):
+                self.spill_ordered[kind] = False
+            self.spill_last_start[kind] = int(starts[-1])
+            self.spill_max_span[kind] = max(self.spill_max_span[kind], int((ends - starts).max()))
+        with open(self.spill_path(kind), 'ab') as f:
+            records.tofile(f)
+
+    def load_spilled(self, kind, start_index, end_index):
+        """
+        Spilled segments of a kind overlapping a sample index range, read from disk
+
+        The spill file is memory-mapped and only the slice found by binary search
+        on the start column is read, so a view step costs O(log n + matches).
+
+        Returns:
+            list: Segments in the in-memory format
+        """
+        if not self.spill_dir or not self.evicted[kind]:
+            return []
+        dtype = SPILL_DTYPES[kind]
+        count = os.path.getsize(self.spill_path(kind)) // dtype.itemsize
+        if count == 0:
+            return []
+        mapped = np.memmap(self.spill_path(kind), dtype=dtype, mode='r', shape=(count,))
+        if self.spill_ordered[kind]:
+            # bisect touches O(log n) records (np.searchsorted would first copy the strided column)
+            starts = mapped['start']
+            first = bisect.bisect_left(starts, start_index - self.spill_max_span[kind])
+            last = bisect.bisect_right(starts, end_index, lo=first)
+            records = np.array(mapped[first:last])
+        else:
+            records = np.array(mapped)
+        del mapped
+        ends = records['end'] if 'end' in records.dtype.names else records['start']
+        records = records[(ends >= start_index) & (records['start'] <= end_index)]
+        if kind == 'r_peaks':
+            return records['start'].tolist()
+        if kind == 'detection_windows':
+            return list(zip(records['start'].tolist(), records['end'].tolist()))
+        return [(int(r['start']), int(r['end']), self.spill_classes[r['cls']], float(r['probability'])) for r in records]
+
+    def window(self, kind, start_index, end_index):
+        """
+        Segments of a kind overlapping a sample index range, from memory and from
+        the spill files when the range reaches back past the retained history
+
+        Spilled results are cached per range, so a paused historical view reads
+        the disk once.
+
+        Args:
+            kind (str): Segment kind
+            start_index (int): First sample index of the range
+            end_index (int): Last sample index of the range
+
+        Returns:
+            list: Overlapping segments, oldest first
+        """
+        with self.lock:
+            values = self.lists[kind]
+            evicted = self.evicted[kind]
+            recent = [s for s in values if segment_bounds(s)[1] >= start_index and segment_bounds(s)[0] <= end_index]
+            reaches_back = evicted and (not values or start_index < segment_bounds(values[0])[1])
+        if not reaches_back or not self.spill_dir:
+            return recent
+        key = (start_index, end_index, evicted)
+        cached = self.window_cache.get(kind)
+        if cached is None or cached[0] != key:
+            with self.lock:
+                cached = (key, self.load_spilled(kind, start_index, end_index))
+            self.window_cache[kind] = cached
+        return cached[1] + recent
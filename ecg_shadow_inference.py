@@ -0,0 +1,284 @@
+"""
+Host-side shadow inference
+Runs a reference classifier on the same model input windows the MCU classifies,
+batched and in a process pool, so host and MCU predictions can be compared.
+"""
+
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from ecg_logging import get_logger
+from ecg_prediction_store import CLASS_NAMES
+
+logger = get_logger('shadow')
+
+# Classifier instance of the current worker process (set by the pool initializer)
+worker_classifier = None
+
+
+def init_worker(classifier):
+    """Process pool initializer: keep one classifier per worker process"""
+    global worker_classifier
+    worker_classifier = classifier
+
+
+def classify_batch(batch):
+    """
+    Run the worker's classifier on a batch of windows
+
+    Args:
+        batch (numpy.ndarray): Windows of shape (n_windows, window_length)
+
+    Returns:
+        numpy.ndarray: Class probabilities of shape (n_windows, n_classes)
+    """
+    return np.asarray(worker_classifier(batch), dtype=np.float64)
+
+
+class OnnxClassifier:
+    def __init__(self, model_path, input_name=None, add_channel_axis=True):
+        """
+        Picklable ONNX Runtime (CPU) classifier for use in the worker pool
+
+        The inference session is created lazily inside the worker process.
+
+        Args:
+            model_path (str): Path to the .onnx model
+            input_name (str, optional): Model input name, defaults to the first input
+            add_channel_axis (bool): Reshape (n, length) batches to (n, length, 1)
+        """
+        self.model_path = model_path
+        self.input_name = input_name
+        self.add_channel_axis = add_channel_axis
+        self.session = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['session'] = None  # Sessions cannot be pickled, workers create their own
+        return state
+
+    def __call__(self, batch):
+        if self.session is None:
+            import onnxruntime as ort
+            self.session = ort.InferenceSession(self.model_path, providers=['CPUExecutionProvider'])
+            if self.input_name is None:
+                self.input_name = self.session.get_inputs()[0].name
+        x = np.asarray(batch, dtype=np.float32)
+        if self.add_channel_axis:
+            x = x[:, :, np.newaxis]
+        return self.session.run(None, {self.input_name: x})[0]
+
+
+class ShadowInference:
+    def __init__(self, classifier, sample_store, batch_size=32, max_workers=None,
+                 flush_interval=1.0, class_names=None):
+        """
+        Batched reference inference on model input windows, off the GUI and RX threads
+
+        Args:
+            classifier (callable): Picklable callable mapping a (n, length) batch to (n, n_classes) probabilities
+            sample_store (SampleStore): Store the window samples are read from
+            batch_size (int): Number of windows per batch sent to the pool
+            max_workers (int, optional): Number of worker processes (default: CPU count)
+            flush_interval (float): Seconds after which a partial batch is sent anyway (a flush
+                                    thread checks every half interval, so no new window is needed)
+            class_names (list, optional): Class names in probability order
+        """
+        self.sample_store = sample_store
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.class_names = class_names or CLASS_NAMES
+
+        self.executor = ProcessPoolExecutor(max_workers=max_workers, initializer=init_worker,
+                                            initargs=(classifier,))
+        self.lock = threading.Lock()
+
+        self.waiting_windows = []  # (start, end) whose samples are not stored yet
+        self.ready_windows = {}    # window length -> list of ((start, end), samples)
+        self.oldest_ready_time = None
+        self.in_flight = set()
+
+        # (start, end) -> {'host': probs or None, 'mcu': probs or None}
+        self.results = {}
+        self.windows_submitted = 0
+        self.batches_submitted = 0
+        self.errors = 0
+        self.rejected = 0
+
+        # Stale partial batches are sent on time even when no further window arrives
+        self.stop_event = threading.Event()
+        self.flush_thread = threading.Thread(target=self.flush_loop, daemon=True, name="Shadow-Flush")
+        self.flush_thread.start()
+
+    def flush_loop(self):
+        """Pump every half flush interval until shutdown"""
+        while not self.stop_event.wait(self.flush_interval / 2):
+            self.pump()
+
+    def submit_window(self, start_index, end_index):
+        """
+        Queue a model input window for shadow inference
+
+        Args:
+            start_index (int): Absolute start index of the window
+            end_index (int): Absolute end index of the window (inclusive)
+        """
+        with self.lock:
+            if start_index < 0 or end_index < start_index:
+                # Never stored (e.g. a window reconciled to before the first sample): would wait forever
+                self.rejected += 1
+                logger.debug("Shadow inference: invalid window %d-%d skipped", start_index, end_index)
+                return
+            key = (start_index, end_index)
+            if key in self.results:
+                return
+            self.results[key] = {'host': None, 'mcu': None}
+            self.waiting_windows.append(key)
+        self.pump()
+
+    def record_mcu_prediction(self, start_index, end_index, probabilities):
+        """
+        Store the MCU probabilities for a window next to the host result
+
+        Args:
+            start_index (int): Absolute start index of the window
+            end_index (int): Absolute end index of the window (inclusive)
+            probabilities (list): MCU class probabilities
+        """
+        with self.lock:
+            entry = self.results.setdefault((start_index, end_index), {'host': None, 'mcu': None})
+            entry['mcu'] = np.asarray(probabilities, dtype=np.float64)
+            host = entry['host']
+        if host is not None:
+            self.print_comparison(start_index, end_index, host, entry['mcu'])
+
+    def pump(self, force=False):
+        """
+        Move stored windows into batches and send full (or stale) batches to the pool
+
+        Args:
+            force (bool): Send partial batches regardless of the flush interval
+        """
+        to_submit = []
+        with self.lock:
+            still_waiting = []
+            for key in self.waiting_windows:
+                samples = self.sample_store.get_range(key[0], key[1])
+                if samples is None:
+                    still_waiting.append(key)
+                    continue
+                self.ready_windows.setdefault(samples.size, []).append((key, samples))
+                if self.oldest_ready_time is None:
+                    self.oldest_ready_time = time.monotonic()
+            self.waiting_windows = still_waiting
+
+            stale = (self.oldest_ready_time is not None and
+                     time.monotonic() - self.oldest_ready_time >= self.flush_interval)
+            for length in list(self.ready_windows):
+                windows = self.ready_windows[length]
+                while len(windows) >= self.batch_size:
+                    to_submit.append(windows[:self.batch_size])
+                    windows = windows[self.batch_size:]
+                if windows and (force or stale):
+                    to_submit.append(windows)
+                    windows = []
+                if windows:
+                    self.ready_windows[length] = windows
+                else:
+                    del self.ready_windows[length]
+            if not self.ready_windows:
+                self.oldest_ready_time = None
+
+        for batch_windows in to_submit:
+            keys = [key for key, _ in batch_windows]
+            batch = np.stack([samples for _, samples in batch_windows])
+            future = self.executor.submit(classify_batch, batch)
+            with self.lock:
+                self.in_flight.add(future)
+                self.windows_submitted += len(keys)
+                self.batches_submitted += 1
+            future.add_done_callback(lambda f, keys=keys: self.on_batch_done(f, keys))
+
+    def on_batch_done(self, future, keys):
+        """Store host probabilities when a batch completes (runs on the pool's callback thread)"""
+        with self.lock:
+            self.in_flight.discard(future)
+        try:
+            probabilities = future.result()
+        except Exception as e:
+            with self.lock:
+                self.errors += 1
+            logger.warning("⚠️  Shadow inference batch failed: %s", e)
+            return
+
+        completed = []
+        with self.lock:
+            for key, probs in zip(keys, probabilities):
+                entry = self.results.setdefault(key, {'host': None, 'mcu': None})
+                entry['host'] = probs
+                if entry['mcu'] is not None:
+                    completed.append((key, probs, entry['mcu']))
+        for key, host, mcu in completed:
+            self.print_comparison(key[0], key[1], host, mcu)
+
+    def print_comparison(self, start_index, end_index, host, mcu):
+        """Log host and MCU predictions of one window side by side (DEBUG)"""
+        host_idx = int(np.argmax(host))
+        mcu_idx = int(np.argmax(mcu))
+        marker = "" if host_idx == mcu_idx else " ← MISMATCH"
+        logger.debug("🧪 Shadow %d-%d: host %s (%.3f) | MCU %s (%.3f)%s", start_index, end_index,
+                     self.class_names[host_idx], host[host_idx], self.class_names[mcu_idx], mcu[mcu_idx], marker)
+
+    def get_comparisons(self):
+        """
+        Get all windows where both host and MCU predictions are available
+
+        Returns:
+            list: (start, end, host_probs, mcu_probs) tuples sorted by start index
+        """
+        with self.lock:
+            rows = [(key[0], key[1], entry['host'], entry['mcu'])
+                    for key, entry in self.results.items()
+                    if entry['host'] is not None and entry['mcu'] is not None]
+        return sorted(rows, key=lambda row: row[0])
+
+    def summary(self):
+        """
+        Summarize host vs MCU agreement
+
+        Returns:
+            dict: Window counts, argmax agreement and mean absolute probability difference
+        """
+        rows = self.get_comparisons()
+        stats = {
+            'windows_submitted': self.windows_submitted,
+            'batches_submitted': self.batches_submitted,
+            'errors': self.errors,
+            'rejected': self.rejected,
+            'compared': len(rows),
+            'class_agreement': None,
+            'mean_abs_prob_diff': None,
+        }
+        if rows:
+            host = np.stack([row[2] for row in rows])
+            mcu = np.stack([row[3] for row in rows])
+            n_classes = min(host.shape[1], mcu.shape[1])
+            host, mcu = host[:, :n_classes], mcu[:, :n_classes]
+            stats['class_agreement'] = float(np.mean(host.argmax(axis=1) == mcu.argmax(axis=1)))
+            stats['mean_abs_prob_diff'] = float(np.mean(np.abs(host - mcu)))
+        return stats
+
+    def shutdown(self, wait=True):
+        """
+        Send remaining windows and stop the worker pool
+
+        Args:
+            wait (bool): Wait for in-flight batches to finish
+        """
+        self.stop_event.set()
+        self.flush_thread.join()
+        self.pump(force=True)
+        self.executor.shutdown(wait=wait)
@@ -0,0 +1,307 @@
+"""
+Shared session history for read-only viewers
+The acquisition side publishes every sample and segment into memory-mapped files
+of a session directory; any number of viewer dashboards (other processes) can
+attach and detach at any time, each with its own navigation state, reading the
+samples straight from the mapping without copies.
+
+Viewer: python ecg_shared_history.py <session_dir>
+"""
+
+import os
+import sys
+
+import numpy as np
+
+from ecg_prediction_store import CLASS_NAMES
+
+HEADER_FIELDS = ('samples', 'filtered_samples', 'r_peaks', 'detection_windows', 'model_segments',
+                 'closed', 'sampling_rate', 'max_samples', 'predictions')
+SEGMENT_CLASSES = ["Model Input"] + CLASS_NAMES
+MODEL_SEGMENT_DTYPE = np.dtype([('start', np.int64), ('end', np.int64), ('cls', np.int16), ('probability', np.float32)])
+PREDICTION_DTYPE = np.dtype([('start', np.int64), ('end', np.int64), ('probabilities', np.float32, (len(CLASS_NAMES),))])
+
+
+def history_layout(max_samples):
+    """
+    File name, dtype and capacity of every array of a session
+
+    Segment capacities are generous upper bounds derived from the sample capacity
+    (R-peaks at most every 0.2 s, windows at most every half window).
+    """
+    return {
+        'raw': ('raw.f64', np.float64, max_samples),
+        'filtered': ('filtered.f64', np.float64, max_samples),
+        'r_peaks': ('r_peaks.i64', np.int64, max_samples // 25 + 1),
+        'detection_windows': ('detection_windows.i64', np.dtype((np.int64, 2)), max_samples // 50 + 1),
+        'model_segments': ('model_segments.rec', MODEL_SEGMENT_DTYPE, max_samples // 25 + 1),
+        'predictions': ('predictions.rec', PREDICTION_DTYPE, max_samples // 25 + 1),
+    }
+
+
+class SharedHistoryWriter:
+    def __init__(self, session_dir, sampling_rate=125, max_samples=4 * 3600 * 125):
+        """
+        Publish samples and segments of one acquisition session (single writer)
+
+        Files are allocated once at max_samples (4 hours at 125 Hz by default, 14 MB
+        per trace) because a mapped file cannot be grown while other processes map
+        it on Windows. Data is written before the header count that publishes it.
+
+        Args:
+            session_dir (str): Directory receiving the session files (created if needed)
+            sampling_rate (int): Sampling rate in Hz
+            max_samples (int): Sample capacity of the session
+        """
+        os.makedirs(session_dir, exist_ok=True)
+        self.session_dir = session_dir
+        self.sampling_rate = sampling_rate
+        self.max_samples = max_samples
+        self.full_warned = False
+
+        self.header = np.memmap(os.path.join(session_dir, 'header.i64'), dtype=np.int64, mode='w+',
+                                shape=(len(HEADER_FIELDS),))
+        self.header[:] = 0
+        self.header[HEADER_FIELDS.index('sampling_rate')] = sampling_rate
+        self.header[HEADER_FIELDS.index('max_samples')] = max_samples
+        self.arrays = {}
+        for key, (filename, dtype, capacity) in history_layout(max_samples).items():
+            self.arrays[key] = np.memmap(os.path.join(session_dir, filename), dtype=dtype, mode='w+',
+                                         shape=(capacity,))
+
+    def count(self, field):
+        return int(self.header[HEADER_FIELDS.index(field)])
+
+    def append(self, key, field, values):
+        """Write values after the published ones, then publish them"""
+        array = self.arrays[key]
+        count = self.count(field)
+        values = values[:array.shape[0] - count]
+        if len(values) == 0:
+            if not self.full_warned:
+                print(f"⚠️  Shared history full ({key}), later data is not published")
+                self.full_warned = True
+            return
+        array[count:count + len(values)] = values
+        self.header[HEADER_FIELDS.index(field)] = count + len(values)
+
+    # Same input methods as ECGDashboard
+
+    def add_data_point(self, value):
+        self.add_data_block([value])
+
+    def add_data_block(self, raw_block, filtered_block=None):
+        self.append('raw', 'samples', np.asarray(raw_block, dtype=np.float64))
+        if filtered_block is not None:
+            self.append('filtered', 'filtered_samples', np.asarray(filtered_block, dtype=np.float64))
+
+    def add_r_peak(self, sample_index):
+        self.append('r_peaks', 'r_peaks', np.array([sample_index], dtype=np.int64))
+
+    def add_detection_window(self, start_index, end_index):
+        self.append('detection_windows', 'detection_windows', np.array([[start_index, end_index]], dtype=np.int64))
+
+    def add_model_segment(self, start_index, end_index, predicted_class, probability):
+        cls = SEGMENT_CLASSES.index(predicted_class) if predicted_class in SEGMENT_CLASSES else 0
+        record = np.array([(start_index, end_index, cls, probability)], dtype=MODEL_SEGMENT_DTYPE)
+        self.append('model_segments', 'model_segments', record)
+
+    def add_class_probabilities(self, start_index, end_index, probabilities):
+        record = np.zeros(1, dtype=PREDICTION_DTYPE)
+        record[0] = (start_index, end_index, probabilities[:len(CLASS_NAMES)])
+        self.append('predictions', 'predictions', record)
+
+    def close(self):
+        """Mark the session as finished and flush the files"""
+        self.header[HEADER_FIELDS.index('closed')] = 1
+        for array in self.arrays.values():
+            array.flush()
+        self.header.flush()
+
+
+class MirroredDashboard:
+    def __init__(self, dashboard, *mirrors):
+        """
+        Forward the data/segment input methods to a dashboard and to mirrors (e.g. a SharedHistoryWriter)
+
+        Everything else (segments, start_dashboard, ...) is the primary dashboard's.
+
+        Args:
+            dashboard: Primary dashboard
+            *mirrors: Objects receiving copies of the add_* calls
+        """
+        self.dashboard = dashboard
+        self.mirrors = mirrors
+
+    def __getattr__(self, name):
+        return getattr(self.dashboard, name)
+
+    def add_data_point(self, value):
+        self.dashboard.add_data_point(value)
+        for mirror in self.mirrors:
+            mirror.add_data_point(value)
+
+    def add_data_block(self, raw_block, filtered_block=None):
+        self.dashboard.add_data_block(raw_block, filtered_block)
+        for mirror in self.mirrors:
+            mirror.add_data_block(raw_block, filtered_block)
+
+    def add_r_peak(self, sample_index):
+        self.dashboard.add_r_peak(sample_index)
+        for mirror in self.mirrors:
+            mirror.add_r_peak(sample_index)
+
+    def add_detection_window(self, start_index, end_index):
+        self.dashboard.add_detection_window(start_index, end_index)
+        for mirror in self.mirrors:
+            mirror.add_detection_window(start_index, end_index)
+
+    def add_model_segment(self, start_index, end_index, predicted_class, probability):
+        self.dashboard.add_model_segment(start_index, end_index, predicted_class, probability)
+        for mirror in self.mirrors:
+            mirror.add_model_segment(start_index, end_index, predicted_class, probability)
+
+    def add_class_probabilities(self, start_index, end_index, probabilities):
+        self.dashboard.add_class_probabilities(start_index, end_index, probabilities)
+        for mirror in self.mirrors:
+            mirror.add_class_probabilities(start_index, end_index, probabilities)
+
+
+class SharedTraceView:
+    def __init__(self, reader, key, field):
+        """Read-only SampleStore look-alike over one mapped trace (view() returns slices of the mapping)"""
+        self.reader = reader
+        self.key = key
+        self.field = field
+
+    def __len__(self):
+        return self.reader.count(self.field)
+
+    @property
+    def data(self):
+        """Whole mapped trace (valid up to len(self))"""
+        return self.reader.arrays[self.key]
+
+    def view(self, start_index, end_index):
+        start_index = max(0, start_index)
+        end_index = min(end_index, len(self) - 1)
+        return self.reader.arrays[self.key][start_index:end_index + 1]
+
+    def get_range(self, start_index, end_index):
+        if start_index < 0 or end_index < start_index or end_index >= len(self):
+            return None
+        return np.array(self.reader.arrays[self.key][start_index:end_index + 1])
+
+
+class SharedHistoryReader:
+    def __init__(self, session_dir):
+        """
+        Attach read-only to a session published by SharedHistoryWriter
+
+        Args:
+            session_dir (str): Session directory
+        """
+        self.session_dir = session_dir
+        self.header = np.memmap(os.path.join(session_dir, 'header.i64'), dtype=np.int64, mode='r',
+                                shape=(len(HEADER_FIELDS),))
+        self.sampling_rate = int(self.header[HEADER_FIELDS.index('sampling_rate')])
+        self.max_samples = int(self.header[HEADER_FIELDS.index('max_samples')])
+        self.arrays = {}
+        for key, (filename, dtype, capacity) in history_layout(self.max_samples).items():
+            self.arrays[key] = np.memmap(os.path.join(session_dir, filename), dtype=dtype, mode='r',
+                                         shape=(capacity,))
+        self.raw_store = SharedTraceView(self, 'raw', 'samples')
+        self.filtered_store = SharedTraceView(self, 'filtered', 'filtered_samples')
+
+    def count(self, field):
+        return int(self.header[HEADER_FIELDS.index(field)])
+
+    @property
+    def closed(self):
+        return bool(self.header[HEADER_FIELDS.index('closed')])
+
+    def read_segments(self, cursors):
+        """
+        Segments published since the cursors (advances them)
+
+        Args:
+            cursors (dict): Segments already read per kind
+
+        Returns:
+            dict: New segments per kind, in the ECGDashboard.segments format
+        """
+        new = {}
+        end = self.count('r_peaks')
+        new['r_peaks'] = self.arrays['r_peaks'][cursors['r_peaks']:end].tolist()
+        cursors['r_peaks'] = end
+
+        end = self.count('detection_windows')
+        new['detection_windows'] = [tuple(w) for w in self.arrays['detection_windows'][cursors['detection_windows']:end].tolist()]
+        cursors['detection_windows'] = end
+
+        end = self.count('model_segments')
+        records = self.arrays['model_segments'][cursors['model_segments']:end]
+        new['model_segments'] = [(int(r['start']), int(r['end']), SEGMENT_CLASSES[r['cls']], float(r['probability']))
+                                 for r in records]
+        cursors['model_segments'] = end
+        return new
+
+    def read_predictions(self, cursors):
+        """
+        Probability records published since cursors['predictions'] (advances it)
+
+        Returns:
+            numpy.ndarray: Records with start, end and probabilities fields
+        """
+        end = self.count('predictions')
+        records = np.array(self.arrays['predictions'][cursors['predictions']:end])
+        cursors['predictions'] = end
+        return records
+
+
+def open_viewer(session_dir, window_size=1250, follow=True, **dashboard_kwargs):
+    """
+    Create a read-only dashboard attached to a session
+
+    The viewer's stores are views of the shared mapping; only segments are
+    turned into Python tuples for drawing. Closing the window detaches it.
+
+    Args:
+        session_dir (str): Session directory
+        window_size (int): Samples per view window
+        follow (bool): Start in follow mode (False for a historical view)
+
+    Returns:
+        ECGDashboard: Viewer dashboard (call start_dashboard())
+    """
+    from ecg_dashboard import ECGDashboard
+
+    reader = SharedHistoryReader(session_dir)
+
+    class ECGHistoryViewer(ECGDashboard):
+        def update_plot(self, frame):
+            # Pull the published state instead of the input queues
+            self.sample_count = len(self.raw_store)
+            if self.sample_count > self.overview.sample_count:
+                self.overview.add_block(self.raw_store.view(self.overview.sample_count, self.sample_count - 1))
+            for kind, segments in reader.read_segments(segment_cursors).items():
+                self.segments.extend(kind, segments)
+            for record in reader.read_predictions(segment_cursors):
+                self.predictions.append(int(record['start']), int(record['end']), record['probabilities'])
+            return super().update_plot(frame)
+
+    segment_cursors = {'r_peaks': 0, 'detection_windows': 0, 'model_segments': 0, 'predictions': 0}
+    viewer = ECGHistoryViewer(window_size=window_size, sampling_rate=reader.sampling_rate, **dashboard_kwargs)
+    viewer.raw_store = reader.raw_store
+    viewer.filtered_store = reader.filtered_store
+    viewer.follow_mode = follow
+    viewer.history_reader = reader
+    return viewer
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python ecg_shared_history.py <session_dir> [--history]")
+        sys.exit(1)
+    viewer = open_viewer(sys.argv[1], follow='--history' not in sys.argv)
+    viewer.start_dashboard()
@@ -0,0 +1,130 @@
+"""
+Shared-memory sample ring
+Single-writer ring buffer of raw (and filtered) ECG samples in
+multiprocessing.shared_memory, readable from other processes by name.
+"""
+
+from multiprocessing import shared_memory
+
+import numpy as np
+
+HEADER_FIELDS = 4  # write_count, capacity, has_filtered, closed
+
+
+def attach_shared_memory(name):
+    """
+    Attach to an existing shared memory block without taking ownership
+
+    The creating process unlinks the block. Child processes (fork or spawn) share
+    the creator's resource tracker, so an attach from a child does not unlink it early.
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)  # Python 3.13+
+    except TypeError:
+        return shared_memory.SharedMemory(name=name)
+
+
+class SharedSampleRing:
+    def __init__(self, capacity=65536, with_filtered=True, name=None):
+        """
+        Create (name=None) or attach to (name given) a shared sample ring
+
+        The writer copies a block into the ring and then advances write_count, so a
+        reader that reads write_count first only sees complete samples. A reader
+        more than `capacity` samples behind has lost the oldest ones.
+
+        Args:
+            capacity (int): Samples kept in the ring (65536 = about 9 minutes at 125 Hz)
+            with_filtered (bool): Also keep a filtered trace
+            name (str, optional): Name of an existing ring to attach to
+        """
+        self.owner = name is None
+        if self.owner:
+            size = 8 * (HEADER_FIELDS + capacity * (2 if with_filtered else 1))
+            self.shm = shared_memory.SharedMemory(create=True, size=size)
+            self.header = np.ndarray((HEADER_FIELDS,), dtype=np.int64, buffer=self.shm.buf)
+            self.header[:] = (0, capacity, int(with_filtered), 0)
+        else:
+            self.shm = attach_shared_memory(name)
+            self.header = np.ndarray((HEADER_FIELDS,), dtype=np.int64, buffer=self.shm.buf)
+        self.capacity = int(self.header[1])
+        self.with_filtered = bool(self.header[2])
+        offset = 8 * HEADER_FIELDS
+        self.raw = np.ndarray((self.capacity,), dtype=np.float64, buffer=self.shm.buf, offset=offset)
+        self.filtered = None
+        if self.with_filtered:
+            self.filtered = np.ndarray((self.capacity,), dtype=np.float64, buffer=self.shm.buf,
+                                       offset=offset + 8 * self.capacity)
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    @property
+    def write_count(self):
+        """Total number of samples written so far (absolute index of the next sample)"""
+        return int(self.header[0])
+
+    @property
+    def closed(self):
+        return bool(self.header[3])
+
+    def write_block(self, raw_block, filtered_block=None):
+        """
+        Append a block of samples (writer side only)
+
+        Args:
+            raw_block (array-like): Raw samples
+            filtered_block (array-like, optional): Filtered samples for the same indices
+        """
+        raw_block = np.asarray(raw_block, dtype=np.float64)
+        block_size = raw_block.size
+        count = int(self.header[0])
+        # Only the last `capacity` samples of a longer block fit; they keep their absolute indices
+        kept = min(block_size, self.capacity)
+        positions = (count + block_size - kept + np.arange(kept)) % self.capacity
+        self.raw[positions] = raw_block[block_size - kept:]
+        if self.filtered is not None:
+            if filtered_block is None:
+                self.filtered[positions] = np.nan
+            else:
+                self.filtered[positions] = np.asarray(filtered_block, dtype=np.float64)[block_size - kept:]
+        self.header[0] = count + block_size  # Publish after the data is in place
+
+    def read_since(self, cursor):
+        """
+        Copy out the samples written since cursor (reader side)
+
+        Args:
+            cursor (int): Absolute index of the first sample wanted
+
+        Returns:
+            tuple: (start, raw, filtered, lost) where start is the absolute index of raw[0],
+                   filtered is None without a filtered trace, and lost is the number of
+                   samples overwritten before they could be read
+        """
+        count = int(self.header[0])
+        start = max(cursor, count - self.capacity)
+        lost = start - cursor
+        positions = np.arange(start, count) % self.capacity
+        raw = self.raw[positions]
+        filtered = self.filtered[positions] if self.filtered is not None else None
+        # The writer may have lapped the oldest part of the copy while it was taken
+        overrun = int(self.header[0]) - self.capacity - start
+        if overrun > 0:
+            raw = raw[overrun:]
+            filtered = filtered[overrun:] if filtered is not None else None
+            lost += overrun
+            start += overrun
+        return start, raw, filtered, lost
+
+    def mark_closed(self):
+        """Tell readers that no more samples will be written"""
+        self.header[3] = 1
+
+    def close(self):
+        """Release this process' mapping (and the block itself on the writer side)"""
+        self.header = self.raw = self.filtered = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
@@ -0,0 +1,411 @@
+"""
+Browser dashboard served from a local WebSocket server
+Dashboard stand-in that streams decimated samples and segment events to any
+number of browser clients. Each client receives only what it has not seen yet
+(incremental updates), so rendering runs in the browsers, not in the acquisition process.
+Requires the optional `websockets` package (pip install websockets).
+"""
+
+import asyncio
+import http.server
+import json
+import threading
+import time
+
+import numpy as np
+
+# WebSocket streaming is optional (requires websockets)
+try:
+    import websockets
+except ImportError:
+    websockets = None
+
+from ecg_recorder import SegmentRecorder
+
+SEGMENT_KINDS = ('detection_windows', 'r_peaks', 'model_segments')
+
+# Minimal browser client: follows the newest samples and draws the segments
+WEB_DASHBOARD_HTML = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>ECG Dashboard</title>
+<style>
+  body { font-family: sans-serif; margin: 10px; background: #fafafa; }
+  canvas { border: 1px solid #ccc; background: white; width: 100%; height: 420px; }
+  #status { font-size: 13px; color: #444; margin: 6px 0; white-space: pre; }
+</style>
+</head>
+<body>
+<h3>ECG Dashboard (live)</h3>
+<div id="status">Connecting...</div>
+<canvas id="plot" width="1600" height="420"></canvas>
+<script>
+const colors = {Normal: "#2e7d32", Abnormal: "#e65100", LBBB: "#6a1b9a", RBBB: "#1565c0",
+                PVC: "#c62828", MI: "#4e342e", CHF: "#ad1457", "Model Input": "#9e9e9e"};
+let info = null;
+let xs = [], ys = [];            // Decimated samples: absolute index and value
+let rPeaks = [], windows = [], models = [];
+let hrv = "";
+const ws = new WebSocket("ws://" + location.hostname + ":__WS_PORT__");
+ws.onmessage = (event) => {
+  const msg = JSON.parse(event.data);
+  if (msg.type === "hello") { info = msg; }
+  else if (msg.type === "samples") {
+    const step = msg.step;
+    for (let i = 0; i < msg.values.length; i++) { xs.push(msg.start + i * step); ys.push(msg.values[i]); }
+    const keep = 4 * info.window_size / step;
+    if (xs.length > keep) { xs.splice(0, xs.length - keep); ys.splice(0, ys.length - keep); }
+  }
+  else if (msg.type === "segments") {
+    rPeaks.push(...msg.r_peaks); windows.push(...msg.detection_windows); models.push(...msg.model_segments);
+  }
+  else if (msg.type === "status") { hrv = msg.hrv || ""; }
+};
+ws.onclose = () => { document.getElementById("status").textContent = "Disconnected (run finished or server stopped)"; };
+
+function draw() {
+  requestAnimationFrame(draw);
+  if (!info || xs.length === 0) return;
+  const canvas = document.getElementById("plot"), ctx = canvas.getContext("2d");
+  const W = canvas.width, H = canvas.height;
+  const xEnd = xs[xs.length - 1], xStart = xEnd - info.window_size;
+  const px = (x) => (x - xStart) / info.window_size * W;
+  let lo = Infinity, hi = -Infinity;
+  for (let i = 0; i < xs.length; i++) if (xs[i] >= xStart) { lo = Math.min(lo, ys[i]); hi = Math.max(hi, ys[i]); }
+  const pad = 0.1 * (hi - lo || 1), py = (y) => H - (y - lo + pad) / (hi - lo + 2 * pad) * H;
+  ctx.clearRect(0, 0, W, H);
+  for (const [s, e] of windows) if (e >= xStart) { ctx.fillStyle = "rgba(255,193,7,0.15)"; ctx.fillRect(px(s), 0, px(e) - px(s), H); }
+  for (const [s, e, cls, p] of models) if (e >= xStart) {
+    ctx.fillStyle = colors[cls] || "#000"; ctx.globalAlpha = cls === "Model Input" ? 0.1 : 0.25;
+    ctx.fillRect(px(s), H - 30, px(e) - px(s), 30); ctx.globalAlpha = 1;
+    if (cls !== "Model Input") ctx.fillText(cls + " " + (100 * p).toFixed(0) + "%", px(s) + 2, H - 34);
+  }
+  ctx.strokeStyle = "#1565c0"; ctx.beginPath();
+  let started = false;
+  for (let i = 0; i < xs.length; i++) {
+    if (xs[i] < xStart) continue;
+    if (!started) { ctx.moveTo(px(xs[i]), py(ys[i])); started = true; } else ctx.lineTo(px(xs[i]), py(ys[i]));
+  }
+  ctx.stroke();
+  ctx.fillStyle = "#c62828";
+  for (const r of rPeaks) if (r >= xStart) { ctx.beginPath(); ctx.arc(px(r), 12, 4, 0, 2 * Math.PI); ctx.fill(); }
+  document.getElementById("status").textContent =
+    "Samples: " + (xEnd + 1) + " | Time: " + ((xEnd + 1) / info.sampling_rate).toFixed(1) + " s" + (hrv ? "\\n" + hrv : "");
+}
+draw();
+</script>
+</body>
+</html>
+"""
+
+
+class ClientCursor:
+    def __init__(self, sample_index=0):
+        """
+        Per-client stream position: everything before it was already sent
+
+        Args:
+            sample_index (int): Next absolute sample index to send
+        """
+        self.sample_index = sample_index
+        self.segment_counts = {kind: 0 for kind in SEGMENT_KINDS}
+        self.hrv_text = None
+
+
+class ECGWebStreamer(SegmentRecorder):
+    def __init__(self, window_size=1250, sampling_rate=125, decimation=1, host='127.0.0.1', port=8765,
+                 http_port=8000, update_interval=0.1, stop_event=None, linger_seconds=2.0):
+        """
+        WebSocket dashboard server with the same input methods as ECGDashboard
+
+        Args:
+            window_size (int): Samples shown by the browser follow view
+            sampling_rate (int): Sampling rate in Hz
+            decimation (int): Samples per transmitted bucket; each bucket is sent as its min and max (1 = no decimation)
+            host (str): Interface to listen on (local only by default; '0.0.0.0' publishes the
+                        unauthenticated stream to the whole network)
+            port (int): WebSocket port
+            http_port (int): Port serving the browser page (None to disable)
+            update_interval (float): Seconds between incremental updates
+            stop_event (threading.Event, optional): Stops the server (after linger_seconds) when set
+            linger_seconds (float): Updates keep flowing this long after stop_event is set
+        """
+        super().__init__(sampling_rate, store_samples=True)
+        self.window_size = window_size
+        self.decimation = max(1, int(decimation))
+        self.host = host
+        self.port = port
+        self.http_port = http_port
+        self.update_interval = update_interval
+        self.stop_event = stop_event
+        self.linger_seconds = linger_seconds
+
+        self.clients = {}  # websocket -> ClientCursor
+        self.loop = None
+        self.stop_future = None
+        self.http_server = None
+        self.running = False
+        self.messages_sent = 0
+        self.bytes_sent = 0
+
+    # --- incremental updates ------------------------------------------------
+
+    def new_cursor(self):
+        """Cursor of a newly connected client: starts one window before the newest sample"""
+        start = max(0, len(self.raw_store) - self.window_size)
+        return ClientCursor(start - start % self.decimation)
+
+    def hello_message(self):
+        return {'type': 'hello', 'sampling_rate': self.sampling_rate, 'window_size': self.window_size,
+                'decimation': self.decimation}
+
+    def decimate(self, samples):
+        """
+        Min/max decimation: every bucket of `decimation` samples becomes its min and max, in time order
+
+        Returns:
+            tuple: (values, step) where step is the sample index distance between values
+        """
+        if self.decimation == 1:
+            return samples, 1
+        buckets = samples.reshape(-1, self.decimation)
+        argmin = buckets.argmin(axis=1)
+        argmax = buckets.argmax(axis=1)
+        rows = np.arange(len(buckets))
+        first = np.where(argmin <= argmax, buckets[rows, argmin], buckets[rows, argmax])
+        second = np.where(argmin <= argmax, buckets[rows, argmax], buckets[rows, argmin])
+        return np.column_stack((first, second)).ravel(), self.decimation / 2
+
+    def build_updates(self, cursor):
+        """
+        Messages bringing a client from its cursor up to the current state (advances the cursor)
+
+        Args:
+            cursor (ClientCursor): Client stream position
+
+        Returns:
+            list: JSON-serializable messages
+        """
+        messages = []
+
+        # Whole buckets of new samples only; the remainder goes out with the next update
+        available = len(self.raw_store) - cursor.sample_index
+        count = available - available % self.decimation
+        if count > 0:
+            samples = self.raw_store.get_range(cursor.sample_index, cursor.sample_index + count - 1)
+            values, step = self.decimate(samples)
+            messages.append({'type': 'samples', 'start': cursor.sample_index, 'step': step,
+                             'values': np.round(values, 5).tolist()})
+            cursor.sample_index += count
+
+        # Segment lists are append-only: send the entries added since the last update
+        new_segments = {}
+        for kind in SEGMENT_KINDS:
+            segments = self.segments.since(kind, cursor.segment_counts[kind])
+            new_segments[kind] = [list(s) if isinstance(s, tuple) else s for s in segments]
+            cursor.segment_counts[kind] += len(segments)
+        if any(new_segments.values()):
+            messages.append({'type': 'segments', **new_segments})
+
+        if self.hrv_stats is not None:
+            hrv_text = self.hrv_stats.format_panel()
+            if hrv_text != cursor.hrv_text:
+                cursor.hrv_text = hrv_text
+                messages.append({'type': 'status', 'hrv': hrv_text})
+        return messages
+
+    # --- server -------------------------------------------------------------
+
+    async def handle_client(self, websocket, path=None):
+        """Register a client and keep it until it disconnects (updates are pushed by broadcast_loop)"""
+        cursor = self.new_cursor()
+        await websocket.send(json.dumps(self.hello_message()))
+        self.clients[websocket] = cursor
+        print(f"🌐 Web client connected ({len(self.clients)} total)")
+        try:
+            await websocket.wait_closed()
+        finally:
+            self.clients.pop(websocket, None)
+            print(f"🌐 Web client disconnected ({len(self.clients)} left)")
+
+    async def send_updates(self, websocket, cursor):
+        try:
+            for message in self.build_updates(cursor):
+                text = json.dumps(message)
+                await websocket.send(text)
+                self.messages_sent += 1
+                self.bytes_sent += len(text)
+        except Exception:
+            self.clients.pop(websocket, None)
+
+    async def broadcast_loop(self):
+        """Push incremental updates to every client every update_interval"""
+        stop_deadline = None
+        while not self.stop_future.done():
+            if self.clients:
+                await asyncio.gather(*(self.send_updates(ws, cursor) for ws, cursor in list(self.clients.items())))
+            if self.stop_event is not None and self.stop_event.is_set():
+                if stop_deadline is None:
+                    stop_deadline = time.monotonic() + self.linger_seconds
+                elif time.monotonic() > stop_deadline:
+                    self.stop_future.set_result(None)
+                    break
+            await asyncio.sleep(self.update_interval)
+
+    async def serve(self):
+        self.loop = asyncio.get_running_loop()
+        self.stop_future = self.loop.create_future()
+        async with websockets.serve(self.handle_client, self.host, self.port):
+            print(f"🌐 WebSocket server on ws://{self.host}:{self.port}")
+            await self.broadcast_loop()
+        self.running = False
+
+    def start_http_server(self):
+        """Serve the browser page from a background thread"""
+        page = WEB_DASHBOARD_HTML.replace('__WS_PORT__', str(self.port)).encode('utf-8')
+
+        class PageHandler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(page)))
+                self.end_headers()
+                self.wfile.write(page)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.http_server = http.server.ThreadingHTTPServer((self.host, self.http_port), PageHandler)
+        threading.Thread(target=self.http_server.serve_forever, daemon=True, name="Web-HTTP").start()
+        page_host = 'localhost' if self.host in ('127.0.0.1', 'localhost') else '<this-pc>'
+        print(f"🌐 Open http://{page_host}:{self.http_port} in a browser (listening on {self.host})")
+
+    def start_dashboard(self, interval=None):
+        """Run the server in the calling thread until stop_dashboard() is called or stop_event is set"""
+        if websockets is None:
+            raise RuntimeError("websockets not installed: pip install websockets")
+        if interval is not None:
+            self.update_interval = interval / 1000.0
+        if self.http_port:
+            self.start_http_server()
+        self.running = True
+        try:
+            asyncio.run(self.serve())
+        finally:
+            self.running = False
+            if self.http_server:
+                self.http_server.shutdown()
+            print(f"🌐 Web server stopped ({self.messages_sent} messages, {self.bytes_sent / 1024:.0f} kB sent)")
+
+    def stop_dashboard(self):
+        if self.loop is not None and self.stop_future is not None:
+            self.loop.call_soon_threadsafe(lambda: self.stop_future.done() or self.stop_future.set_result(None))
+
+    def is_window_open(self):
+        return self.running
+
+
+class WebTestClient:
+    def __init__(self, name):
+        """
+        Stand-in for a browser: rebuilds the stream from the updates and checks continuity
+
+        Args:
+            name (str): Client name used in reports
+        """
+        self.name = name
+        self.info = None
+        self.next_index = None
+        self.samples = 0
+        self.gaps = 0
+        self.segment_counts = {kind: 0 for kind in SEGMENT_KINDS}
+        self.messages = 0
+        self.bytes = 0
+
+    def handle_message(self, text):
+        self.messages += 1
+        self.bytes += len(text)
+        message = json.loads(text)
+        if message['type'] == 'hello':
+            self.info = message
+        elif message['type'] == 'samples':
+            # Samples must continue exactly where the previous update ended
+            if self.next_index is not None and message['start'] != self.next_index:
+                self.gaps += 1
+            covered = int(round(len(message['values']) * message['step']))
+            self.next_index = message['start'] + covered
+            self.samples += covered
+        elif message['type'] == 'segments':
+            for kind in SEGMENT_KINDS:
+                self.segment_counts[kind] += len(message[kind])
+
+    async def run(self, uri, duration):
+        """Receive updates for duration seconds (or until the server closes)"""
+        async with websockets.connect(uri) as websocket:
+            deadline = time.monotonic() + duration
+            while time.monotonic() < deadline:
+                try:
+                    text = await asyncio.wait_for(websocket.recv(), timeout=max(0.01, deadline - time.monotonic()))
+                except asyncio.TimeoutError:
+                    break
+                except websockets.ConnectionClosed:
+                    break
+                self.handle_message(text)
+
+    def summary(self):
+        return (f"{self.name}: {self.messages} messages, {self.bytes / 1024:.0f} kB, {self.samples} samples, "
+                f"gaps {self.gaps}, segments " +
+                ', '.join(f"{kind}: {count}" for kind, count in self.segment_counts.items()))
+
+
+def run_test_clients(uri="ws://localhost:8765", clients=3, duration=10.0, stagger=1.0):
+    """
+    Connect several test clients (joining stagger seconds apart) and print what each received
+
+    Returns:
+        list: WebTestClient instances
+    """
+    if websockets is None:
+        raise RuntimeError("websockets not installed: pip install websockets")
+    test_clients = [WebTestClient(f"client{i + 1}") for i in range(clients)]
+
+    async def run_all():
+        async def delayed(client, delay):
+            await asyncio.sleep(delay)
+            await client.run(uri, duration - delay)
+        await asyncio.gather(*(delayed(client, i * stagger) for i, client in enumerate(test_clients)))
+
+    asyncio.run(run_all())
+    print("\n--- Web Test Clients ---")
+    for client in test_clients:
+        print(client.summary())
+    return test_clients
+
+
+if __name__ == "__main__":
+    # Test harness: stream the built-in data through the board simulator and watch it with test clients
+    from ecg_board_simulator import ECGBoardSimulator
+    from ecg_integration import ECGSerialDashboardIntegration
+    from vcom_with_dashboard import load_csv_to_list, transmit_thread_with_dashboard, receive_thread
+    from queue import Queue
+
+    stop_event = threading.Event()
+    streamer = ECGWebStreamer(stop_event=stop_event, http_port=None)
+    integration = ECGSerialDashboardIntegration(streamer)
+    ser = ECGBoardSimulator()
+    response_queue = Queue()
+
+    def parse_responses():
+        while not stop_event.is_set() or not response_queue.empty():
+            received_time, line = response_queue.get()
+            integration.process_serial_response(line, received_time)
+
+    data = load_csv_to_list('PVC.csv')[:2500]
+    threading.Thread(target=receive_thread, args=(ser, response_queue, stop_event), daemon=True).start()
+    threading.Thread(target=parse_responses, daemon=True).start()
+    threading.Thread(target=transmit_thread_with_dashboard, args=(ser, data, 0.004, stop_event, integration),
+                     daemon=True).start()
+    threading.Timer(0.5, run_test_clients, kwargs={'duration': 10.0}).start()
+    threading.Timer(12.0, stop_event.set).start()
+    streamer.start_dashboard()
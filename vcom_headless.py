@@ -0,0 +1,173 @@
+"""
+Headless pipeline mode
+Runs the full ingest → parse → segment pipeline with a metrics sink in place of
+ECGDashboard (matplotlib is never imported) and reports samples/s, events/s and memory.
+"""
+
+import contextlib
+import os
+import threading
+import time
+from queue import Queue, Empty
+
+from ecg_board_simulator import ECGBoardSimulator
+from ecg_flow_control import CreditWindow
+from ecg_integration import ECGSerialDashboardIntegration
+from ecg_logging import setup_logging, shutdown_logging
+from ecg_recorder import MetricsSink
+from vcom_with_dashboard import (connect_to_serial, load_csv_to_list, receive_thread, send_message,
+                                 transmit_thread_accelerated, transmit_thread_with_dashboard)
+
+
+def split_lines(buffer, data):
+    """Append received text to buffer and split off complete lines"""
+    buffer += data
+    lines = []
+    while '\n' in buffer or '\r' in buffer:
+        if '\n' in buffer:
+            line, buffer = buffer.split('\n', 1)
+        else:
+            line, buffer = buffer.split('\r', 1)
+        line = line.strip()
+        if line:
+            lines.append(line)
+    return buffer, lines
+
+
+def run_max_speed(ser, data_list, integration):
+    """
+    Send and parse in one loop without pacing (simulator or a board that keeps up)
+
+    Every sample is sent, passed to the integration, and any response is parsed
+    right away, so the run measures the pipeline alone.
+    """
+    latency_tracker = integration.latency_tracker
+    buffer = ""
+    for data_index, ecg_value in enumerate(data_list):
+        send_message(ser, str(ecg_value), data_index)
+        if latency_tracker:
+            latency_tracker.record_tx(data_index, time.perf_counter())
+        integration.process_new_sample(ecg_value)
+
+        bytes_available = ser.in_waiting
+        if bytes_available > 0:
+            received_time = time.perf_counter()
+            buffer, lines = split_lines(buffer, ser.read(bytes_available).decode('utf-8', errors='ignore'))
+            for line in lines:
+                integration.process_serial_response(line, received_time, integration.sample_index)
+    integration.process_sample_block()
+
+
+def run_paced(ser, data_list, integration, interval_seconds, drain_seconds=0.5):
+    """
+    Run the regular TX/RX threads at interval_seconds and parse in this thread
+
+    With integration.credit_window set, the TX thread instead sends as fast as
+    the parsed detection windows acknowledge samples (interval_seconds is ignored).
+    """
+    stop_event = threading.Event()
+    rx_stop_event = threading.Event()
+    response_queue = Queue()
+    rx_thread = threading.Thread(target=receive_thread, args=(ser, response_queue, rx_stop_event), name="RX-Thread")
+    if integration.credit_window:
+        tx_thread = threading.Thread(target=transmit_thread_accelerated,
+                                     args=(ser, data_list, integration.credit_window, stop_event, integration),
+                                     name="TX-Thread")
+    else:
+        tx_thread = threading.Thread(target=transmit_thread_with_dashboard,
+                                     args=(ser, data_list, interval_seconds, stop_event, integration), name="TX-Thread")
+    rx_thread.start()
+    tx_thread.start()
+
+    drain_deadline = None
+    while True:
+        try:
+            received_time, response = response_queue.get(timeout=0.05)
+            integration.process_serial_response(response, received_time)
+        except Empty:
+            if tx_thread.is_alive():
+                continue
+            # TX finished: give the board drain_seconds to answer the last windows
+            if drain_deadline is None:
+                drain_deadline = time.perf_counter() + drain_seconds
+            elif time.perf_counter() > drain_deadline:
+                break
+    rx_stop_event.set()
+    rx_thread.join(timeout=1.0)
+
+
+def run_headless(data_list, port='SIM', baud_rate=115200, interval_seconds=0.0, quiet=True,
+                 trace_memory=False, credit_window=None, **integration_kwargs):
+    """
+    Run a dataset through the pipeline without a GUI and report metrics
+
+    Args:
+        data_list (list): ECG samples to send
+        port (str): Serial port, or "SIM..." for the board simulator
+        baud_rate (int): Serial baud rate
+        interval_seconds (float): Sample interval; 0 runs at maximum speed (use 0.008 for a real board)
+        quiet (bool): Silence the per-message output of the parser during the run (else logged at DEBUG)
+        trace_memory (bool): Track peak Python allocations with tracemalloc (several times slower)
+        credit_window (int, optional): Accelerated replay through the TX/RX threads, with at most
+                                       this many unacknowledged samples in flight (interval_seconds is ignored)
+        **integration_kwargs: Passed to ECGSerialDashboardIntegration
+
+    Returns:
+        dict: Metrics from MetricsSink.metrics()
+    """
+    if port.upper().startswith('SIM'):
+        ser = ECGBoardSimulator(port=port)
+    else:
+        ser = connect_to_serial(port, baud_rate)
+        if ser is None:
+            return None
+
+    sink = MetricsSink(trace_memory=trace_memory)
+    flow_control = CreditWindow(credit_window) if credit_window else None
+    integration = ECGSerialDashboardIntegration(sink, credit_window=flow_control, **integration_kwargs)
+
+    if flow_control:
+        pacing = f'accelerated, credit window {credit_window}'
+    else:
+        pacing = 'max speed' if interval_seconds <= 0 else f'{1.0 / interval_seconds:.0f} Hz'
+    print(f"🚀 Headless run: {len(data_list)} samples via {port} ({pacing})")
+    output = open(os.devnull, 'w') if quiet else None
+    if not quiet:
+        setup_logging('DEBUG')
+    try:
+        with contextlib.redirect_stdout(output) if quiet else contextlib.nullcontext():
+            sink.start()
+            if interval_seconds <= 0 and not flow_control:
+                run_max_speed(ser, data_list, integration)
+            else:
+                run_paced(ser, data_list, integration, interval_seconds)
+            sink.stop()
+    finally:
+        if output:
+            output.close()
+        else:
+            shutdown_logging()
+        if ser.is_open:
+            ser.close()
+
+    print("\n--- Headless Pipeline Metrics ---")
+    print(sink.format_metrics())
+    if flow_control:
+        print(f"⏩ {flow_control.format_stats()}")
+    integration.report_rpeak_comparison()
+    integration.report_latency()
+    return sink.metrics()
+
+
+if __name__ == "__main__":
+    # CONFIGURATION
+    port_name = "SIM"           # "SIM" for the board simulator, "COM3" for a real board
+    interval_seconds = 0.0      # 0 = maximum speed, 0.008 = 125Hz
+    credit_window = None        # e.g. 500: accelerated replay through the TX/RX threads (as with a real board)
+    dataset = 'PVC.csv'
+    repeat = 10                 # Send the dataset several times for a longer run
+    trace_memory = False        # Peak Python allocations via tracemalloc (slows the run down)
+
+    data = load_csv_to_list(dataset) * repeat
+    run_headless(data, port=port_name, interval_seconds=interval_seconds, trace_memory=trace_memory,
+                 credit_window=credit_window)
@@ -0,0 +1,337 @@
+"""
+Parallel multi-board serial test rig
+Drives several boards (or simulators) at once: a shared scheduler sends every
+board its own dataset at the target rate, each board's responses are parsed in
+its own process, and the rig prints/writes an aggregated per-board prediction report.
+"""
+
+import csv
+import multiprocessing
+import queue
+import threading
+import time
+from collections import Counter
+
+from ecg_board_simulator import ECGBoardSimulator
+from ecg_logging import setup_logging, shutdown_logging
+from ecg_prediction_store import CLASS_NAMES
+from ecg_recorder import SegmentRecorder
+from vcom_with_dashboard import (ECGSerialDashboardIntegration, connect_to_serial, install_sigint_handler,
+                                 load_csv_to_list, send_message)
+
+
+class RigBoard:
+    def __init__(self, name, port, dataset, baud_rate=115200):
+        """
+        One board of the rig with its own dataset and response parser
+
+        Args:
+            name (str): Board name used in reports
+            port (str): Serial port (e.g. "COM3"), or "SIM..." for a simulated board
+            dataset (str or list): CSV file to send, or a list of samples
+            baud_rate (int): Serial baud rate
+        """
+        self.name = name
+        self.port = port
+        self.dataset = dataset if isinstance(dataset, str) else f"<{len(dataset)} samples>"
+        self.data = load_csv_to_list(dataset) if isinstance(dataset, str) else list(dataset)
+        self.baud_rate = baud_rate
+        self.ser = None
+
+        # TX state (written by the scheduler, read by the RX thread)
+        self.samples_sent = 0
+        self.first_send_time = None
+        self.last_send_time = None
+
+        self.line_queue = None
+        self.parser = None
+        self.rx_thread = None
+        self.lines_received = 0
+
+    def open(self):
+        """Open the serial port (or create the simulator)"""
+        if self.port.upper().startswith('SIM'):
+            self.ser = ECGBoardSimulator(port=self.port)
+        else:
+            self.ser = connect_to_serial(self.port, self.baud_rate)
+        return self.ser is not None
+
+    def has_data(self):
+        return self.samples_sent < len(self.data)
+
+    def send_next(self):
+        """Send the next sample of this board's dataset"""
+        send_message(self.ser, str(self.data[self.samples_sent]), self.samples_sent)
+        now = time.perf_counter()
+        if self.first_send_time is None:
+            self.first_send_time = now
+        self.last_send_time = now
+        self.samples_sent += 1
+
+    def achieved_rate(self):
+        """Average send rate in samples/s"""
+        if self.samples_sent < 2:
+            return 0.0
+        return (self.samples_sent - 1) / (self.last_send_time - self.first_send_time)
+
+
+class RigScheduler:
+    def __init__(self, boards, interval_seconds, stop_event, boards_per_thread=8):
+        """
+        Shared TX scheduler: all boards tick on one deadline grid
+
+        Deadlines are absolute (start + k * interval), so a late tick is caught up
+        instead of shifting every later sample. Boards are split into shards of
+        boards_per_thread, one TX thread per shard, so the per-tick work stays
+        bounded as the board count grows.
+
+        Args:
+            boards (list): RigBoard instances
+            interval_seconds (float): Sample interval (0.008 for 125 Hz)
+            stop_event (threading.Event): Stops all TX threads
+            boards_per_thread (int): Boards driven by one TX thread
+        """
+        self.boards = boards
+        self.interval_seconds = interval_seconds
+        self.stop_event = stop_event
+        self.shards = [boards[i:i + boards_per_thread] for i in range(0, len(boards), boards_per_thread)]
+        self.threads = []
+        self.late_ticks = 0
+        self.max_lateness = 0.0
+        self.lock = threading.Lock()
+
+    def start(self):
+        start_time = time.perf_counter() + 0.05  # Common grid origin for all shards
+        for i, shard in enumerate(self.shards):
+            thread = threading.Thread(target=self.tx_loop, args=(shard, start_time), name=f"Rig-TX-{i}")
+            thread.start()
+            self.threads.append(thread)
+
+    def tx_loop(self, shard, start_time):
+        """Send one sample to every board of the shard per tick"""
+        tick = 0
+        while not self.stop_event.is_set() and any(board.has_data() for board in shard):
+            deadline = start_time + tick * self.interval_seconds
+            delay = deadline - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            elif -delay > self.interval_seconds:
+                with self.lock:
+                    self.late_ticks += 1
+                    self.max_lateness = max(self.max_lateness, -delay)
+
+            for board in shard:
+                if board.has_data():
+                    board.send_next()
+            tick += 1
+
+    def join(self):
+        for thread in self.threads:
+            thread.join()
+
+    def is_alive(self):
+        return any(thread.is_alive() for thread in self.threads)
+
+
+def rig_receive_thread(board, stop_event):
+    """Read a board's responses and forward them in batches of lines (with receive time and TX count)"""
+    buffer = ""
+    while not stop_event.is_set():
+        try:
+            bytes_available = board.ser.in_waiting
+            if bytes_available > 0:
+                data = board.ser.read(bytes_available).decode('utf-8', errors='ignore')
+                received_time = time.perf_counter()
+                samples_sent = board.samples_sent
+                buffer += data
+                lines = []
+                while '\n' in buffer or '\r' in buffer:
+                    if '\n' in buffer:
+                        line, buffer = buffer.split('\n', 1)
+                    else:
+                        line, buffer = buffer.split('\r', 1)
+                    line = line.strip()
+                    if line:
+                        lines.append(line)
+                if lines:
+                    board.lines_received += len(lines)
+                    board.line_queue.put((received_time, samples_sent, lines))
+        except Exception as e:
+            print(f"Error reading from {board.name}: {e}")
+            break
+        time.sleep(0.001)
+
+
+def board_parser(board_name, line_queue, result_queue, log_level=None):
+    """
+    Parse one board's responses until a None sentinel arrives, then report
+
+    Runs in its own process (or thread) so parsing of many boards spreads across cores.
+    A parser process sets up its own log writer at log_level (threads share the parent's).
+    """
+    if log_level:
+        setup_logging(log_level)
+    recorder = SegmentRecorder(store_samples=False)
+    integration = ECGSerialDashboardIntegration(recorder, host_rpeak_detection=False, enable_filtering=False,
+                                                measure_latency=False)
+    while True:
+        item = line_queue.get()
+        if item is None:
+            break
+        received_time, samples_sent, lines = item
+        for line in lines:
+            integration.process_serial_response(line, received_time, samples_sent)
+
+    predictions = recorder.get_predictions()
+    class_counts = Counter(prediction[2] for prediction in predictions)
+    result_queue.put({
+        'board': board_name,
+        'detection_windows': len(recorder.segments['detection_windows']),
+        'r_peaks': len(recorder.segments['r_peaks']),
+        'predictions': len(predictions),
+        'class_counts': dict(class_counts),
+        'mean_probability': (sum(p[3] for p in predictions) / len(predictions)) if predictions else None,
+        'wrap_counter': integration.wrap_counter,
+    })
+    if log_level:
+        shutdown_logging()
+
+
+def run_rig(board_configs, interval_seconds=0.008, parse_in_processes=True, drain_seconds=1.0,
+            report_path=None, boards_per_thread=8, log_level='INFO'):
+    """
+    Run all boards of the rig to the end of their datasets
+
+    Args:
+        board_configs (list): Dicts with 'name', 'port' and 'dataset' keys
+        interval_seconds (float): Sample interval of every stream
+        parse_in_processes (bool): Parse each board in its own process (threads otherwise)
+        drain_seconds (float): Time to wait for final responses after the last sample
+        report_path (str, optional): CSV file for the aggregated per-board report
+        boards_per_thread (int): Boards per TX scheduler thread
+        log_level (str): Level of the 'ecg' log writers of the parser processes
+
+    Returns:
+        list: Per-board report dicts
+    """
+    stop_event = threading.Event()
+    install_sigint_handler(stop_event)
+
+    boards = [RigBoard(cfg['name'], cfg['port'], cfg['dataset'], cfg.get('baud_rate', 115200)) for cfg in board_configs]
+    boards = [board for board in boards if board.open()]
+    if not boards:
+        print("❌ No board could be opened")
+        return []
+
+    # One parser per board
+    if parse_in_processes:
+        result_queue = multiprocessing.Queue()
+    else:
+        result_queue = queue.Queue()
+    for board in boards:
+        if parse_in_processes:
+            board.line_queue = multiprocessing.Queue()
+            board.parser = multiprocessing.Process(target=board_parser,
+                                                   args=(board.name, board.line_queue, result_queue, log_level),
+                                                   name=f"Parser-{board.name}")
+        else:
+            board.line_queue = queue.Queue()
+            board.parser = threading.Thread(target=board_parser, args=(board.name, board.line_queue, result_queue),
+                                            name=f"Parser-{board.name}")
+        board.parser.start()
+
+    rx_stop_event = threading.Event()
+    for board in boards:
+        board.rx_thread = threading.Thread(target=rig_receive_thread, args=(board, rx_stop_event), name=f"RX-{board.name}")
+        board.rx_thread.start()
+
+    print(f"🚀 Rig: driving {len(boards)} board(s) at {1.0 / interval_seconds:.0f} Hz")
+    scheduler = RigScheduler(boards, interval_seconds, stop_event, boards_per_thread)
+    scheduler.start()
+    while scheduler.is_alive():
+        time.sleep(1.0)
+        progress = ', '.join(f"{b.name}: {b.samples_sent}/{len(b.data)}" for b in boards)
+        print(f"📤 {progress}")
+    scheduler.join()
+
+    # Let the boards answer the last windows, then stop RX and the parsers
+    time.sleep(drain_seconds)
+    rx_stop_event.set()
+    for board in boards:
+        board.rx_thread.join(timeout=2.0)
+        board.line_queue.put(None)
+
+    results = {}
+    for _ in boards:
+        report = result_queue.get()
+        results[report['board']] = report
+    for board in boards:
+        board.parser.join(timeout=5.0)
+        if board.ser and board.ser.is_open:
+            board.ser.close()
+
+    reports = []
+    for board in boards:
+        report = results[board.name]
+        report.update({
+            'port': board.port,
+            'dataset': board.dataset,
+            'samples_sent': board.samples_sent,
+            'achieved_rate': board.achieved_rate(),
+            'lines_received': board.lines_received,
+        })
+        reports.append(report)
+
+    print_rig_report(reports, scheduler, interval_seconds)
+    if report_path:
+        write_rig_report(reports, report_path)
+    return reports
+
+
+def print_rig_report(reports, scheduler, interval_seconds):
+    """Print the aggregated per-board prediction report"""
+    print("\n--- Rig Report ---")
+    print(f"Target rate: {1.0 / interval_seconds:.1f} Hz | late ticks: {scheduler.late_ticks} | "
+          f"max lateness: {scheduler.max_lateness * 1000:.1f} ms")
+    for report in reports:
+        counts = ', '.join(f"{name}: {count}" for name, count in sorted(report['class_counts'].items())) or 'none'
+        mean_probability = f"{report['mean_probability']:.3f}" if report['mean_probability'] is not None else '--'
+        print(f"{report['board']} [{report['port']}, {report['dataset']}]: {report['samples_sent']} samples at "
+              f"{report['achieved_rate']:.1f} Hz | windows {report['detection_windows']} | "
+              f"predictions {report['predictions']} ({counts}) | mean prob {mean_probability}")
+
+
+def write_rig_report(reports, report_path):
+    """Write the per-board report as CSV (one row per board, one column per class)"""
+    with open(report_path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['board', 'port', 'dataset', 'samples_sent', 'achieved_rate', 'lines_received',
+                         'detection_windows', 'r_peaks', 'predictions', 'mean_probability'] + CLASS_NAMES)
+        for report in reports:
+            writer.writerow([report['board'], report['port'], report['dataset'], report['samples_sent'],
+                             f"{report['achieved_rate']:.2f}", report['lines_received'], report['detection_windows'],
+                             report['r_peaks'], report['predictions'],
+                             f"{report['mean_probability']:.4f}" if report['mean_probability'] is not None else '']
+                            + [report['class_counts'].get(name, 0) for name in CLASS_NAMES])
+    print(f"📝 Rig report written to {report_path}")
+
+
+if __name__ == "__main__":
+    # CONFIGURATION
+    # One entry per board: port "COMx" for a real board, "SIM..." for a simulated one
+    rig_boards = [
+        {'name': 'board1', 'port': 'COM3', 'dataset': 'Normal.csv'},
+        {'name': 'board2', 'port': 'COM4', 'dataset': 'PVC.csv'},
+        {'name': 'sim1', 'port': 'SIM1', 'dataset': 'PVC.csv'},
+    ]
+    interval_seconds = 0.008    # 125Hz per board
+    parse_in_processes = True   # One parser process per board
+    report_path = "rig_report.csv"
+    log_level = 'INFO'          # 'DEBUG' shows every received line
+
+    setup_logging(log_level)
+    try:
+        run_rig(rig_boards, interval_seconds, parse_in_processes=parse_in_processes, report_path=report_path,
+                log_level=log_level)
+    finally:
+        shutdown_logging()
@@ -1,14 +1,18 @@
 import serial
 import time
 import threading
-from queue import Queue
 import signal
 import sys
 import os
-import matplotlib.pyplot as plt  # For checking if plot windows are open
 
-# Import the dashboard
-from ecg_dashboard import ECGDashboard, ECGDashboardIntegration
+# Integration classes (no matplotlib); the dashboard itself is imported only when enabled
+from ecg_integration import ECGDashboardIntegration, ECGSerialDashboardIntegration
+from ecg_shadow_inference import OnnxClassifier
+from ecg_queue_metrics import InstrumentedQueue, snapshot_queues, format_queue_metrics
+from ecg_logging import get_logger, setup_logging, shutdown_logging
+from ecg_flow_control import CreditWindow
+
+logger = get_logger('vcom')
 
 # Your existing ECG data arrays
 ecg_data_PVC = [
@@ -123,9 +127,9 @@ def send_message(ser, message, send_count):
         #     print(f"Sent: '{message}' (count: {send_count})")
 
     except serial.SerialTimeoutException:
-        print("Write timeout.")
+        logger.warning("Write timeout.")
     except Exception as e:
-        print(f"An error occurred while sending: {e}")
+        logger.error("An error occurred while sending: %s", e)
 
 def install_sigint_handler(stop_event):
     """Set SIGINT (Ctrl+C) to just stop IO threads; keep GUI open."""
@@ -138,7 +142,7 @@ def install_sigint_handler(stop_event):
     signal.signal(signal.SIGINT, _handler)
 
 def receive_thread(ser, response_queue, stop_event):
-    """Continuously read from serial port and put responses in queue"""
+    """Continuously read from serial port and put (receive time, line) tuples in queue"""
     buffer = ""
     print("📡 RX Thread: Started")
     
@@ -153,6 +157,7 @@ def receive_thread(ser, response_queue, stop_event):
                 if bytes_available > 0:
                     # Read all available bytes without blocking
                     data = ser.read(bytes_available).decode('utf-8', errors='ignore')
+                    received_time = time.perf_counter()  # Arrival time of these lines, for latency measurement
                     buffer += data
                     
                     # Process complete lines from buffer
@@ -164,7 +169,7 @@ def receive_thread(ser, response_queue, stop_event):
                         
                         line = line.strip()
                         if line:
-                            response_queue.put(line)
+                            response_queue.put((received_time, line))
                             
             except Exception as e:
                 print(f"Error reading from serial: {e}")
@@ -179,6 +184,9 @@ def transmit_thread_with_dashboard(ser, data_list, interval_seconds, stop_event,
     data_index = 0
     send_count = 0
     
+    # Per-sample send timestamps for end-to-end latency measurement
+    latency_tracker = getattr(dashboard_integration, 'latency_tracker', None)
+    
     print("TX Thread with Dashboard: Started")
     
     while not stop_event.is_set() and data_index < len(data_list):
@@ -190,6 +198,8 @@ def transmit_thread_with_dashboard(ser, data_list, interval_seconds, stop_event,
         
         # Send via serial
         send_message(ser, string_to_send, send_count)
+        if latency_tracker:
+            latency_tracker.record_tx(data_index, time.perf_counter())
         
         # Update dashboard
         if dashboard_integration:
@@ -203,12 +213,54 @@ def transmit_thread_with_dashboard(ser, data_list, interval_seconds, stop_event,
         sleep_time = max(0, interval_seconds - elapsed)
         time.sleep(sleep_time)
     
+    # Push the last partial block through the filter/analysis stage
+    if dashboard_integration:
+        dashboard_integration.process_sample_block()
+    
     if stop_event.is_set():
         print(f"🛑 TX Thread: Stopped by stop_event after sending {send_count} data points")
     else:
         print(f"✅ TX Thread: Finished sending all {send_count} data points (reached end of data)")
     print("🏁 TX Thread with Dashboard: COMPLETELY TERMINATED")
 
+def transmit_thread_accelerated(ser, data_list, credit_window, stop_event, dashboard_integration, max_batch=125):
+    """Transmit data as fast as the board acknowledges it (credit-based flow control, no sleeps)"""
+    data_index = 0
+    latency_tracker = getattr(dashboard_integration, 'latency_tracker', None)
+    
+    print(f"TX Thread (accelerated, credit window {credit_window.window} samples): Started")
+    
+    while not stop_event.is_set() and data_index < len(data_list):
+        # Blocks until the parser has acknowledged enough samples
+        count = credit_window.acquire(min(max_batch, len(data_list) - data_index), stop_event)
+        if count == 0:
+            break
+        batch = data_list[data_index:data_index + count]
+        
+        # Feed the host pipeline first, so the TX counter never lags the samples the board can answer for
+        if dashboard_integration:
+            for ecg_value in batch:
+                dashboard_integration.process_new_sample(ecg_value)
+        
+        # One write for the whole batch; timestamped before the write so a fast answer is never earlier
+        send_time = time.perf_counter()
+        if latency_tracker:
+            for offset in range(count):
+                latency_tracker.record_tx(data_index + offset, send_time)
+        send_message(ser, '\0'.join(str(ecg_value) for ecg_value in batch), data_index)
+        data_index += count
+    
+    credit_window.finish()
+    if dashboard_integration:
+        dashboard_integration.process_sample_block()
+    
+    if stop_event.is_set():
+        print(f"🛑 TX Thread: Stopped by stop_event after sending {data_index} data points")
+    else:
+        print(f"✅ TX Thread: Finished sending all {data_index} data points (reached end of data)")
+    print(f"⏩ {credit_window.format_stats()}")
+    print("🏁 TX Thread (accelerated): COMPLETELY TERMINATED")
+
 def check_thread_status(*threads):
     """Check and report the status of multiple threads"""
     print("\n--- Thread Status Check ---")
@@ -227,260 +279,29 @@ def check_thread_status(*threads):
     print(f"All threads finished: {all_finished}")
     return all_finished
 
-# Enhanced ECG Dashboard Integration
-class ECGSerialDashboardIntegration(ECGDashboardIntegration):
-    """Extended integration class for serial communication + dashboard"""
-    
-    def __init__(self, dashboard):
-        super().__init__(dashboard)
-        self.received_responses = []
-        
-        # Circular buffer wrap-around tracking
-        self.buffer_size = 625  # MCU circular buffer size
-        self.wrap_counter = 0   # Number of times buffer has wrapped
-        self.last_detection_start = None  # Last observed detection window start index
-        
-        # Model window tracking - to share indices between model input window and predictions
-        self.last_model_start = None  # Absolute start index of last model input window
-        self.last_model_end = None    # Absolute end index of last model input window
-
-    def convert_buffer_index_to_absolute(self, buffer_index):
-        """
-        Convert circular buffer index to absolute index using wrap counter
-        
-        Args:
-            buffer_index (int): Index from circular buffer (0-625)
-            
-        Returns:
-            int: Absolute index accounting for buffer wraps
-        """
-        return buffer_index + (self.wrap_counter * self.buffer_size)
-    
-    def get_buffer_stats(self):
-        """
-        Get current buffer wrap statistics for debugging
-        
-        Returns:
-            dict: Buffer statistics including wrap count, last tail position, etc.
-        """
-        return {
-            'wrap_counter': self.wrap_counter,
-            'last_buffer_tail': self.last_buffer_tail,
-            'buffer_size': self.buffer_size,
-            'current_offset': self.wrap_counter * self.buffer_size
-        }
-        
-    def process_serial_response(self, response_text):
-        """Process responses received from serial communication"""
-        self.received_responses.append(response_text)
-        
-        # DEBUG: Print all received messages to see what we're getting
-        #print(f"📨 DEBUG: Received message: '{response_text}'")
-
-        # Process detection windows
-        # Expected format: "Equivalent to indices 414 to 663"
-        if "Equivalent to indices" in response_text:
-            #print(f"🔍 DEBUG: Found detection window message: '{response_text}'")
-            
-            try:
-                # Split the response and find the indices
-                parts = response_text.split()
-                #print(f"🔍 DEBUG: Split parts: {parts}")
-
-                # Find "indices" keyword and extract start/end indices
-                if "indices" in parts and "to" in parts:
-                    indices_idx = parts.index("indices")
-                    
-                    # Make sure we have the right structure: "indices XXX to YYY"
-                    if indices_idx + 3 < len(parts):
-                        try:
-                            buffer_start_idx = int(parts[indices_idx + 1])  # Number after "indices"
-                            buffer_end_idx = int(parts[indices_idx + 3])    # Number after "to"
-                            
-                            # Check for circular buffer wrap-around by detecting when start index decreases peak
-                            if self.last_detection_start is not None:
-                                # Detect wrap-around: current start index is much smaller than previous
-                                # (allowing some tolerance for small decrements)
-                                if buffer_start_idx < self.last_detection_start - 100:  # Threshold to detect wrap
-                                    self.wrap_counter += 1
-                                    print(f"🔄 Buffer wrap-around detected! Counter: {self.wrap_counter} (detection start: {self.last_detection_start} → {buffer_start_idx})")
-                            
-                            # Update last detection start index
-                            self.last_detection_start = buffer_start_idx
-                            
-                            # Convert buffer indices to absolute indices
-                            absolute_start_idx = self.convert_buffer_index_to_absolute(buffer_start_idx)
-                            absolute_end_idx = self.convert_buffer_index_to_absolute(buffer_end_idx)
-                           
-                            # Add detection window to dashboard with absolute indices
-                            self.dashboard.add_detection_window(absolute_start_idx, absolute_end_idx)
-                            
-                            # Force immediate processing of detection windows only so it's available for subsequent R-peaks
-                            self.dashboard.process_pending_segments(segment_type='detection_window')
-                            
-                            print(f"🔍 Added detection window to dashboard: {buffer_start_idx}→{absolute_start_idx} to {buffer_end_idx}→{absolute_end_idx} (wrap count: {self.wrap_counter})")
-                            
-                        except ValueError as ve:
-                            print(f"⚠️  Error parsing detection window indices: {ve}")
-                    else:
-                        print(f"🔍 DEBUG: Structure check failed.")
-                        
-                else:
-                    print(f"🔍 DEBUG: Missing keywords. 'indices' in parts: {'indices' in parts}, 'to' in parts: {'to' in parts}")
-                            
-            except Exception as e:
-                print(f"⚠️  Error parsing detection window: {e}")
-                import traceback
-                traceback.print_exc()
-                pass
-
-        
-                
-        # Process R-peak detections
-        # Expected format: "R-peaks: 3 indices: 20 123 222"
-        if "R-peaks:" in response_text:
-            try:
-                # Split the response and find the indices part
-                parts = response_text.split()
-                
-                # Find the "indices:" keyword
-                if "indices:" in parts:
-                    indices_idx = parts.index("indices:")
-                    
-                    # Extract the number of R-peaks
-                    if indices_idx >= 2:
-                        num_peaks = int(parts[1])  # The number after "R-peaks:"
-                        
-                        # Extract all R-peak indices after "indices:"
-                        r_peak_indices = []
-                        for i in range(indices_idx + 1, min(indices_idx + 1 + num_peaks, len(parts))):
-                            try:
-                                r_peak_idx = int(parts[i])
-                                r_peak_indices.append(r_peak_idx)
-                            except ValueError:
-                                continue
-                        
-                        # R-peaks are relative to the start of the detection window
-                        # Convert r peaks to absolute indices using the latest detection window
-                        original_r_peaks = r_peak_indices.copy()  # Keep original for logging
-                        if self.dashboard.segments['detection_windows']:
-                            last_window = self.dashboard.segments['detection_windows'][-1]
-                            window_start = last_window[0]  # This is already an absolute index
-                            r_peak_indices = [idx + window_start for idx in r_peak_indices]
-
-                        # Add all R-peaks to dashboard
-                        #for r_peak_idx in r_peak_indices:
-                        #    self.dashboard.add_r_peak(r_peak_idx)
-                        #Add only the 2nd R-peak to avoid clutter
-                        if len(r_peak_indices) >= 2:
-                            self.dashboard.add_r_peak(r_peak_indices[1])
-                            added_peak_index = [r_peak_indices[1]]  # Keep only the added peak for logging
-
-                        print(f"📈 Detected {len(r_peak_indices)} R-peaks: {original_r_peaks}→{r_peak_indices} (relative to window start {window_start if self.dashboard.segments['detection_windows'] else 'N/A'}). "
-                              f"Added {added_peak_index[0] if added_peak_index else 'N/A'} to dashboard")
-
-            except Exception as e:
-                print(f"⚠️  Error parsing R-peaks: {e}")
-                pass
-
-
-        # Process model input windows
-        # Expected format: "Model input window: start 20 len 82"
-        if "Model input window:" in response_text:
-            try:
-                # Split the response and find the start/len values
-                parts = response_text.split()
-                
-                # Find "start" and "len" keywords
-                if "start" in parts and "len" in parts:
-                    start_idx = parts.index("start")
-                    len_idx = parts.index("len")
-                    
-                    # Make sure we have the right structure and enough parts
-                    if start_idx + 1 < len(parts) and len_idx + 1 < len(parts):
-                        try:
-                            relative_model_start = int(parts[start_idx + 1])  # Start index relative to detection window
-                            model_length = int(parts[len_idx + 1])   # Length of model input window
-                            
-                            # Model indices are relative to the start of the detection window
-                            # Convert to absolute indices using the latest detection window
-                            if self.dashboard.segments['detection_windows']:
-                                last_window = self.dashboard.segments['detection_windows'][-1]
-                                window_start = last_window[0]  # This is already an absolute index
-                                
-                                # Calculate absolute indices: window_start + relative_position
-                                absolute_model_start = window_start + relative_model_start
-                                absolute_model_end = absolute_model_start + model_length - 1
-                                
-                                # Store model window indices for use by prediction parsing
-                                self.last_model_start = absolute_model_start
-                                self.last_model_end = absolute_model_end
-                                
-                                # Add model segment to dashboard with absolute indices
-                                # Note: Using "Model Input" as class name with 100% probability for visualization
-                                self.dashboard.add_model_segment(absolute_model_start, absolute_model_end, "Model Input", 1.0)
-                                
-                                print(f"📊 Added model input window to dashboard: relative_start={relative_model_start}, len={model_length} → absolute indices {absolute_model_start} to {absolute_model_end} (relative to window start {window_start})")
-                                
-                            else:
-                                print("⚠️  No detection window available for model input window calculation")
-                            
-                        except ValueError as ve:
-                            print(f"⚠️  Error parsing model input window values: {ve}")
-                            
-            except Exception as e:
-                print(f"⚠️  Error parsing model input window: {e}")
-                pass
-
-        # Process model predictions
-        if "probs: " in response_text:
-            try:
-                # Extract prediction info from response (adjust format as needed)
-                # Expected format: "'ECG inference 2 probs: prob_class0 prob_class1 prob_class2 prob_class3 prob_class4 prob_class5 prob_class6'"
-                parts = response_text.split()
-                
-                # Class names in order
-                class_names = ["Normal", "Abnormal", "LBBB", "RBBB", "PVC", "MI", "CHF"]
-                
-                if len(parts) >= 10:  # "ECG inference 2 probs:" + 7 probability values
-                    # Extract probabilities (should start from index 4)
-                    probs_start_idx = response_text.find("probs:") + 6  # Find "probs:" and skip it
-                    prob_text = response_text[probs_start_idx:].strip()
-                    prob_values = prob_text.split()
-                    
-                    if len(prob_values) >= 7:
-                        # Convert probability strings to floats
-                        probabilities = [float(p) for p in prob_values[:7]]
-                        
-                        # Find the class with highest probability
-                        max_prob_idx = probabilities.index(max(probabilities))
-                        pred_class = class_names[max_prob_idx]
-                        probability = probabilities[max_prob_idx]
-                        
-                        # Use the model window indices from the most recent model input window
-                        if self.last_model_start is not None and self.last_model_end is not None:
-                            # Add model segment with prediction to dashboard using stored indices
-                            self.dashboard.add_model_segment(self.last_model_start, self.last_model_end, pred_class, probability)
-                            print(f"🤖 Model Prediction: {pred_class} ({probability*100:.2f}%) at indices {self.last_model_start} to {self.last_model_end}")
-                        else:
-                            print("⚠️  No model input window indices available for prediction visualization")
-                        
-                        # Optional: Print detailed probability breakdown
-                        print(f"Model prediction breakdown:")
-                        for i, (class_name, prob) in enumerate(zip(class_names, probabilities)):
-                            marker = " ← PREDICTED" if i == max_prob_idx else ""
-                            print(f"  {class_name}: {prob:.4f}{marker}")
-                        
-            except Exception as e:
-                print(f"Error parsing model prediction: {e}")
-                pass
-
 if __name__ == "__main__":
     # CONFIGURATION
     port_name = "COM3"
     baud_rate = 115200
     interval_seconds = 0.008    # 125Hz
+    accelerated_replay = False  # Stream as fast as the board acknowledges samples (ignores interval_seconds)
+    credit_window_samples = 500 # Samples in flight beyond the last acknowledged one (< MCU buffer of 625)
     enable_dashboard = True     # Set to False to disable dashboard
+    dashboard_backend = 'matplotlib'  # 'matplotlib' (window in this process), 'pyqtgraph' (faster window in this
+                                      # process, needs pyqtgraph + PyQt5), 'process' (window in a separate
+                                      # rendering process) or 'web' (browsers via WebSocket, needs websockets)
+    web_port = 8765             # WebSocket port of the web dashboard (page served on port 8000)
+    web_host = '127.0.0.1'      # Web dashboard interface: '0.0.0.0' opens the (unauthenticated) stream to the LAN
+    history_dir = None          # Session directory for extra read-only viewers (python ecg_shared_history.py <dir>)
+    shadow_model_path = None    # Path to a reference .onnx model to enable host shadow inference
+    hrv_export_path = None      # CSV file for per-beat HR/HRV metrics (e.g. "hrv_metrics.csv")
+    show_latency_histograms = True  # Live MCU latency histograms in a second window
+    data_queue_policy = 'coalesce'  # Full dashboard sample queue: 'coalesce', 'drop_oldest' or 'block'
+    log_level = 'INFO'          # 'DEBUG' prints every received line and parsed segment
+    log_jsonl_path = None       # JSONL file receiving every log record (e.g. "session_log.jsonl")
+    segment_retention_seconds = 600     # Segment history kept in memory (None = whole session)
+    segment_spill_dir = "segment_spill" # Older segments are moved to a per-session subdirectory of this and read
+                                        # back when navigating (None = discard)
     
     # Choose data to send
     try:
@@ -496,12 +317,17 @@ if __name__ == "__main__":
     dashboard = None
     dashboard_integration = None
     dashboard_thread = None
+    history_writer = None
     
     # Threading synchronization
     stop_event = threading.Event()
     ctrl_c_pressed = False
-    response_queue = Queue()
+    response_queue = InstrumentedQueue('response_queue')
+    credit_window = CreditWindow(credit_window_samples) if accelerated_replay else None
 
+    # Parser/receive messages are written by a background thread (hot paths only enqueue)
+    setup_logging(log_level, jsonl_path=log_jsonl_path)
+    
     # Install Ctrl+C behavior: stop IO, keep GUI open
     install_sigint_handler(stop_event)
     
@@ -513,8 +339,39 @@ if __name__ == "__main__":
         if enable_dashboard:
             print("Initializing ECG Dashboard...")
             try:
-                dashboard = ECGDashboard(window_size=1250, sampling_rate=125)
-                dashboard_integration = ECGSerialDashboardIntegration(dashboard)
+                if dashboard_backend == 'web':
+                    # Rendering happens in the browsers; this process only streams updates
+                    from ecg_web_server import ECGWebStreamer
+                    dashboard = ECGWebStreamer(window_size=1250, sampling_rate=125, host=web_host, port=web_port,
+                                               stop_event=stop_event)
+                elif dashboard_backend == 'process':
+                    # GUI redraws run in their own process, fed through a shared-memory ring
+                    from ecg_render_process import RenderProcessPublisher
+                    dashboard = RenderProcessPublisher(window_size=1250, sampling_rate=125)
+                    dashboard.start_renderer()
+                else:
+                    # In-process GUI: matplotlib (default) or pyqtgraph, same inputs and navigation
+                    from ecg_dashboard_base import create_dashboard
+                    from ecg_segment_store import session_spill_dir
+                    spill_dir = session_spill_dir(segment_spill_dir) if segment_spill_dir else None
+                    dashboard = create_dashboard(dashboard_backend, window_size=1250, sampling_rate=125,
+                                                 data_queue_policy=data_queue_policy,
+                                                 retention_seconds=segment_retention_seconds, spill_dir=spill_dir)
+                shadow_classifier = OnnxClassifier(shadow_model_path) if shadow_model_path else None
+                integration_dashboard = dashboard
+                if history_dir:
+                    # Publish samples and segments for viewers attaching from other processes
+                    from ecg_shared_history import SharedHistoryWriter, MirroredDashboard
+                    history_writer = SharedHistoryWriter(history_dir, sampling_rate=125)
+                    integration_dashboard = MirroredDashboard(dashboard, history_writer)
+                    print(f"Session published in {history_dir} (open a viewer: python ecg_shared_history.py {history_dir})")
+                dashboard_integration = ECGSerialDashboardIntegration(integration_dashboard, shadow_classifier=shadow_classifier,
+                                                                      hrv_export_path=hrv_export_path,
+                                                                      credit_window=credit_window)
+                if show_latency_histograms:
+                    dashboard.attach_latency_tracker(dashboard_integration.latency_tracker)
+                if hasattr(dashboard, 'register_queue'):
+                    dashboard.register_queue(response_queue)
                 
                 print("Dashboard object created successfully")
                 print("Note: Dashboard will run in main thread due to matplotlib GUI requirements")
@@ -531,8 +388,16 @@ if __name__ == "__main__":
         # Open serial connection
         ser_connection = connect_to_serial(port_name, baud_rate)
 
+        if credit_window and not dashboard_integration:
+            # Acknowledgements come from the response parser, which only runs with the dashboard
+            print("Accelerated replay needs the dashboard integration, sending every interval_seconds instead")
+            credit_window = None
+        
         if ser_connection:
-            print(f"Starting decoupled TX/RX communication with dashboard every {interval_seconds * 1000}ms.")
+            if credit_window:
+                print(f"Starting accelerated replay of {len(array_to_send)} samples (credit window {credit_window.window}).")
+            else:
+                print(f"Starting decoupled TX/RX communication with dashboard every {interval_seconds * 1000}ms.")
             print("Ctrl+C to stop.")
             
             # Start the receive thread
@@ -544,11 +409,18 @@ if __name__ == "__main__":
             rx_thread.start()
             
             # Start the transmit thread with dashboard integration
-            tx_thread = threading.Thread(
-                target=transmit_thread_with_dashboard,
-                args=(ser_connection, array_to_send, interval_seconds, stop_event, dashboard_integration),
-                name="TX-Thread",
-            )
+            if credit_window:
+                tx_thread = threading.Thread(
+                    target=transmit_thread_accelerated,
+                    args=(ser_connection, array_to_send, credit_window, stop_event, dashboard_integration),
+                    name="TX-Thread",
+                )
+            else:
+                tx_thread = threading.Thread(
+                    target=transmit_thread_with_dashboard,
+                    args=(ser_connection, array_to_send, interval_seconds, stop_event, dashboard_integration),
+                    name="TX-Thread",
+                )
             tx_thread.start()
             
             if enable_dashboard and dashboard:
@@ -558,29 +430,34 @@ if __name__ == "__main__":
                 # Create a background thread to monitor serial communication
                 def monitor_serial():
                     messages_received = 0
-                    loop_count = 0
+                    last_status = time.time()
+                    # Acknowledgements gate the accelerated TX thread, so parse them promptly
+                    poll_interval = 0.005 if credit_window else 0.1
                     while tx_thread.is_alive() and not stop_event.is_set():
                         # Process any received messages
                         while not response_queue.empty():
                             try:
-                                response = response_queue.get_nowait()
+                                received_time, response = response_queue.get_nowait()
                                 messages_received += 1
-                                print(f"Received ({messages_received}): '{response}'")
+                                logger.debug("Received (%d): '%s'", messages_received, response)
                                 
                                 # Process response with dashboard integration
                                 if dashboard_integration:
-                                    dashboard_integration.process_serial_response(response)
+                                    dashboard_integration.process_serial_response(response, received_time)
                                     
                                 response_queue.task_done()
                             except:
                                 break
                         
                         # Optional: Check thread status every 10 seconds
-                        loop_count += 1
-                        if loop_count % 100 == 0:  # Every 10 seconds (100 * 0.1s)
+                        if time.time() - last_status >= 10:
+                            last_status = time.time()
                             print(f"Dashboard samples: {dashboard.sample_count}")
+                            print(format_queue_metrics(snapshot_queues([response_queue])))
+                            if credit_window:
+                                print(f"⏩ {credit_window.format_stats()}")
                         
-                        time.sleep(0.1)  # Check for messages every 100ms
+                        time.sleep(poll_interval)  # Check for messages every poll_interval
                     
                     print("Data transmission completed.")
                     # Signal RX thread to stop now that TX is done
@@ -617,9 +494,9 @@ if __name__ == "__main__":
                     # Process any received messages
                     while not response_queue.empty():
                         try:
-                            response = response_queue.get_nowait()
+                            received_time, response = response_queue.get_nowait()
                             messages_received += 1
-                            print(f"Received ({messages_received}): '{response}'")
+                            logger.debug("Received (%d): '%s'", messages_received, response)
                             response_queue.task_done()
                         except:
                             break
@@ -639,11 +516,11 @@ if __name__ == "__main__":
             # Process any remaining messages
             while not response_queue.empty():
                 try:
-                    response = response_queue.get_nowait()
+                    received_time, response = response_queue.get_nowait()
                     messages_received += 1
-                    print(f"Received ({messages_received}): '{response}'")
+                    logger.debug("Received (%d): '%s'", messages_received, response)
                     if dashboard_integration:
-                        dashboard_integration.process_serial_response(response)
+                        dashboard_integration.process_serial_response(response, received_time)
                     response_queue.task_done()
                 except:
                     break
@@ -669,6 +546,22 @@ if __name__ == "__main__":
             all_threads_finished = not (tx_thread.is_alive() or rx_thread.is_alive())
             print(f"Serial communication threads finished: {all_threads_finished}")
             
+            # Backlog telemetry (high-water marks show how far the consumers fell behind)
+            print("\n--- Queue Telemetry ---")
+            if dashboard is not None and hasattr(dashboard, 'get_queue_metrics'):
+                print(format_queue_metrics(dashboard.get_queue_metrics()))
+            else:
+                print(format_queue_metrics(snapshot_queues([response_queue])))
+            
+            # Host-side R-peak detector vs firmware R-peaks
+            if dashboard_integration:
+                dashboard_integration.report_rpeak_comparison()
+                dashboard_integration.report_shadow_inference()
+                dashboard_integration.report_hrv()
+                dashboard_integration.report_latency()
+            if history_writer:
+                history_writer.close()
+            
             if enable_dashboard:
                 print("\nDashboard is still running. Close the plot window to exit completely.")
                 print("Dashboard will continue to show the transmitted data.")
@@ -752,4 +645,5 @@ if __name__ == "__main__":
                     dashboard.stop_dashboard()
                     dashboard_thread.join(timeout=1.0)
         
-        print("--- Cleanup Complete ---")
\ No newline at end of file
+        print("--- Cleanup Complete ---")
+        shutdown_logging()
\ No newline at end of file